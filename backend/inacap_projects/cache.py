@@ -0,0 +1,184 @@
+"""
+Caché de lectura versionada y GET condicional.
+
+Cada catálogo tiene un número de versión en la caché de Django que las
+señales incrementan al guardar o borrar. Las respuestas GET se guardan ya
+serializadas a JSON bajo una clave que incluye esa versión, así que un
+cambio invalida todas las variantes (filtros, orden, páginas) de una vez.
+
+GetCondicionalMixin calcula ETag y Last-Modified a partir de las fechas de
+modificación con una consulta agregada, y responde 304 antes de serializar.
+
+Con 'locmem' cada proceso tiene su propia caché y su propia versión; para
+varios workers conviene CACHE_BACKEND=file o db (ver settings).
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_etags, quote_etag
+from rest_framework import permissions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from inacap_projects.metricas import datos_medidos
+
+TIEMPO_RESPUESTA = 60 * 60 * 24
+
+
+def clave_version(nombre):
+    return f'version:{nombre}'
+
+
+def obtener_version(nombre):
+    """Versión actual del recurso `nombre`"""
+    clave = clave_version(nombre)
+    cache.add(clave, 1, timeout=None)
+    return cache.get(clave, 1)
+
+
+def incrementar_version(nombre):
+    """Invalida todas las respuestas cacheadas del recurso `nombre`"""
+    try:
+        cache.incr(clave_version(nombre))
+    except ValueError:
+        cache.add(clave_version(nombre), 2, timeout=None)
+
+
+def etag_de(contenido):
+    """ETag fuerte a partir de los bytes exactos de la respuesta"""
+    return quote_etag(hashlib.sha1(contenido).hexdigest())
+
+
+def coincide_etag(request, etag):
+    """True si el If-None-Match del request incluye `etag`"""
+    encabezado = request.META.get('HTTP_IF_NONE_MATCH')
+    if not encabezado:
+        return False
+    etags = parse_etags(encabezado)
+    return '*' in etags or etag in etags
+
+
+def respuesta_json(contenido, etag, request, content_type='application/json'):
+    """Respuesta con los bytes ya serializados, o 304 si el cliente tiene la versión"""
+    if coincide_etag(request, etag):
+        respuesta = HttpResponse(status=304)
+    else:
+        respuesta = HttpResponse(contenido, content_type=content_type)
+    respuesta['ETag'] = etag
+    # El navegador guarda la respuesta pero la revalida con If-None-Match
+    patch_cache_control(respuesta, no_cache=True)
+    return respuesta
+
+
+class CatalogoCacheMixin:
+    """
+    Sirve list y retrieve desde la caché versionada `catalogo`.
+
+    Solo cachea respuestas 200 en JSON; el API navegable y los errores pasan
+    directo. Un GET sin Authorization es anónimo y no se autentica, así un
+    acierto (o un 304) no consulta la base de datos; si trae credenciales se
+    validan antes de responder, y un token inválido o vencido recibe 401.
+    """
+    catalogo = None
+
+    def perform_authentication(self, request):
+        if request.method not in permissions.SAFE_METHODS or 'HTTP_AUTHORIZATION' in request.META:
+            super().perform_authentication(request)
+
+    def list(self, request, *args, **kwargs):
+        return self.respuesta_cacheada(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.respuesta_cacheada(request, super().retrieve, *args, **kwargs)
+
+    def respuesta_cacheada(self, request, vista, *args, **kwargs):
+        if not isinstance(request.accepted_renderer, JSONRenderer):
+            return vista(request, *args, **kwargs)
+
+        variante = f'{request.accepted_media_type}|{request.build_absolute_uri()}'
+        variante = hashlib.sha1(variante.encode()).hexdigest()
+        clave = f'catalogo:{self.catalogo}:{obtener_version(self.catalogo)}:{variante}'
+        entrada = cache.get(clave)
+        if entrada is None:
+            respuesta = vista(request, *args, **kwargs)
+            if respuesta.status_code != 200:
+                return respuesta
+            contenido = request.accepted_renderer.render(
+                respuesta.data, request.accepted_media_type, self.get_renderer_context()
+            )
+            entrada = (etag_de(contenido), contenido, request.accepted_media_type)
+            cache.set(clave, entrada, TIEMPO_RESPUESTA)
+
+        etag, contenido, tipo = entrada
+        return respuesta_json(contenido, etag, request, tipo)
+
+
+class GetCondicionalMixin:
+    """
+    Responde 304 a If-None-Match / If-Modified-Since sin serializar.
+
+    El ETag es débil: resume el usuario, la URL, el formato, las versiones
+    de los catálogos anidados y los validadores (fechas y conteos), no los
+    bytes de la respuesta.
+    """
+    # Campos cuyo máximo marca la última modificación de un listado
+    campos_modificacion = ('updated_at',)
+    # Catálogos versionados (ver CatalogoCacheMixin) que aparecen anidados
+    catalogos_anidados = ()
+
+    def validadores_lista(self, queryset, campos_modificacion=None):
+        """Cantidad de filas y fechas máximas del listado en una sola consulta"""
+        campos_modificacion = campos_modificacion or self.campos_modificacion
+        agregados = queryset.order_by().aggregate(
+            total=Count('pk'),
+            **{f'max_{i}': Max(campo) for i, campo in enumerate(campos_modificacion)}
+        )
+        fechas = [agregados[f'max_{i}'] for i in range(len(campos_modificacion))]
+        return [agregados['total'], *fechas], max(filter(None, fechas), default=None)
+
+    def lista_condicional(self, request, queryset, serializer_class=None, campos_modificacion=None):
+        """
+        Equivalente a ListModelMixin.list con validación condicional previa.
+
+        serializer_class y campos_modificacion reemplazan los de la vista
+        cuando el listado es de otro modelo (p. ej. una acción detail=True).
+        """
+        serializer_class = serializer_class or self.get_serializer_class()
+        partes, ultima = self.validadores_lista(queryset, campos_modificacion)
+        return self.respuesta_condicional(
+            request, partes, ultima, lambda: self.respuesta_lista(queryset, serializer_class)
+        )
+
+    def respuesta_lista(self, queryset, serializer_class):
+        """Pagina y serializa el listado (punto de extensión para otras serializaciones)"""
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = serializer_class(page, many=True, context=self.get_serializer_context())
+            return self.get_paginated_response(datos_medidos(serializer))
+        serializer = serializer_class(queryset, many=True, context=self.get_serializer_context())
+        return Response(datos_medidos(serializer))
+
+    def respuesta_condicional(self, request, partes, ultima, generar):
+        """Retorna 304 si el cliente tiene la versión actual; si no, llama a generar()"""
+        etag = self.etag_condicional(request, partes)
+        marca = int(ultima.timestamp()) if ultima else None
+        respuesta = get_conditional_response(request, etag=etag, last_modified=marca)
+        if respuesta is None:
+            respuesta = generar()
+        if respuesta.status_code in (200, 304):
+            respuesta['ETag'] = etag
+            if marca is not None:
+                respuesta['Last-Modified'] = http_date(marca)
+            patch_cache_control(respuesta, no_cache=True)
+        return respuesta
+
+    def etag_condicional(self, request, partes):
+        versiones = [obtener_version(catalogo) for catalogo in self.catalogos_anidados]
+        firma = '|'.join(str(parte) for parte in [
+            request.user.pk, request.accepted_media_type, request.build_absolute_uri(),
+            *versiones, *partes
+        ])
+        return 'W/' + quote_etag(hashlib.sha1(firma.encode()).hexdigest())
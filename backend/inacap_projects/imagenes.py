@@ -0,0 +1,177 @@
+"""
+Derivados de Proyecto.imagen y Usuario.avatar.
+
+Al subir una imagen se encola una tarea (tasks.cola) que, con Pillow,
+aplica la orientación EXIF, la reduce a cada tamaño de TAMANOS y la guarda
+como WebP y JPEG sin metadatos (sin EXIF ni GPS). Los nombres son
+deterministas (derivados/<original sin extensión>/<tamaño>.<ext>) así que
+regenerar sobrescribe en vez de acumular archivos.
+
+El resultado se guarda en el JSONField <campo>_derivados del modelo junto
+al nombre del original ('origen'); si el original cambia, save() vacía los
+derivados y se vuelven a generar. DerivadosField los expone como URLs, o
+null mientras no existan. `manage.py backfill_image_derivatives` procesa
+la media existente y se puede interrumpir y retomar.
+
+Si el archivo no es una imagen válida se guarda 'error' junto al origen y
+no se reintenta. Los demás errores (storage, E/S) se propagan: la cola
+reintenta la tarea con espera exponencial y, si se agotan los intentos, los
+derivados quedan vacíos y el backfill los vuelve a intentar.
+"""
+import io
+import logging
+import posixpath
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+from tasks.cola import tarea
+
+logger = logging.getLogger(__name__)
+
+# Tamaño -> (ancho, alto, recortar); sin recorte se ajusta dentro de la caja
+TAMANOS = {
+    'imagen': {
+        'miniatura': (480, 300, True),
+        'grande': (1280, 800, False),
+    },
+    'avatar': {
+        'miniatura': (96, 96, True),
+        'mediano': (320, 320, True),
+    },
+}
+
+# Formato de Pillow -> (extensión, opciones de guardado)
+FORMATOS = {
+    'WEBP': ('webp', {'quality': 80, 'method': 4}),
+    'JPEG': ('jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Errores del archivo mismo: reintentar no los arregla
+IMAGEN_INVALIDA = (UnidentifiedImageError, Image.DecompressionBombError)
+
+
+def campo_derivados(campo):
+    return f'{campo}_derivados'
+
+
+def ruta_derivado(nombre, tamano, extension):
+    base = posixpath.splitext(nombre)[0]
+    return f'derivados/{base}/{tamano}.{extension}'
+
+
+def sincronizar_derivados(instancia, campo, update_fields=None):
+    """
+    Vacía los derivados si ya no corresponden al archivo actual del campo.
+
+    Se llama desde save(); retorna update_fields con el campo de derivados
+    agregado cuando hace falta guardarlo.
+    """
+    if update_fields is not None and campo not in update_fields:
+        return update_fields
+    nombre = getattr(instancia, campo).name or None
+    destino = campo_derivados(campo)
+    if getattr(instancia, destino).get('origen') != nombre:
+        setattr(instancia, destino, {})
+    if update_fields is not None:
+        return {*update_fields, destino}
+    return update_fields
+
+
+def generar_derivados(storage, nombre, tamanos):
+    """Genera y guarda todos los derivados de `nombre`; retorna el dict para el modelo"""
+    with storage.open(nombre, 'rb') as archivo:
+        with Image.open(archivo) as original:
+            original = ImageOps.exif_transpose(original)
+            if original.mode not in ('RGB', 'RGBA'):
+                transparente = 'A' in original.getbands() or 'transparency' in original.info
+                original = original.convert('RGBA' if transparente else 'RGB')
+            derivados = {'origen': nombre}
+            for tamano, (ancho, alto, recortar) in tamanos.items():
+                if recortar:
+                    imagen = ImageOps.fit(original, (ancho, alto), Image.LANCZOS)
+                else:
+                    imagen = original.copy()
+                    imagen.thumbnail((ancho, alto), Image.LANCZOS)
+                derivados[tamano] = {}
+                for formato, (extension, opciones) in FORMATOS.items():
+                    salida = _sin_transparencia(imagen) if formato == 'JPEG' else imagen
+                    buffer = io.BytesIO()
+                    # Sin exif= ni icc_profile= Pillow no copia metadatos
+                    salida.save(buffer, formato, **opciones)
+                    ruta = ruta_derivado(nombre, tamano, extension)
+                    if storage.exists(ruta):
+                        storage.delete(ruta)
+                    derivados[tamano][extension] = storage.save(ruta, ContentFile(buffer.getvalue()))
+    return derivados
+
+
+def _sin_transparencia(imagen):
+    """JPEG no tiene canal alfa: lo transparente queda blanco y no negro"""
+    if imagen.mode != 'RGBA':
+        return imagen
+    fondo = Image.new('RGB', imagen.size, (255, 255, 255))
+    fondo.paste(imagen, mask=imagen.getchannel('A'))
+    return fondo
+
+
+def procesar(modelo, pk, campo, nombre):
+    """
+    Genera los derivados y los guarda si el campo sigue apuntando al mismo archivo.
+
+    Solo registra 'error' si el archivo no es una imagen válida; cualquier
+    otra excepción se propaga para que quien llama reintente.
+    """
+    storage = modelo._meta.get_field(campo).storage
+    try:
+        derivados = generar_derivados(storage, nombre, TAMANOS[campo])
+    except IMAGEN_INVALIDA as exc:
+        logger.warning('No se pudieron generar derivados de %s: %s', nombre, exc)
+        derivados = {'origen': nombre, 'error': str(exc)[:200]}
+    # updated_at cambia para que los ETag y la caché de usuarios embebidos lo noten
+    return modelo.objects.filter(pk=pk, **{campo: nombre}).update(**{
+        campo_derivados(campo): derivados, 'updated_at': timezone.now()
+    })
+
+
+@tarea(max_intentos=3)
+def generar_derivados_tarea(modelo, pk, campo, nombre):
+    procesar(apps.get_model(modelo), pk, campo, nombre)
+
+
+def encolar(instancia, campo):
+    """Encola la generación si el archivo actual no tiene derivados"""
+    nombre = getattr(instancia, campo).name
+    if not nombre or getattr(instancia, campo_derivados(campo)).get('origen') == nombre:
+        return
+    generar_derivados_tarea.encolar(instancia._meta.label, instancia.pk, campo, nombre)
+
+
+class DerivadosField(serializers.Field):
+    """URLs de los derivados {tamaño: {webp, jpg}}, o None si aún no existen"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        # Las URLs salen del mismo storage donde procesar() guardó los archivos
+        campo = self.source[:-len(campo_derivados(''))]
+        self.storage = parent.Meta.model._meta.get_field(campo).storage
+
+    def to_representation(self, derivados):
+        if not derivados or 'error' in derivados:
+            return None
+        request = self.context.get('request')
+        urls = {}
+        for tamano, archivos in derivados.items():
+            if tamano == 'origen':
+                continue
+            urls[tamano] = {}
+            for extension, ruta in archivos.items():
+                url = self.storage.url(ruta)
+                urls[tamano][extension] = request.build_absolute_uri(url) if request is not None else url
+        return urls
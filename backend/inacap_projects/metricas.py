@@ -0,0 +1,252 @@
+"""
+Métricas por petición: consultas SQL, tiempos y tamaño de la respuesta.
+
+MetricasMiddleware instala en cada conexión un execute_wrapper que cuenta
+las consultas y su duración, y separa cuatro tiempos: la vista sin
+serializar, la serialización (serializer.data de DRF y LecturaRapida, con
+las consultas perezosas que disparen), el render de la respuesta
+(JSONRenderer) y el total; db se superpone a los demás. Los publica en la
+cabecera Server-Timing, visible en las DevTools del navegador, y en una
+línea JSON del logger 'inacap_projects.metricas'. La línea sale con nivel
+WARNING si la petición supera METRICAS_LENTA_MS o si repite el mismo SQL
+METRICAS_N_MAS_1 veces o más (patrón N+1); en ese caso incluye las
+consultas repetidas.
+
+Una de cada METRICAS_MUESTREO_CONSULTAS peticiones (0 desactiva) agrega al
+log el SQL y la duración de cada consulta, sin parámetros. Las respuestas
+por partes (?format=json-stream) se miden mientras se emiten y se registran
+al terminar; su Server-Timing solo cubre hasta que termina la vista.
+
+La serialización la miden, con medir_serializacion(), los puntos donde el
+proyecto serializa: respuesta_lista, serializar(), los lotes por partes,
+LecturaRapida y serializer.data de los serializers con
+CamposDinamicosMixin (objetos sueltos). Solo cuenta el bloque más
+externo, así los anidados no suman dos veces. El costo fijo es un
+perf_counter() y un contador por consulta; no agrega consultas ni evalúa
+request.user si la vista no lo hizo.
+"""
+import json
+import logging
+import math
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.functional import SimpleLazyObject, empty
+
+logger = logging.getLogger(__name__)
+
+# Medición de la petición en curso (por hilo o tarea asyncio)
+_medicion_actual = ContextVar('medicion_actual', default=None)
+
+# Caracteres de SQL que se copian al log por consulta
+LARGO_SQL = 500
+
+# Lista de columnas de un SELECT; en el log se abrevia para que se vea el WHERE
+COLUMNAS_SELECT = re.compile(r'^SELECT (DISTINCT )?.+? FROM ', re.DOTALL)
+
+# Consultas repetidas que se listan en una petición marcada como N+1
+MAXIMO_REPETIDAS = 3
+
+
+def _ms(segundos):
+    return round(segundos * 1000, 2)
+
+
+def _resumir(sql):
+    return COLUMNAS_SELECT.sub(r'SELECT \1... FROM ', sql, count=1)[:LARGO_SQL]
+
+
+def percentil(ordenados, fraccion):
+    """Percentil por rango más cercano de una lista ya ordenada (p95: fraccion=0.95)"""
+    return ordenados[max(math.ceil(len(ordenados) * fraccion) - 1, 0)]
+
+
+@contextmanager
+def medir_serializacion():
+    """Suma el bloque al tiempo de serialización de la petición en curso"""
+    medicion = _medicion_actual.get()
+    if medicion is None or medicion.serializando:
+        yield
+        return
+    medicion.serializando = True
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicion.serializacion += time.perf_counter() - inicio
+        medicion.serializando = False
+
+
+def datos_medidos(serializer):
+    """serializer.data contado como serialización de la petición en curso"""
+    with medir_serializacion():
+        return serializer.data
+
+
+class Medicion:
+    """Tiempos de una petición; también es el execute_wrapper de sus consultas"""
+
+    def __init__(self, detallar):
+        self.inicio = time.perf_counter()
+        self.inicio_vista = self.fin_vista = self.fin = None
+        self.consultas = 0
+        self.db = 0.0
+        self.serializacion = self.serializacion_vista = 0.0
+        self.serializando = False
+        self.con_render = False
+        self.bytes = None
+        self.formas = Counter()
+        self.detalle = [] if detallar else None
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.consultas += 1
+            self.db += duracion
+            # El SQL de Django ya viene parametrizado: mismo texto, misma forma
+            self.formas[sql] += 1
+            if self.detalle is not None:
+                self.detalle.append({'sql': _resumir(sql), 'ms': _ms(duracion)})
+
+    @contextmanager
+    def activa(self):
+        """Registra las consultas de todas las conexiones y la serialización"""
+        token = _medicion_actual.set(self)
+        try:
+            with ExitStack() as pila:
+                for conexion in connections.all():
+                    pila.enter_context(conexion.execute_wrapper(self))
+                yield
+        finally:
+            _medicion_actual.reset(token)
+
+    def terminar_vista(self, con_render):
+        """Marca el fin de la vista; con_render si falta el render de DRF"""
+        if self.fin_vista is not None:
+            return
+        self.fin_vista = time.perf_counter()
+        # En las respuestas por partes se sigue serializando después de la vista
+        self.serializacion_vista = self.serializacion
+        self.con_render = con_render
+
+    def tiempos(self):
+        """(vista, serialización, render, total) en segundos; render es None si no hubo"""
+        fin = self.fin or time.perf_counter()
+        inicio_vista = self.inicio_vista or self.inicio
+        fin_vista = self.fin_vista or fin
+        vista = max(fin_vista - inicio_vista - self.serializacion_vista, 0.0)
+        render = fin - self.fin_vista if self.con_render else None
+        return vista, self.serializacion, render, fin - self.inicio
+
+    def repetidas(self, umbral):
+        return [
+            {'sql': _resumir(sql), 'veces': veces}
+            for sql, veces in self.formas.most_common(MAXIMO_REPETIDAS)
+            if veces >= umbral
+        ]
+
+    def server_timing(self):
+        vista, serializacion, render, total = self.tiempos()
+        metricas = [
+            f'db;dur={_ms(self.db)};desc="{self.consultas} consulta{"" if self.consultas == 1 else "s"}"',
+            f'vista;dur={_ms(vista)}',
+            f'serializacion;dur={_ms(serializacion)}',
+        ]
+        if render is not None:
+            metricas.append(f'render;dur={_ms(render)}')
+        metricas.append(f'total;dur={_ms(total)}')
+        return ', '.join(metricas)
+
+
+class MetricasMiddleware:
+    """Mide cada petición y publica las métricas en Server-Timing y en el log"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICAS_ACTIVAS', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'METRICAS_SERVER_TIMING', True)
+        self.umbral_n_mas_1 = getattr(settings, 'METRICAS_N_MAS_1', 5)
+        self.lenta = getattr(settings, 'METRICAS_LENTA_MS', 500) / 1000
+        self.muestreo = getattr(settings, 'METRICAS_MUESTREO_CONSULTAS', 0)
+
+    def __call__(self, request):
+        medicion = Medicion(detallar=self.muestreo > 0 and random.randrange(self.muestreo) == 0)
+        request._medicion = medicion
+        with medicion.activa():
+            response = self.get_response(request)
+        medicion.terminar_vista(con_render=False)
+
+        if response.streaming and not response.is_async:
+            response.streaming_content = self._emitir(request, response, medicion, response.streaming_content)
+        else:
+            medicion.fin = time.perf_counter()
+            if not response.streaming:
+                medicion.bytes = len(response.content)
+            self._registrar(request, response, medicion)
+        if self.server_timing:
+            response['Server-Timing'] = medicion.server_timing()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._medicion.inicio_vista = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # Respuestas DRF: la vista terminó y falta el render
+        request._medicion.terminar_vista(con_render=True)
+        return response
+
+    def _emitir(self, request, response, medicion, partes):
+        """Reemite una respuesta por partes midiendo lo que se genera al recorrerla"""
+        medicion.bytes = 0
+        try:
+            with medicion.activa():
+                for parte in partes:
+                    medicion.bytes += len(parte)
+                    yield parte
+        finally:
+            medicion.fin = time.perf_counter()
+            self._registrar(request, response, medicion)
+
+    def _registrar(self, request, response, medicion):
+        vista, serializacion, render, total = medicion.tiempos()
+        linea = {
+            'metodo': request.method,
+            'ruta': request.path,
+            'vista': request.resolver_match.view_name if request.resolver_match else None,
+            'status': response.status_code,
+            'usuario': _usuario_id(request),
+            'total_ms': _ms(total),
+            'vista_ms': _ms(vista),
+            'serializacion_ms': _ms(serializacion),
+            'render_ms': _ms(render) if render is not None else None,
+            'db_ms': _ms(medicion.db),
+            'consultas': medicion.consultas,
+            'bytes': medicion.bytes,
+        }
+        repetidas = medicion.repetidas(self.umbral_n_mas_1)
+        if repetidas:
+            linea['n_mas_1'] = repetidas
+        if medicion.detalle is not None:
+            linea['detalle_consultas'] = medicion.detalle
+        nivel = logging.WARNING if repetidas or total >= self.lenta else logging.INFO
+        if logger.isEnabledFor(nivel):
+            logger.log(nivel, json.dumps(linea, ensure_ascii=False, separators=(',', ':')))
+
+
+def _usuario_id(request):
+    """ID del usuario si la vista ya lo resolvió (sin consultar la sesión)"""
+    usuario = request.__dict__.get('user')
+    if isinstance(usuario, SimpleLazyObject) and usuario._wrapped is empty:
+        return None
+    return getattr(usuario, 'pk', None)
@@ -0,0 +1,146 @@
+"""
+Paginación por número de página con modo keyset opcional.
+
+Sin parámetros extra se comporta como PageNumberPagination. Con `?cursor=`
+(vacío para la primera página) pagina por (created_at, id) descendente:
+sin COUNT(*) ni OFFSET, usando los índices compuestos de cada modelo.
+Con `?count=false` el modo por página omite el COUNT(*).
+"""
+import base64
+import binascii
+from collections import OrderedDict
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPageNumberPagination(PageNumberPagination):
+    """PageNumberPagination con cursor keyset y conteo opcional"""
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    # Campo temporal del keyset; una vista puede cambiarlo con `cursor_field`
+    cursor_field = 'created_at'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.modo = 'pagina'
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        campo = getattr(view, 'cursor_field', self.cursor_field)
+        if self.cursor_query_param in request.query_params and self._orden_compatible(queryset, campo):
+            self.modo = 'cursor'
+            return self._paginar_por_cursor(queryset, request, campo, page_size)
+
+        if request.query_params.get(self.count_query_param, '').lower() in ('0', 'false', 'no'):
+            self.modo = 'sin_conteo'
+            return self._paginar_sin_conteo(queryset, request, page_size)
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def _orden_compatible(self, queryset, campo):
+        """El keyset solo aplica si el orden es -campo (y opcionalmente -id)"""
+        orden = tuple(queryset.query.order_by) or tuple(queryset.model._meta.ordering)
+        return orden in {(f'-{campo}',), (f'-{campo}', '-id'), (f'-{campo}', '-pk')}
+
+    def _paginar_por_cursor(self, queryset, request, campo, page_size):
+        cursor = request.query_params.get(self.cursor_query_param)
+        queryset = queryset.order_by(f'-{campo}', '-pk')
+        if cursor:
+            fecha, pk = self._decodificar_cursor(cursor)
+            queryset = queryset.filter(
+                Q(**{f'{campo}__lt': fecha}) | Q(**{campo: fecha, 'pk__lt': pk})
+            )
+
+        resultados = list(queryset[:page_size + 1])
+        self.siguiente = None
+        if len(resultados) > page_size:
+            resultados = resultados[:page_size]
+            ultimo = resultados[-1]
+            # Las filas pueden ser instancias o diccionarios de .values()
+            if isinstance(ultimo, dict):
+                self.siguiente = self._codificar_cursor(ultimo[campo], ultimo['pk'])
+            else:
+                self.siguiente = self._codificar_cursor(getattr(ultimo, campo), ultimo.pk)
+        return resultados
+
+    def _paginar_sin_conteo(self, queryset, request, page_size):
+        try:
+            numero = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            numero = 0
+        if numero < 1:
+            raise NotFound(self.invalid_page_message)
+
+        inicio = (numero - 1) * page_size
+        resultados = list(queryset[inicio:inicio + page_size + 1])
+        if not resultados and numero > 1:
+            raise NotFound(self.invalid_page_message)
+        self.numero = numero
+        self.hay_siguiente = len(resultados) > page_size
+        return resultados[:page_size]
+
+    def _codificar_cursor(self, fecha, pk):
+        crudo = f'{fecha.isoformat()}|{pk}'.encode()
+        return base64.urlsafe_b64encode(crudo).decode().rstrip('=')
+
+    def _decodificar_cursor(self, cursor):
+        try:
+            relleno = '=' * (-len(cursor) % 4)
+            fecha, pk = base64.urlsafe_b64decode(cursor + relleno).decode().split('|')
+            return datetime.fromisoformat(fecha), int(pk)
+        except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+            raise NotFound('Cursor inválido.')
+
+    def get_paginated_response(self, data):
+        if self.modo == 'cursor':
+            return Response(OrderedDict([
+                ('next', self.get_next_link()),
+                ('previous', None),
+                ('results', data),
+            ]))
+        if self.modo == 'sin_conteo':
+            return Response(OrderedDict([
+                ('count', None),
+                ('next', self.get_next_link()),
+                ('previous', self.get_previous_link()),
+                ('results', data),
+            ]))
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        url = self.request.build_absolute_uri()
+        if self.modo == 'cursor':
+            if not self.siguiente:
+                return None
+            return replace_query_param(url, self.cursor_query_param, self.siguiente)
+        if self.modo == 'sin_conteo':
+            if not self.hay_siguiente:
+                return None
+            return replace_query_param(url, self.page_query_param, self.numero + 1)
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.modo == 'sin_conteo':
+            if self.numero == 1:
+                return None
+            url = self.request.build_absolute_uri()
+            if self.numero == 2:
+                return remove_query_param(url, self.page_query_param)
+            return replace_query_param(url, self.page_query_param, self.numero - 1)
+        return super().get_previous_link()
+
+    def get_paginated_response_schema(self, schema):
+        esquema = super().get_paginated_response_schema(schema)
+        esquema['properties']['count']['nullable'] = True
+        return esquema
+
+    def get_html_context(self):
+        if self.modo != 'pagina':
+            return {'previous_url': self.get_previous_link(), 'next_url': self.get_next_link(), 'page_links': []}
+        return super().get_html_context()
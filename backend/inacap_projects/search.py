@@ -0,0 +1,364 @@
+"""
+Búsqueda de texto completo para proyectos y usuarios.
+
+Cada modelo buscable guarda en `texto_busqueda` sus términos ya
+normalizados (sin tildes, en minúsculas y sin plural), calculados al
+guardar. Sobre esa columna se consulta un índice de texto: FULLTEXT en
+MySQL, una tabla virtual FTS5 en SQLite y, como respaldo (pruebas o SQLite
+sin FTS5), un índice invertido en memoria. El motor se elige con el
+setting SEARCH_BACKEND ('auto', 'mysql', 'fts5' o 'memoria'). Todos anotan
+`relevancia` (mayor es mejor) sobre el queryset.
+"""
+import bisect
+import math
+import re
+import sys
+import threading
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+COLUMNA_BUSQUEDA = 'texto_busqueda'
+
+# Máximo de resultados rankeados que el índice en memoria entrega al queryset
+LIMITE_RESULTADOS = 1000
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Consonantes tras las que el plural se forma con -es (redes, canciones, mujeres)
+CONSONANTES_PLURAL_ES = set('dlnrjz')
+
+
+def normalizar(texto):
+    """Pasa a minúsculas y quita tildes y diéresis ("Diseño" -> "diseno")"""
+    descompuesto = unicodedata.normalize('NFKD', (texto or '').casefold())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def raiz(termino):
+    """Raíz ligera en español: quita el plural conservando el resto"""
+    if len(termino) > 4 and termino.endswith('es') and termino[-3] in CONSONANTES_PLURAL_ES:
+        return termino[:-2]
+    if len(termino) > 3 and termino.endswith('s') and termino[-2] in 'aeiou':
+        return termino[:-1]
+    return termino
+
+
+def tokenizar(texto):
+    """Divide un texto en términos normalizados y reducidos a su raíz"""
+    return [raiz(termino) for termino in TOKEN_RE.findall(normalizar(texto))]
+
+
+def documento_busqueda(*valores):
+    """Construye el contenido de texto_busqueda a partir de varios campos"""
+    return ' '.join(termino for valor in valores for termino in tokenizar(valor))
+
+
+class MySQLFullTextBackend:
+    """Búsqueda con MATCH ... AGAINST sobre el índice FULLTEXT"""
+
+    def filtrar(self, queryset, terminos):
+        # Modo booleano: todos los términos son obligatorios y admiten prefijo
+        consulta = ' '.join(f'+{termino}*' for termino in terminos)
+        relevancia = RawSQL(
+            f'MATCH ({COLUMNA_BUSQUEDA}) AGAINST (%s IN BOOLEAN MODE)', (consulta,),
+            output_field=FloatField()
+        )
+        return queryset.annotate(relevancia=relevancia).filter(relevancia__gt=0)
+
+
+class FTS5Backend:
+    """Búsqueda sobre la tabla virtual FTS5, sincronizada con triggers"""
+
+    def filtrar(self, queryset, terminos):
+        consulta = ' AND '.join(f'"{termino}"*' for termino in terminos)
+        tabla = queryset.model._meta.db_table
+        tabla_fts = f'{tabla}_fts'
+        # bm25() es negativo: cuanto menor, más relevante
+        relevancia = RawSQL(
+            f'(SELECT -bm25({tabla_fts}) FROM {tabla_fts} '
+            f'WHERE {tabla_fts} MATCH %s AND rowid = {tabla}.id)',
+            (consulta,),
+            output_field=FloatField()
+        )
+        coincidencias = RawSQL(
+            f'SELECT rowid FROM {tabla_fts} WHERE {tabla_fts} MATCH %s', (consulta,)
+        )
+        return queryset.filter(pk__in=coincidencias).annotate(relevancia=relevancia)
+
+
+class MemoriaBackend:
+    """
+    Índice invertido en memoria de término -> {id: frecuencia} para un modelo.
+
+    Se construye una vez desde texto_busqueda y se mantiene con las señales
+    post_save/post_delete del modelo. Pensado para pruebas y entornos sin FTS.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._lock = threading.Lock()
+        self._construido = False
+        self._postings = defaultdict(dict)
+        self._vocabulario = []
+        self._terminos_por_objeto = {}
+
+    def construir(self):
+        with self._lock:
+            self._postings.clear()
+            self._terminos_por_objeto.clear()
+            filas = self.model.objects.order_by().values_list('pk', COLUMNA_BUSQUEDA)
+            for pk, texto in filas.iterator(chunk_size=2000):
+                self._indexar(pk, texto)
+            self._vocabulario = sorted(self._postings)
+            self._construido = True
+
+    def _indexar(self, pk, texto):
+        frecuencias = defaultdict(int)
+        for termino in (texto or '').split():
+            frecuencias[termino] += 1
+        for termino, frecuencia in frecuencias.items():
+            self._postings[termino][pk] = frecuencia
+        self._terminos_por_objeto[pk] = list(frecuencias)
+
+    def _desindexar(self, pk):
+        for termino in self._terminos_por_objeto.pop(pk, ()):
+            postings = self._postings.get(termino)
+            if postings is not None:
+                postings.pop(pk, None)
+                if not postings:
+                    del self._postings[termino]
+                    indice = bisect.bisect_left(self._vocabulario, termino)
+                    if indice < len(self._vocabulario) and self._vocabulario[indice] == termino:
+                        del self._vocabulario[indice]
+
+    def actualizar(self, instancia):
+        """Reindexa un objeto tras guardarlo"""
+        if not self._construido:
+            return
+        with self._lock:
+            self._desindexar(instancia.pk)
+            self._indexar(instancia.pk, getattr(instancia, COLUMNA_BUSQUEDA))
+            for termino in self._terminos_por_objeto[instancia.pk]:
+                indice = bisect.bisect_left(self._vocabulario, termino)
+                if indice == len(self._vocabulario) or self._vocabulario[indice] != termino:
+                    self._vocabulario.insert(indice, termino)
+
+    def eliminar(self, pk):
+        """Quita un objeto eliminado del índice"""
+        if not self._construido:
+            return
+        with self._lock:
+            self._desindexar(pk)
+
+    def puntajes(self, terminos):
+        """Retorna {id: puntaje} de los objetos que contienen todos los términos"""
+        if not self._construido:
+            self.construir()
+        with self._lock:
+            total = max(len(self._terminos_por_objeto), 1)
+            resultado = None
+            for termino in terminos:
+                # Cada término coincide por prefijo con el vocabulario
+                acumulado = defaultdict(float)
+                indice = bisect.bisect_left(self._vocabulario, termino)
+                while indice < len(self._vocabulario) and self._vocabulario[indice].startswith(termino):
+                    postings = self._postings[self._vocabulario[indice]]
+                    idf = math.log(1 + total / len(postings))
+                    for pk, frecuencia in postings.items():
+                        acumulado[pk] += frecuencia * idf
+                    indice += 1
+                if resultado is None:
+                    resultado = acumulado
+                else:
+                    resultado = {pk: puntaje + acumulado[pk] for pk, puntaje in resultado.items() if pk in acumulado}
+                if not resultado:
+                    return {}
+            return resultado or {}
+
+    def filtrar(self, queryset, terminos):
+        puntajes = self.puntajes(terminos)
+        mejores = sorted(puntajes.items(), key=lambda item: item[1], reverse=True)[:LIMITE_RESULTADOS]
+        if not mejores:
+            return queryset.none().annotate(relevancia=Value(0.0, output_field=FloatField()))
+        relevancia = Case(
+            *[When(pk=pk, then=Value(puntaje)) for pk, puntaje in mejores],
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+        return queryset.filter(pk__in=[pk for pk, _ in mejores]).annotate(relevancia=relevancia)
+
+
+_indices_memoria = {}
+_tablas_fts = None
+
+
+def indice_memoria(model):
+    """Retorna el índice en memoria del modelo (creado a demanda)"""
+    if model not in _indices_memoria:
+        _indices_memoria[model] = MemoriaBackend(model)
+    return _indices_memoria[model]
+
+
+def tabla_fts_disponible(model):
+    """Verifica si la migración pudo crear la tabla FTS5 del modelo"""
+    global _tablas_fts
+    if _tablas_fts is None:
+        with connection.cursor() as cursor:
+            _tablas_fts = {
+                tabla for tabla in connection.introspection.table_names(cursor)
+                if tabla.endswith('_fts')
+            }
+    return f'{model._meta.db_table}_fts' in _tablas_fts
+
+
+def obtener_backend(model):
+    """Retorna el motor de búsqueda configurado o el adecuado para la BD"""
+    nombre = getattr(settings, 'SEARCH_BACKEND', 'auto')
+    if nombre == 'auto':
+        if connection.vendor == 'mysql':
+            nombre = 'mysql'
+        elif connection.vendor == 'sqlite' and tabla_fts_disponible(model):
+            nombre = 'fts5'
+        else:
+            nombre = 'memoria'
+    if nombre == 'mysql':
+        return MySQLFullTextBackend()
+    if nombre == 'fts5':
+        return FTS5Backend()
+    return indice_memoria(model)
+
+
+class TextoCompletoSearchFilter(SearchFilter):
+    """
+    SearchFilter que consulta el índice de texto completo del modelo.
+
+    Si la petición no indica `ordering`, los resultados se ordenan por
+    relevancia; por eso debe ir después de OrderingFilter en la vista.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terminos = [
+            termino
+            for texto in self.get_search_terms(request)
+            for termino in tokenizar(texto)
+        ]
+        if not terminos:
+            return queryset
+
+        queryset = obtener_backend(queryset.model).filtrar(queryset, terminos)
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-relevancia', *queryset.model._meta.ordering)
+        return queryset
+
+
+def crear_indice_texto(schema_editor, tabla):
+    """
+    Crea el índice de texto sobre texto_busqueda (para usar en migraciones).
+
+    En SQLite, toda migración que reconstruye la tabla (AddField con default
+    no literal, AlterField...) borra los triggers; reparar_indices_texto los
+    vuelve a crear al terminar migrate.
+    """
+    connection = schema_editor.connection
+    columna = COLUMNA_BUSQUEDA
+    if connection.vendor == 'mysql':
+        schema_editor.execute(f'CREATE FULLTEXT INDEX {tabla}_fulltext ON {tabla} ({columna})')
+        return
+    if connection.vendor != 'sqlite':
+        return
+
+    tabla_fts = f'{tabla}_fts'
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        (fts5_compilado,) = cursor.fetchone()
+    try:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {tabla_fts} USING fts5({columna}, "
+            f"content='{tabla}', content_rowid='id')"
+        )
+    except Exception:
+        if fts5_compilado:
+            raise
+        # Sin FTS5 se usará el índice en memoria
+        return
+
+    # Triggers que mantienen la tabla FTS sincronizada con la tabla base
+    schema_editor.execute(
+        f"CREATE TRIGGER {tabla_fts}_ai AFTER INSERT ON {tabla} BEGIN "
+        f"INSERT INTO {tabla_fts}(rowid, {columna}) VALUES (new.id, new.{columna}); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {tabla_fts}_ad AFTER DELETE ON {tabla} BEGIN "
+        f"INSERT INTO {tabla_fts}({tabla_fts}, rowid, {columna}) "
+        f"VALUES ('delete', old.id, old.{columna}); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {tabla_fts}_au AFTER UPDATE OF {columna} ON {tabla} BEGIN "
+        f"INSERT INTO {tabla_fts}({tabla_fts}, rowid, {columna}) "
+        f"VALUES ('delete', old.id, old.{columna}); "
+        f"INSERT INTO {tabla_fts}(rowid, {columna}) VALUES (new.id, new.{columna}); END"
+    )
+    schema_editor.execute(f"INSERT INTO {tabla_fts}({tabla_fts}) VALUES ('rebuild')")
+
+
+def eliminar_indice_texto(schema_editor, tabla):
+    """Elimina el índice creado por crear_indice_texto"""
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        schema_editor.execute(f'DROP INDEX {tabla}_fulltext ON {tabla}')
+    elif connection.vendor == 'sqlite':
+        for sufijo in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {tabla}_fts_{sufijo}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {tabla}_fts')
+
+
+def indice_texto_completo(connection, tabla):
+    """True si en SQLite existen la tabla FTS5 de `tabla` y sus tres triggers"""
+    tabla_fts = f'{tabla}_fts'
+    nombres = {tabla_fts, *(f'{tabla_fts}_{sufijo}' for sufijo in ('ai', 'ad', 'au'))}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(nombres))})",
+            sorted(nombres)
+        )
+        return {nombre for (nombre,) in cursor.fetchall()} == nombres
+
+
+def reparar_indices_texto(sender, using, verbosity=1, **kwargs):
+    """
+    Receptor de post_migrate: en SQLite recrea el índice FTS5 si le falta algo.
+
+    Cubre las migraciones que reconstruyen la tabla sin llamar a
+    crear_indice_texto; sin esto la búsqueda quedaría desfasada sin error.
+    """
+    global _tablas_fts
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        tablas = set(connection.introspection.table_names(cursor))
+        for model in sender.get_models():
+            tabla = model._meta.db_table
+            if tabla not in tablas or not any(
+                campo.name == COLUMNA_BUSQUEDA for campo in model._meta.concrete_fields
+            ):
+                continue
+            # Migrado hacia atrás, antes de que existiera la columna
+            columnas = connection.introspection.get_table_description(cursor, tabla)
+            if COLUMNA_BUSQUEDA not in {columna.name for columna in columnas}:
+                continue
+            if indice_texto_completo(connection, tabla):
+                continue
+            with connection.schema_editor() as schema_editor:
+                eliminar_indice_texto(schema_editor, tabla)
+                crear_indice_texto(schema_editor, tabla)
+            _tablas_fts = None
+            if verbosity >= 1:
+                kwargs.get('stdout', sys.stdout).write(f'  Índice de texto de {tabla} recreado\n')
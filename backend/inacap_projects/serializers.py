@@ -0,0 +1,101 @@
+"""
+Forma de respuesta elegida por el cliente: ?fields= y ?expand=.
+
+`?fields=id,titulo,creador.nombre` limita los campos de cada nivel; un campo
+anidado sin subcampos conserva su forma por defecto. `?expand=creador`
+reemplaza el resumen anidado por la versión completa declarada en
+`expandibles`; `?expand=proyecto.creador` expande ambos niveles.
+
+Solo aplica a métodos de lectura: en escritura los serializers mantienen
+todos sus campos para validar. optimizar_queryset() recorre los campos que
+realmente se van a serializar y arma select_related/prefetch_related con
+ellos, así las relaciones no pedidas no se consultan.
+"""
+from rest_framework import permissions
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import BaseSerializer, ListSerializer
+
+from inacap_projects.metricas import datos_medidos, medir_serializacion
+
+PARAMETRO_CAMPOS = 'fields'
+PARAMETRO_EXPANDIR = 'expand'
+
+
+def _rutas(request, parametro):
+    valor = request.query_params.get(parametro, '')
+    return [ruta.strip() for ruta in valor.split(',') if ruta.strip()]
+
+
+def _nivel(rutas, prefijo):
+    """Nombres del primer nivel bajo `prefijo` ('' para la raíz)"""
+    return {
+        ruta[len(prefijo):].split('.')[0]
+        for ruta in rutas if ruta.startswith(prefijo) and len(ruta) > len(prefijo)
+    }
+
+
+class CamposDinamicosMixin:
+    """Aplica ?fields= y ?expand= de la petición en el contexto"""
+    # Campo -> serializer completo que reemplaza al resumen con ?expand=
+    expandibles = {}
+
+    @property
+    def data(self):
+        # Objetos sueltos (retrieve, create, update); los listados se miden donde se arman
+        with medir_serializacion():
+            return super().data
+
+    def get_fields(self):
+        campos = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return campos
+
+        prefijo = getattr(self, '_prefijo', '')
+        for nombre in _nivel(_rutas(request, PARAMETRO_EXPANDIR), prefijo):
+            if nombre in self.expandibles and nombre in campos:
+                declarado = campos[nombre]
+                campos[nombre] = self.expandibles[nombre](*declarado._args, **declarado._kwargs)
+
+        solicitados = _nivel(_rutas(request, PARAMETRO_CAMPOS), prefijo)
+        if solicitados:
+            campos = {nombre: campo for nombre, campo in campos.items() if nombre in solicitados}
+
+        for nombre, campo in campos.items():
+            anidado = getattr(campo, 'child', campo)
+            if isinstance(anidado, CamposDinamicosMixin):
+                anidado._prefijo = f'{prefijo}{nombre}.'
+        return campos
+
+
+def optimizar_queryset(queryset, serializer):
+    """Agrega select_related/prefetch_related para los campos que va a leer `serializer`"""
+    seleccionar, precargar = [], []
+    _recorrer(serializer, '', True, seleccionar, precargar)
+    if seleccionar:
+        queryset = queryset.select_related(*seleccionar)
+    if precargar:
+        queryset = queryset.prefetch_related(*precargar)
+    return queryset
+
+
+def serializar(serializer_class, queryset, context):
+    """Serializa `queryset` (many=True) cargando solo las relaciones visibles"""
+    queryset = optimizar_queryset(queryset, serializer_class(context=context))
+    return datos_medidos(serializer_class(queryset, many=True, context=context))
+
+
+def _recorrer(serializer, prefijo, con_join, seleccionar, precargar):
+    serializer = getattr(serializer, 'child', serializer)
+    for campo in serializer.fields.values():
+        if campo.write_only or campo.source == '*':
+            continue
+        ruta = prefijo + campo.source.replace('.', '__')
+        if isinstance(campo, (ListSerializer, ManyRelatedField)):
+            precargar.append(ruta)
+            if isinstance(campo, ListSerializer):
+                _recorrer(campo.child, f'{ruta}__', False, seleccionar, precargar)
+        elif isinstance(campo, BaseSerializer):
+            # Dentro de un prefetch cada nivel es otra consulta en bloque
+            (seleccionar if con_join else precargar).append(ruta)
+            _recorrer(campo, f'{ruta}__', con_join, seleccionar, precargar)
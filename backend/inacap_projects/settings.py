@@ -41,9 +41,12 @@ INSTALLED_APPS = [
     # Local apps
     'users',
     'projects',
+    'tasks',
 ]
 
 MIDDLEWARE = [
+    # Primero, para que el total incluya a los demás middlewares
+    'inacap_projects.metricas.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -104,6 +107,25 @@ else:
     }
 
 
+# Cache
+# 'locmem' es local a cada proceso; 'file' y 'db' se comparten entre procesos
+# sin servicios externos ('db' requiere `manage.py createcachetable`)
+
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'inacap-projects'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'cache_table'),
+}
+_cache_backend, _cache_location = CACHE_BACKENDS[config('CACHE_BACKEND', default='locmem')]
+
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': config('CACHE_LOCATION', default=_cache_location),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -155,7 +177,7 @@ AUTH_USER_MODEL = 'users.Usuario'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -165,10 +187,70 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'inacap_projects.pagination.KeysetPageNumberPagination',
     'PAGE_SIZE': 10,
 }
 
+# Máximo de usuarios embebidos cacheados por proceso (users.embebidos)
+CACHE_USUARIOS_EMBEBIDOS = config('CACHE_USUARIOS_EMBEBIDOS', default=2048, cast=int)
+
+# Segundos que se cachea el estado del usuario autenticado por JWT (0 desactiva)
+JWT_CACHE_USUARIO_TTL = config('JWT_CACHE_USUARIO_TTL', default=60, cast=int)
+
+# Segundos que se guardan las estadísticas del perfil (users.estadisticas)
+ESTADISTICAS_PERFIL_TTL = config('ESTADISTICAS_PERFIL_TTL', default=600, cast=int)
+
+# Cola de tareas en segundo plano (tasks.cola, `manage.py run_worker`)
+# TAREAS_EN_LINEA ejecuta las tareas en el mismo proceso al confirmar (sin worker)
+TAREAS_EN_LINEA = config('TAREAS_EN_LINEA', default=False, cast=bool)
+TAREAS_CONCURRENCIA = config('TAREAS_CONCURRENCIA', default=2, cast=int)
+TAREAS_MAX_INTENTOS = config('TAREAS_MAX_INTENTOS', default=5, cast=int)
+# Espera antes del primer reintento; se duplica en cada fallo hasta el máximo
+TAREAS_BACKOFF = config('TAREAS_BACKOFF', default=10, cast=int)
+TAREAS_BACKOFF_MAX = config('TAREAS_BACKOFF_MAX', default=3600, cast=int)
+# Segundos tras los que una tarea EN_CURSO se da por abandonada
+TAREAS_TIMEOUT = config('TAREAS_TIMEOUT', default=600, cast=int)
+TAREAS_RETENCION_DIAS = config('TAREAS_RETENCION_DIAS', default=7, cast=int)
+
+# Métricas por petición (inacap_projects.metricas): Server-Timing y log JSON
+METRICAS_ACTIVAS = config('METRICAS_ACTIVAS', default=True, cast=bool)
+METRICAS_SERVER_TIMING = config('METRICAS_SERVER_TIMING', default=True, cast=bool)
+# Veces que se repite un mismo SQL en una petición para marcarla como N+1
+METRICAS_N_MAS_1 = config('METRICAS_N_MAS_1', default=5, cast=int)
+# Peticiones más lentas que esto se registran como WARNING
+METRICAS_LENTA_MS = config('METRICAS_LENTA_MS', default=500, cast=int)
+# Registra el SQL de cada consulta en una de cada N peticiones (0 desactiva)
+METRICAS_MUESTREO_CONSULTAS = config('METRICAS_MUESTREO_CONSULTAS', default=0, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'mensaje': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'metricas': {'class': 'logging.StreamHandler', 'formatter': 'mensaje'},
+    },
+    'loggers': {
+        # Una línea JSON por petición; WARNING deja solo las lentas y las N+1
+        'inacap_projects.metricas': {
+            'handlers': ['metricas'],
+            'level': config('METRICAS_LOG_NIVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Serialización rápida de los listados de proyectos (projects.lectura_rapida)
+LECTURA_RAPIDA = config('LECTURA_RAPIDA', default=True, cast=bool)
+
+# Motor de búsqueda de proyectos y usuarios: 'auto', 'mysql', 'fts5' o 'memoria'
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='auto')
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=5),
@@ -0,0 +1,88 @@
+"""
+Listados completos emitidos por partes: ?format=json-stream.
+
+Solo lo aceptan las acciones de exportación que la vista declara en
+`acciones_streaming`; el renderer no está en DEFAULT_RENDERER_CLASSES, así
+que en cualquier otra ruta ese formato responde 404. Con él los listados no
+se paginan: se recorre el queryset con .iterator() en lotes de
+`tamano_lote` filas, cada lote se serializa y se escribe en un
+StreamingHttpResponse, y el lote anterior queda libre. La memoria del
+proceso no crece con el número de filas. El cuerpo es el mismo arreglo JSON
+que entregaría JSONRenderer con la lista completa.
+
+Si la vista tiene lectura rápida (projects.lectura_rapida) los lotes se
+arman con ella. En MySQL el driver igual recibe el resultado completo de
+cada consulta; lo que se mantiene constante son los objetos Python.
+`manage.py bench_streaming` compara throughput y RSS con JSONRenderer.
+"""
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from inacap_projects.metricas import datos_medidos
+
+TAMANO_LOTE = 500
+
+
+class JSONStreamingRenderer(JSONRenderer):
+    """JSONRenderer que además sabe emitir un arreglo lote a lote"""
+    format = 'json-stream'
+
+    def render_lotes(self, lotes):
+        """Genera '[', los elementos de cada lote separados por ',' y ']'"""
+        yield b'['
+        separador = b''
+        for lote in lotes:
+            if not lote:
+                continue
+            # render() de una lista compacta es '[a,b,...]': se quitan los corchetes
+            yield separador + self.render(lote)[1:-1]
+            separador = b','
+        yield b']'
+
+
+def _agrupar(filas, tamano):
+    filas = iter(filas)
+    while lote := list(islice(filas, tamano)):
+        yield lote
+
+
+def lotes_serializados(queryset, serializer_class, context, lectura=None, tamano=TAMANO_LOTE):
+    """Serializa `queryset` por lotes de `tamano` filas, con `lectura` si se entrega"""
+    if lectura is not None:
+        for lote in _agrupar(lectura.filas(queryset).iterator(chunk_size=tamano), tamano):
+            yield lectura.serializar(lote)
+        return
+    # Desde Django 4.1 iterator(chunk_size) aplica los prefetch_related por lote
+    for lote in _agrupar(queryset.iterator(chunk_size=tamano), tamano):
+        yield datos_medidos(serializer_class(lote, many=True, context=context))
+
+
+class ListaStreamingMixin:
+    """Emite respuesta_lista por partes cuando se pide ?format=json-stream"""
+    tamano_lote = TAMANO_LOTE
+    # Acciones que aceptan ?format=json-stream
+    acciones_streaming = ()
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action in self.acciones_streaming:
+            renderers.append(JSONStreamingRenderer())
+        return renderers
+
+    def quiere_streaming(self):
+        return isinstance(getattr(self.request, 'accepted_renderer', None), JSONStreamingRenderer)
+
+    def respuesta_lista(self, queryset, serializer_class):
+        if self.quiere_streaming():
+            return self.respuesta_streaming(queryset, serializer_class)
+        return super().respuesta_lista(queryset, serializer_class)
+
+    def respuesta_streaming(self, queryset, serializer_class):
+        lectura = self.lectura_rapida(serializer_class) if hasattr(self, 'lectura_rapida') else None
+        lotes = lotes_serializados(
+            queryset, serializer_class, self.get_serializer_context(), lectura, self.tamano_lote
+        )
+        renderer = self.request.accepted_renderer
+        return StreamingHttpResponse(renderer.render_lotes(lotes), content_type=renderer.media_type)
@@ -0,0 +1,11 @@
+from django_filters import rest_framework as filters
+from .models import Proyecto
+
+
+class ProyectoFilter(filters.FilterSet):
+    """Filtros para proyectos, incluyendo vacantes calculadas en SQL"""
+    tiene_vacantes = filters.BooleanFilter(field_name='con_vacantes')
+    
+    class Meta:
+        model = Proyecto
+        fields = ['estado', 'disciplinas_requeridas', 'creador', 'tiene_vacantes']
@@ -0,0 +1,198 @@
+"""
+Serialización rápida de solo lectura para los listados.
+
+ProyectoListSerializer, ColaboracionSerializer y ComentarioSerializer se
+compilan a una lista de accesores sobre las filas de .values(): cada campo
+lee su columna y solo se convierte con el to_representation del campo DRF
+cuando el valor de la base de datos no es ya su representación. Las listas
+anidadas (M2M) se cargan con una consulta por relación para toda la página.
+
+El JSON resultante es idéntico byte a byte al de los serializers DRF; lo
+verifica `manage.py check_fast_serializers` y `manage.py bench_serializers`
+mide el costo por fila. Si la forma pedida no se puede compilar (?fields=,
+?expand= o campos sin equivalente en columnas) se usa el serializer DRF.
+"""
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from inacap_projects.metricas import medir_serializacion
+from inacap_projects.serializers import PARAMETRO_CAMPOS, PARAMETRO_EXPANDIR
+from .models import Proyecto
+from .serializers import ProyectoListSerializer, ColaboracionSerializer, ComentarioSerializer
+
+SERIALIZERS_RAPIDOS = (ProyectoListSerializer, ColaboracionSerializer, ComentarioSerializer)
+
+# Propiedades de modelo -> (columnas, función) que las calculan desde .values()
+PROPIEDADES = {
+    (Proyecto, 'colaboradores_actuales'): (('num_colaboradores',), lambda num: num),
+    (Proyecto, 'tiene_vacantes'): (
+        ('num_colaboradores', 'colaboradores_necesarios'),
+        lambda num, necesarios: num < necesarios
+    ),
+}
+
+# Campos DRF cuya representación es el mismo valor que entrega la base de datos
+IDENTIDAD = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+
+
+class NoCompilable(Exception):
+    """La forma del serializer no tiene equivalente sobre .values()"""
+
+
+class LecturaRapida:
+    """Serializer de solo lectura compilado a accesores sobre filas de .values()"""
+
+    def __init__(self, serializer):
+        self.modelo = serializer.Meta.model
+        self.request = serializer.context.get('request')
+        self.columnas = ['pk']
+        # (ruta, columnas, accesores, orden) de cada lista M2M de primer nivel
+        self.listas = []
+        self.accesores = self._compilar(serializer, '', self.modelo, self.columnas)
+
+    def filas(self, queryset, *extra):
+        """El queryset como filas de .values() con las columnas necesarias"""
+        columnas = dict.fromkeys([*self.columnas, *extra])
+        return queryset.prefetch_related(None).values(*columnas)
+
+    def serializar(self, filas):
+        with medir_serializacion():
+            filas = list(filas)
+            return self.armar(filas, self.cargar_listas([fila['pk'] for fila in filas]))
+
+    def armar(self, filas, listas):
+        """Arma la representación de cada fila con las listas M2M ya cargadas"""
+        accesores = self.accesores
+        return [{nombre: accesor(fila, listas) for nombre, accesor in accesores} for fila in filas]
+
+    def cargar_listas(self, pks):
+        """Una consulta por relación M2M: {ruta: {pk: [elementos]}}"""
+        listas = {}
+        for ruta, columnas, accesores, orden in self.listas:
+            agrupadas = {}
+            filas = self.modelo.objects.filter(pk__in=pks).order_by(*orden).values('pk', *columnas)
+            for fila in filas:
+                if fila[f'{ruta}__pk'] is not None:
+                    agrupadas.setdefault(fila['pk'], []).append(
+                        {nombre: accesor(fila, None) for nombre, accesor in accesores}
+                    )
+            listas[ruta] = agrupadas
+        return listas
+
+    def _compilar(self, serializer, prefijo, modelo, columnas):
+        accesores = []
+        for nombre, campo in serializer.fields.items():
+            if campo.write_only:
+                continue
+            if campo.source == '*' or '.' in campo.source:
+                raise NoCompilable(nombre)
+            accesores.append((nombre, self._accesor(campo, prefijo, modelo, columnas)))
+        return accesores
+
+    def _accesor(self, campo, prefijo, modelo, columnas):
+        source = campo.source
+        ruta = prefijo + source
+        try:
+            campo_modelo = modelo._meta.get_field(source)
+        except FieldDoesNotExist:
+            campo_modelo = None
+
+        if isinstance(campo, serializers.ListSerializer):
+            if prefijo or campo_modelo is None or not campo_modelo.many_to_many:
+                raise NoCompilable(source)
+            relacionado = campo_modelo.related_model
+            columnas_lista = [f'{ruta}__pk']
+            accesores = self._compilar(campo.child, f'{ruta}__', relacionado, columnas_lista)
+            orden = [
+                f'-{ruta}__{campo_orden[1:]}' if campo_orden.startswith('-') else f'{ruta}__{campo_orden}'
+                for campo_orden in relacionado._meta.ordering
+            ]
+            self.listas.append((ruta, columnas_lista, accesores, [*orden, f'{ruta}__pk']))
+            return lambda fila, listas: listas[ruta].get(fila['pk'], [])
+
+        if isinstance(campo, serializers.BaseSerializer):
+            if campo_modelo is None or not (campo_modelo.many_to_one or campo_modelo.one_to_one):
+                raise NoCompilable(source)
+            columnas.append(ruta)
+            hijos = self._compilar(campo, f'{ruta}__', campo_modelo.related_model, columnas)
+            return lambda fila, listas: None if fila[ruta] is None else {
+                nombre: accesor(fila, listas) for nombre, accesor in hijos
+            }
+
+        if campo_modelo is None:
+            if (modelo, source) not in PROPIEDADES:
+                raise NoCompilable(source)
+            origen, calcular = PROPIEDADES[(modelo, source)]
+            origen = [prefijo + columna for columna in origen]
+            columnas.extend(origen)
+            return lambda fila, listas: calcular(*(fila[columna] for columna in origen))
+
+        columnas.append(ruta)
+        if isinstance(campo, PrimaryKeyRelatedField):
+            # .values() ya entrega el id de la FK
+            return lambda fila, listas: fila[ruta]
+        if isinstance(campo_modelo, models.FileField):
+            return self._accesor_archivo(campo, campo_modelo, ruta)
+        if isinstance(campo, IDENTIDAD) or (
+            isinstance(campo, serializers.ChoiceField)
+            and all(isinstance(clave, str) for clave in campo.choices)
+        ):
+            return lambda fila, listas: fila[ruta]
+        convertir = campo.to_representation
+        return lambda fila, listas: None if fila[ruta] is None else convertir(fila[ruta])
+
+    def _accesor_archivo(self, campo, campo_modelo, ruta):
+        """Equivalente a FileField.to_representation a partir del nombre guardado"""
+        storage = campo_modelo.storage
+        usar_url = getattr(campo, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+        request = self.request
+
+        def accesor(fila, listas):
+            nombre = fila[ruta]
+            if not nombre:
+                return None
+            if not usar_url:
+                return nombre
+            url = storage.url(nombre)
+            return request.build_absolute_uri(url) if request is not None else url
+        return accesor
+
+
+def compilar(serializer_class, context):
+    """LecturaRapida para `serializer_class`, o None si su forma no se puede compilar"""
+    try:
+        return LecturaRapida(serializer_class(context=context))
+    except NoCompilable:
+        return None
+
+
+class LecturaRapidaMixin:
+    """Usa LecturaRapida en respuesta_lista cuando se pide la forma por defecto en JSON"""
+
+    def lectura_rapida(self, serializer_class):
+        request = self.request
+        if not getattr(settings, 'LECTURA_RAPIDA', True) or serializer_class not in SERIALIZERS_RAPIDOS:
+            return None
+        if PARAMETRO_CAMPOS in request.query_params or PARAMETRO_EXPANDIR in request.query_params:
+            return None
+        if not isinstance(request.accepted_renderer, JSONRenderer):
+            return None
+        return compilar(serializer_class, self.get_serializer_context())
+
+    def respuesta_lista(self, queryset, serializer_class):
+        lectura = self.lectura_rapida(serializer_class)
+        if lectura is None:
+            return super().respuesta_lista(queryset, serializer_class)
+
+        campo_cursor = getattr(self, 'cursor_field', getattr(self.paginator, 'cursor_field', None))
+        filas = lectura.filas(queryset, *filter(None, [campo_cursor]))
+        page = self.paginate_queryset(filas)
+        if page is not None:
+            return self.get_paginated_response(lectura.serializar(page))
+        return Response(lectura.serializar(filas))
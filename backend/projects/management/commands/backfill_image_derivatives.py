@@ -0,0 +1,103 @@
+"""
+Comando para generar los derivados de las imágenes ya subidas.
+
+Recorre Proyecto.imagen y Usuario.avatar y procesa solo los archivos cuyos
+derivados faltan o corresponden a otro original, así que se puede
+interrumpir y volver a lanzar: retoma donde quedó. Los archivos que
+no son imágenes válidas quedan marcados con 'error' y se saltan salvo con
+--reintentar-errores; los que fallaron por otra causa (storage, E/S) quedan
+pendientes para la próxima ejecución.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from inacap_projects.imagenes import campo_derivados, procesar
+from projects.models import Proyecto
+
+MODELOS = {
+    'proyectos': (Proyecto, 'imagen'),
+    'usuarios': (get_user_model(), 'avatar'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Genera los derivados WebP/JPEG de las imágenes y avatares existentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modelo',
+            choices=sorted(MODELOS),
+            action='append',
+            help='Limita el proceso a un modelo (se puede repetir)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'TAREAS_CONCURRENCIA', 2),
+            help='Hilos que procesan imágenes en paralelo',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Filas leídas por consulta al buscar pendientes',
+        )
+        parser.add_argument(
+            '--reintentar-errores',
+            action='store_true',
+            help='Vuelve a procesar los archivos que fallaron antes',
+        )
+
+    def handle(self, *args, **options):
+        procesadas = fallidas = 0
+        for nombre_modelo in options['modelo'] or sorted(MODELOS):
+            modelo, campo = MODELOS[nombre_modelo]
+            pendientes = self._pendientes(modelo, campo, options['batch_size'], options['reintentar_errores'])
+            self.stdout.write(f'{nombre_modelo}: {len(pendientes)} archivos pendientes')
+            with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as pool:
+                tareas = {
+                    pool.submit(self._procesar, modelo, pk, campo, nombre): nombre
+                    for pk, nombre in pendientes
+                }
+                for tarea in as_completed(tareas):
+                    error = tarea.result()
+                    if error is None:
+                        procesadas += 1
+                        self.stdout.write(f'  ✓ {tareas[tarea]}')
+                    else:
+                        fallidas += 1
+                        self.stdout.write(self.style.WARNING(f'  ✗ {tareas[tarea]}: {error}'))
+
+        mensaje = f'✅ Derivados generados: {procesadas}'
+        if fallidas:
+            mensaje += f' (✗ {fallidas} con error)'
+        self.stdout.write(self.style.SUCCESS(mensaje))
+
+    def _pendientes(self, modelo, campo, batch_size, reintentar_errores):
+        """(pk, archivo) de las filas cuyos derivados no corresponden al archivo actual"""
+        filas = (
+            modelo.objects.exclude(**{campo: ''}).exclude(**{f'{campo}__isnull': True})
+            .order_by('pk').values_list('pk', campo, campo_derivados(campo))
+        )
+        pendientes = []
+        for pk, nombre, derivados in filas.iterator(chunk_size=batch_size):
+            if derivados.get('origen') == nombre and (not reintentar_errores or 'error' not in derivados):
+                continue
+            pendientes.append((pk, nombre))
+        return pendientes
+
+    def _procesar(self, modelo, pk, campo, nombre):
+        """None si quedaron derivados sin error; si no, el mensaje de error"""
+        try:
+            procesar(modelo, pk, campo, nombre)
+            derivados = modelo.objects.filter(pk=pk).values_list(campo_derivados(campo), flat=True).first()
+            if not derivados:
+                return 'el archivo cambió durante el proceso'
+            return derivados.get('error')
+        except Exception as exc:  # noqa: BLE001 - queda pendiente y se reintenta en la próxima ejecución
+            return str(exc)[:200]
+        finally:
+            connection.close()
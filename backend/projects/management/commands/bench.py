@@ -0,0 +1,334 @@
+"""
+Benchmark de endpoints con presupuestos de consultas, filas, bytes y latencia.
+
+Por cada tamaño de --tamanos crea una base de datos de prueba desechable
+(en SQLite, en memoria), la llena con generate_load_data y recorre con el
+cliente de pruebas de DRF, autenticado con JWT, los listados, detalles y
+acciones de ProyectoViewSet, ColaboracionViewSet, ComentarioViewSet y
+UsuarioViewSet. Las peticiones que escriben se ejecutan dentro de una
+transacción que se revierte, así que cada repetición parte del mismo estado.
+
+De cada endpoint mide p50/p95 de latencia y el máximo de consultas, filas
+leídas de la base de datos y bytes de respuesta, y los compara con
+bench/presupuestos.json. Falla si alguno se pasa de su presupuesto o si a
+un endpoint le falta el suyo. --actualizar reescribe el archivo con lo
+medido más un margen (las consultas sin margen) para revisar en el diff.
+"""
+import io
+import json
+import logging
+import math
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, F
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from inacap_projects.metricas import percentil
+from projects import matching
+from projects.models import Proyecto
+from users.embebidos import usuarios_embebidos
+
+Usuario = get_user_model()
+
+# Argumentos de generate_load_data por tamaño
+TAMANOS = {
+    'pequeno': {'usuarios': 200, 'proyectos': 100, 'colaboraciones': 1000, 'comentarios': 1000},
+    'mediano': {'usuarios': 2000, 'proyectos': 1000, 'colaboraciones': 10000, 'comentarios': 10000},
+    'grande': {'usuarios': 20000, 'proyectos': 5000, 'colaboraciones': 100000, 'comentarios': 100000},
+}
+
+# Margen que --actualizar deja sobre lo medido
+MARGEN_FILAS = 1.1
+MARGEN_BYTES = 1.1
+MARGEN_LATENCIA = 2.0
+LATENCIA_MINIMA_MS = 5.0
+
+
+class ContadorFilas:
+    """execute_wrapper que cuenta las filas leídas de los cursores"""
+
+    def __init__(self):
+        self.filas = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        resultado = execute(sql, params, many, context)
+        cursor = context['cursor'].cursor
+        if not getattr(cursor, '_bench_contado', False):
+            self._envolver(cursor)
+        return resultado
+
+    def _envolver(self, cursor):
+        fetchone, fetchmany, fetchall = cursor.fetchone, cursor.fetchmany, cursor.fetchall
+
+        def contar_uno():
+            fila = fetchone()
+            self.filas += fila is not None
+            return fila
+
+        def contar_varias(*args, **kwargs):
+            filas = fetchmany(*args, **kwargs)
+            self.filas += len(filas)
+            return filas
+
+        def contar_todas():
+            filas = fetchall()
+            self.filas += len(filas)
+            return filas
+
+        cursor.fetchone, cursor.fetchmany, cursor.fetchall = contar_uno, contar_varias, contar_todas
+        cursor._bench_contado = True
+
+
+class Command(BaseCommand):
+    help = 'Mide los endpoints de la API y falla si superan sus presupuestos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanos', nargs='+', choices=list(TAMANOS), default=['pequeno', 'mediano'],
+                            help='Tamaños de datos a medir')
+        parser.add_argument('--repeticiones', type=int, default=20, help='Peticiones medidas por endpoint')
+        parser.add_argument('--endpoint', help='Solo los endpoints cuyo nombre contiene este texto')
+        parser.add_argument('--presupuestos', default=str(settings.BASE_DIR / 'bench' / 'presupuestos.json'),
+                            help='Archivo JSON de presupuestos')
+        parser.add_argument('--factor-latencia', type=float, default=1.0,
+                            help='Multiplica los presupuestos de latencia (máquinas más lentas)')
+        parser.add_argument('--actualizar', action='store_true',
+                            help='Reescribe los presupuestos de los endpoints medidos con lo medido más un margen')
+
+    def handle(self, *args, **options):
+        # Una línea de log por petición ensuciaría la salida; quedan las lentas y las N+1
+        logging.getLogger('inacap_projects.metricas').setLevel(logging.WARNING)
+        presupuestos = self._leer_presupuestos(options['presupuestos'], options['actualizar'])
+        fallos = []
+        for tamano in options['tamanos']:
+            with self._base_de_prueba():
+                resultados = self._medir_tamano(tamano, options)
+            if options['actualizar']:
+                presupuestos.setdefault(tamano, {}).update(
+                    (nombre, self._con_margen(medida)) for nombre, medida in resultados.items()
+                )
+                continue
+            fallos += self._comparar(tamano, resultados, presupuestos.get(tamano, {}), options['factor_latencia'])
+
+        if options['actualizar']:
+            with open(options['presupuestos'], 'w', encoding='utf-8') as archivo:
+                json.dump(presupuestos, archivo, indent=2, ensure_ascii=False, sort_keys=True)
+                archivo.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"✅ Presupuestos actualizados en {options['presupuestos']}"))
+            return
+        if fallos:
+            raise CommandError(f'{len(fallos)} endpoints fuera de presupuesto:\n  ' + '\n  '.join(fallos))
+        self.stdout.write(self.style.SUCCESS('✅ Todos los endpoints están dentro de su presupuesto'))
+
+    def _leer_presupuestos(self, ruta, actualizar):
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except FileNotFoundError:
+            if actualizar:
+                return {}
+            raise CommandError(f'No existe {ruta}; créalo con --actualizar')
+
+    @contextmanager
+    def _base_de_prueba(self):
+        """Base de datos de prueba nueva, destruida al salir"""
+        nombre_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        cache.clear()
+        usuarios_embebidos.limpiar()
+        matching.indice_proyectos.invalidar()
+        matching.indice_usuarios.invalidar()
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+            cache.clear()
+
+    def _medir_tamano(self, tamano, options):
+        inicio = time.perf_counter()
+        call_command('generate_load_data', semilla=1, stdout=io.StringIO(), **TAMANOS[tamano])
+        datos = ', '.join(f'{total} {nombre}' for nombre, total in TAMANOS[tamano].items())
+        self.stdout.write(f'\nTamaño {tamano} ({datos}; {time.perf_counter() - inicio:.0f} s en generar)')
+        self.stdout.write(f'  {"endpoint":<38} {"p50":>8} {"p95":>8} {"consultas":>9} {"filas":>7} {"KB":>8}')
+
+        resultados = {}
+        for nombre, metodo, usuario, url, datos, esperado, repeticiones in self._casos():
+            if options['endpoint'] and options['endpoint'] not in nombre:
+                continue
+            medida = self._medir(
+                nombre, metodo, usuario, url, datos, esperado, repeticiones or options['repeticiones']
+            )
+            resultados[nombre] = medida
+            self.stdout.write(
+                f'  {nombre:<38} {medida["p50_ms"]:6.1f}ms {medida["p95_ms"]:6.1f}ms '
+                f'{medida["consultas"]:>9} {medida["filas"]:>7} {medida["bytes"] / 1024:8.1f}'
+            )
+        return resultados
+
+    def _casos(self):
+        """(nombre, método, usuario, url, datos, status esperado, repeticiones) de cada endpoint"""
+        # Proyecto popular con vacantes y solicitudes pendientes que resolver
+        proyecto = (
+            Proyecto.objects.filter(
+                estado='ACTIVO', num_solicitudes_pendientes__gte=2,
+                num_colaboradores__lt=F('colaboradores_necesarios'),
+            )
+            .order_by('-num_comentarios', 'pk').select_related('creador').first()
+        )
+        if proyecto is None:
+            raise CommandError('Los datos generados no tienen un proyecto activo con vacantes y solicitudes')
+        creador = proyecto.creador
+        colaborador = Usuario.objects.annotate(total=Count('colaboraciones')).order_by('-total', 'pk').first()
+        solicitante = (
+            Usuario.objects.filter(is_active=True).exclude(pk=creador.pk)
+            .exclude(colaboraciones__proyecto=proyecto).order_by('pk').first()
+        )
+        pendientes = list(proyecto.colaboraciones.filter(estado='PENDIENTE').order_by('pk')[:2])
+        comentario = proyecto.comentarios.order_by('pk').first()
+        etag = self._cliente(creador).get('/api/projects/proyectos/')['ETag']
+
+        p, u = '/api/projects', '/api/users'
+        return [
+            # ProyectoViewSet
+            ('GET proyectos', 'get', creador, f'{p}/proyectos/', None, 200, None),
+            ('GET proyectos 304', 'get', creador, f'{p}/proyectos/', {'HTTP_IF_NONE_MATCH': etag}, 304, None),
+            ('GET proyectos ?estado=', 'get', creador, f'{p}/proyectos/?estado=ACTIVO', None, 200, None),
+            ('GET proyectos ?search=', 'get', creador, f'{p}/proyectos/?search=inventario', None, 200, None),
+            ('GET proyectos ?cursor=', 'get', creador, f'{p}/proyectos/?cursor=', None, 200, None),
+            ('GET proyectos ?expand=creador', 'get', creador, f'{p}/proyectos/?expand=creador', None, 200, None),
+            ('GET proyectos json-stream', 'get', creador, f'{p}/proyectos/?format=json-stream', None, 200, None),
+            ('GET proyectos/{id}', 'get', creador, f'{p}/proyectos/{proyecto.pk}/', None, 200, None),
+            ('GET proyectos/{id}/colaboradores', 'get', creador,
+             f'{p}/proyectos/{proyecto.pk}/colaboradores/', None, 200, None),
+            ('GET proyectos/{id}/solicitudes', 'get', creador,
+             f'{p}/proyectos/{proyecto.pk}/solicitudes/', None, 200, None),
+            ('GET proyectos/{id}/candidatos', 'get', creador,
+             f'{p}/proyectos/{proyecto.pk}/candidatos/', None, 200, None),
+            ('GET proyectos/mis_proyectos', 'get', creador, f'{p}/proyectos/mis_proyectos/', None, 200, None),
+            ('GET proyectos/recomendados', 'get', colaborador, f'{p}/proyectos/recomendados/', None, 200, None),
+            ('GET proyectos/colaborando', 'get', colaborador, f'{p}/proyectos/colaborando/', None, 200, None),
+            ('POST proyectos/{id}/solicitar', 'post', solicitante,
+             f'{p}/proyectos/{proyecto.pk}/solicitar_colaboracion/', {'mensaje': 'Me interesa'}, 201, None),
+            ('POST proyectos/{id}/resolver', 'post', creador,
+             f'{p}/proyectos/{proyecto.pk}/resolver_solicitudes/',
+             {'aceptar': [pendientes[0].pk], 'rechazar': [pendientes[1].pk]}, 200, None),
+            # ColaboracionViewSet
+            ('GET colaboraciones', 'get', colaborador, f'{p}/colaboraciones/', None, 200, None),
+            ('GET colaboraciones/{id}', 'get', creador, f'{p}/colaboraciones/{pendientes[0].pk}/', None, 200, None),
+            ('GET colaboraciones/mis_solicitudes', 'get', colaborador,
+             f'{p}/colaboraciones/mis_solicitudes/', None, 200, None),
+            ('POST colaboraciones/{id}/aceptar', 'post', creador,
+             f'{p}/colaboraciones/{pendientes[0].pk}/aceptar/', {}, 200, None),
+            ('POST colaboraciones/{id}/rechazar', 'post', creador,
+             f'{p}/colaboraciones/{pendientes[0].pk}/rechazar/', {}, 200, None),
+            # ComentarioViewSet
+            ('GET comentarios', 'get', creador, f'{p}/comentarios/', None, 200, None),
+            ('GET comentarios ?proyecto=', 'get', creador, f'{p}/comentarios/?proyecto={proyecto.pk}', None, 200, None),
+            ('GET comentarios/{id}', 'get', creador, f'{p}/comentarios/{comentario.pk}/', None, 200, None),
+            # UsuarioViewSet
+            ('GET usuarios', 'get', creador, f'{u}/usuarios/', None, 200, None),
+            ('GET usuarios ?search=', 'get', creador, f'{u}/usuarios/?search=gonzalez', None, 200, None),
+            ('GET usuarios/{id}', 'get', creador, f'{u}/usuarios/{colaborador.pk}/', None, 200, None),
+            ('GET usuarios/{id}/proyectos', 'get', colaborador, f'{u}/usuarios/{creador.pk}/proyectos/', None, 200, None),
+            ('GET usuarios/profile', 'get', creador, f'{u}/usuarios/profile/', None, 200, None),
+            ('PATCH usuarios/profile', 'patch', creador, f'{u}/usuarios/profile/', {'bio': 'Bench'}, 200, None),
+            # PBKDF2 domina la latencia: pocas repeticiones
+            ('POST usuarios/change_password', 'post', creador, f'{u}/usuarios/change_password/',
+             {'old_password': 'password123', 'new_password': 'bench-clave-1', 'new_password2': 'bench-clave-1'},
+             200, 3),
+            # Catálogos
+            ('GET habilidades', 'get', creador, f'{u}/habilidades/', None, 200, None),
+            ('GET disciplinas', 'get', creador, f'{u}/disciplinas/', None, 200, None),
+        ]
+
+    def _cliente(self, usuario):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(usuario)}')
+        return client
+
+    def _medir(self, nombre, metodo, usuario, url, datos, esperado, repeticiones):
+        client = self._cliente(usuario)
+        if metodo == 'get':
+            peticion = lambda: client.get(url, **(datos or {}))  # noqa: E731
+        else:
+            peticion = lambda: getattr(client, metodo)(url, datos, format='json')  # noqa: E731
+
+        latencias, consultas, filas, tamanos = [], [], [], []
+        # Una petición de calentamiento: índices en memoria, cachés de proceso
+        for i in range(repeticiones + 1):
+            contador = ContadorFilas()
+            with transaction.atomic(), connection.execute_wrapper(contador), self._contar_consultas() as total:
+                inicio = time.perf_counter()
+                respuesta = peticion()
+                cuerpo = b''.join(respuesta.streaming_content) if respuesta.streaming else respuesta.content
+                duracion = time.perf_counter() - inicio
+                # Las escrituras se revierten para que cada repetición parta igual
+                transaction.set_rollback(metodo != 'get')
+            if respuesta.status_code != esperado:
+                raise CommandError(f'{nombre} respondió {respuesta.status_code} (se esperaba {esperado}): {cuerpo[:300]!r}')
+            if i == 0:
+                continue
+            latencias.append(duracion)
+            consultas.append(total[0])
+            filas.append(contador.filas)
+            tamanos.append(len(cuerpo))
+
+        latencias.sort()
+        return {
+            'p50_ms': round(statistics.median(latencias) * 1000, 2),
+            'p95_ms': round(percentil(latencias, 0.95) * 1000, 2),
+            'consultas': max(consultas),
+            'filas': max(filas),
+            'bytes': max(tamanos),
+        }
+
+    @contextmanager
+    def _contar_consultas(self):
+        """Cuenta las consultas ejecutadas sin depender de DEBUG"""
+        total = [0]
+
+        def contar(execute, sql, params, many, context):
+            total[0] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(contar):
+            yield total
+
+    def _con_margen(self, medida):
+        return {
+            'consultas': medida['consultas'],
+            'filas': math.ceil(medida['filas'] * MARGEN_FILAS),
+            'bytes': math.ceil(medida['bytes'] * MARGEN_BYTES),
+            'p95_ms': round(max(medida['p95_ms'] * MARGEN_LATENCIA, LATENCIA_MINIMA_MS), 1),
+        }
+
+    def _comparar(self, tamano, resultados, presupuestos, factor_latencia):
+        fallos = []
+        for nombre, medida in resultados.items():
+            presupuesto = presupuestos.get(nombre)
+            if presupuesto is None:
+                fallos.append(f'{tamano} / {nombre}: sin presupuesto (usa --actualizar)')
+                continue
+            excedidos = [
+                f'{metrica} {medida[metrica]} > {limite}'
+                for metrica, limite in (
+                    ('consultas', presupuesto['consultas']),
+                    ('filas', presupuesto['filas']),
+                    ('bytes', presupuesto['bytes']),
+                    ('p95_ms', round(presupuesto['p95_ms'] * factor_latencia, 1)),
+                )
+                if medida[metrica] > limite
+            ]
+            if excedidos:
+                self.stdout.write(self.style.ERROR(f'  ✗ {nombre}: {", ".join(excedidos)}'))
+                fallos.append(f'{tamano} / {nombre}: {", ".join(excedidos)}')
+        if not any(fallo.startswith(f'{tamano} /') for fallo in fallos):
+            self.stdout.write(self.style.SUCCESS(f'  ✓ {tamano}: {len(resultados)} endpoints dentro de presupuesto'))
+        return fallos
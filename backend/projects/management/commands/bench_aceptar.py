@@ -0,0 +1,110 @@
+"""
+Benchmark de concurrencia para la aceptación de solicitudes de colaboración.
+
+Crea un proyecto temporal con muchas solicitudes pendientes y las acepta
+desde varios hilos a la vez contra la base de datos configurada (SQLite o
+MySQL). Verifica que nunca se superen las vacantes y reporta latencias.
+"""
+import statistics
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from inacap_projects.metricas import percentil
+from projects.models import Proyecto, Colaboracion
+
+Usuario = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Mide la aceptación concurrente de solicitudes y verifica que no se sobrepasen las vacantes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Hilos concurrentes')
+        parser.add_argument('--solicitudes', type=int, default=200, help='Solicitudes pendientes a aceptar')
+        parser.add_argument('--vacantes', type=int, default=50, help='Colaboradores necesarios del proyecto')
+
+    def handle(self, *args, **options):
+        hilos = options['threads']
+        total = options['solicitudes']
+        vacantes = options['vacantes']
+        prefijo = f'bench-{uuid.uuid4().hex[:8]}'
+
+        self.stdout.write(f'Preparando {total} solicitudes para {vacantes} vacantes...')
+        password = make_password(None)
+        try:
+            creador = Usuario.objects.create(
+                email=f'{prefijo}-creador@bench.local', nombre='Bench', apellido='Creador', password=password
+            )
+            usuarios = Usuario.objects.bulk_create([
+                Usuario(email=f'{prefijo}-{i}@bench.local', nombre='Bench', apellido=str(i), password=password)
+                for i in range(total)
+            ])
+            proyecto = Proyecto.objects.create(
+                titulo=f'Proyecto {prefijo}', descripcion='Benchmark', objetivo='Benchmark',
+                creador=creador, estado='ACTIVO', colaboradores_necesarios=vacantes,
+                num_solicitudes_pendientes=total
+            )
+            Colaboracion.objects.bulk_create([
+                Colaboracion(proyecto=proyecto, usuario=usuario) for usuario in usuarios
+            ])
+            ids = list(proyecto.colaboraciones.values_list('pk', flat=True))
+
+            latencias = []
+            aceptadas = []
+            errores = []
+            lock = threading.Lock()
+
+            def trabajador(lote):
+                propias, tiempos = [], []
+                try:
+                    for colaboracion in Colaboracion.objects.filter(pk__in=lote):
+                        inicio = time.perf_counter()
+                        if colaboracion.cambiar_estado('ACEPTADA'):
+                            propias.append(colaboracion.pk)
+                        tiempos.append(time.perf_counter() - inicio)
+                except Exception as exc:  # noqa: BLE001 - se reporta al final
+                    errores.append(repr(exc))
+                finally:
+                    connection.close()
+                with lock:
+                    aceptadas.extend(propias)
+                    latencias.extend(tiempos)
+
+            lotes = [ids[i::hilos] for i in range(hilos)]
+            threads = [threading.Thread(target=trabajador, args=(lote,)) for lote in lotes]
+            inicio = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            duracion = time.perf_counter() - inicio
+
+            proyecto.refresh_from_db()
+            reales = proyecto.colaboraciones.filter(estado='ACEPTADA').count()
+        finally:
+            # También si algo falla a medias: no quedan filas bench-* en la base
+            Proyecto.objects.filter(creador__email__startswith=prefijo).delete()
+            Usuario.objects.filter(email__startswith=prefijo).delete()
+
+        self.stdout.write(f'Motor: {connection.vendor} | hilos: {hilos}')
+        self.stdout.write(f'Aceptadas: {len(aceptadas)} (en BD: {reales}, contador: {proyecto.num_colaboradores})')
+        if latencias:
+            latencias.sort()
+            p95 = percentil(latencias, 0.95)
+            self.stdout.write(
+                f'Latencia p50: {statistics.median(latencias) * 1000:.2f} ms | '
+                f'p95: {p95 * 1000:.2f} ms | máx: {latencias[-1] * 1000:.2f} ms'
+            )
+        self.stdout.write(f'Duración: {duracion:.2f} s ({len(latencias) / duracion:.0f} intentos/s)')
+
+        esperadas = min(vacantes, total)
+        if errores:
+            raise CommandError(f'{len(errores)} hilos fallaron: {errores[0]}')
+        if not (len(aceptadas) == reales == proyecto.num_colaboradores == esperadas):
+            raise CommandError('Las aceptaciones concurrentes no respetaron las vacantes')
+        self.stdout.write(self.style.SUCCESS('✅ Vacantes respetadas bajo concurrencia'))
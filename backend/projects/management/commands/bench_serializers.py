@@ -0,0 +1,117 @@
+"""
+Benchmark del costo por fila de la serialización de los listados.
+
+Crea N proyectos (con creador, habilidades y disciplinas requeridas) dentro
+de una transacción que se revierte y compara ProyectoListSerializer de DRF
+con su versión compilada de projects.lectura_rapida. Reporta dos medidas:
+solo la serialización, con las filas ya cargadas, y el total incluyendo las
+consultas y el render a JSON.
+"""
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from inacap_projects.serializers import optimizar_queryset
+from projects.lectura_rapida import compilar
+from projects.models import Proyecto
+from projects.serializers import ProyectoListSerializer
+from users.models import Habilidad, Disciplina
+
+Usuario = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Mide el costo por fila de ProyectoListSerializer con DRF y con la lectura rápida'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=500, help='Proyectos a serializar')
+        parser.add_argument('--repeticiones', type=int, default=5, help='Mediciones por variante')
+
+    def handle(self, *args, **options):
+        filas = options['filas']
+        repeticiones = options['repeticiones']
+
+        with transaction.atomic():
+            self.stdout.write(f'Preparando {filas} proyectos...')
+            ids = self._crear_datos(filas)
+            request = Request(APIRequestFactory().get('/api/projects/proyectos/'))
+            context = {'request': request}
+            queryset = optimizar_queryset(
+                Proyecto.objects.con_estadisticas().filter(pk__in=ids),
+                ProyectoListSerializer(context=context)
+            )
+            lectura = compilar(ProyectoListSerializer, context)
+            renderer = JSONRenderer()
+
+            instancias = list(queryset)
+            valores = list(lectura.filas(queryset))
+            listas = lectura.cargar_listas([fila['pk'] for fila in valores])
+
+            resultados = [
+                ('DRF, solo serialización',
+                 lambda: ProyectoListSerializer(instancias, many=True, context=context).data),
+                ('rápida, solo serialización',
+                 lambda: lectura.armar(valores, listas)),
+                ('DRF, consultas + JSON',
+                 lambda: renderer.render(ProyectoListSerializer(queryset.all(), many=True, context=context).data)),
+                ('rápida, consultas + JSON',
+                 lambda: renderer.render(lectura.serializar(lectura.filas(queryset.all())))),
+            ]
+            medianas = {}
+            for nombre, funcion in resultados:
+                tiempos = []
+                for _ in range(repeticiones):
+                    inicio = time.perf_counter()
+                    funcion()
+                    tiempos.append(time.perf_counter() - inicio)
+                medianas[nombre] = statistics.median(tiempos)
+                self.stdout.write(
+                    f'  {nombre:<28} {medianas[nombre] * 1000:8.1f} ms  '
+                    f'{medianas[nombre] / filas * 1e6:8.1f} µs/fila'
+                )
+            transaction.set_rollback(True)
+
+        for medida in ('solo serialización', 'consultas + JSON'):
+            factor = medianas[f'DRF, {medida}'] / medianas[f'rápida, {medida}']
+            self.stdout.write(self.style.SUCCESS(f'✅ {medida}: lectura rápida {factor:.1f}x más rápida'))
+
+    def _crear_datos(self, total):
+        disciplinas = [
+            Disciplina.objects.create(nombre=f'Bench disciplina {i}') for i in range(3)
+        ]
+        habilidades = [
+            Habilidad.objects.create(nombre=f'Bench habilidad {i}') for i in range(6)
+        ]
+        creadores = [
+            Usuario.objects.create(
+                email=f'bench-serializers-{i}@bench.local', nombre='Bench', apellido=str(i),
+                disciplina=disciplinas[i % len(disciplinas)]
+            )
+            for i in range(10)
+        ]
+        Proyecto.objects.bulk_create([
+            Proyecto(
+                titulo=f'Proyecto bench {i}', descripcion='-', objetivo='-',
+                creador=creadores[i % len(creadores)], estado='ACTIVO', colaboradores_necesarios=3,
+                imagen=f'proyectos/bench-{i}.png' if i % 2 else None
+            )
+            for i in range(total)
+        ])
+        # En MySQL bulk_create no devuelve los IDs
+        proyectos = list(Proyecto.objects.filter(creador__in=creadores).order_by('pk'))
+        requeridas = Proyecto.habilidades_requeridas.through
+        requeridas.objects.bulk_create([
+            requeridas(proyecto=proyecto, habilidad=habilidades[(i + j) % len(habilidades)])
+            for i, proyecto in enumerate(proyectos) for j in range(2)
+        ])
+        disciplinas_requeridas = Proyecto.disciplinas_requeridas.through
+        disciplinas_requeridas.objects.bulk_create([
+            disciplinas_requeridas(proyecto=proyecto, disciplina=disciplinas[i % len(disciplinas)])
+            for i, proyecto in enumerate(proyectos)
+        ])
+        return [proyecto.pk for proyecto in proyectos]
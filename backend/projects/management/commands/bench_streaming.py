@@ -0,0 +1,135 @@
+"""
+Benchmark de JSONRenderer contra el listado por partes (?format=json-stream).
+
+Crea N proyectos de prueba, y por cada tamaño y variante lanza un proceso
+hijo que serializa y renderiza los proyectos: 'completo' arma la lista
+entera y la pasa a JSONRenderer (lo que hace una respuesta sin paginar);
+'streaming' y 'streaming-rapido' consumen JSONStreamingRenderer lote a lote,
+con el serializer DRF y con la lectura rápida. Cada hijo reporta tiempo,
+bytes, el hash del cuerpo y el pico de RSS (resource.getrusage, Unix).
+Los datos se borran al terminar.
+"""
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from inacap_projects.serializers import optimizar_queryset
+from inacap_projects.streaming import JSONStreamingRenderer, lotes_serializados
+from projects.lectura_rapida import compilar
+from projects.models import Proyecto
+from projects.serializers import ProyectoListSerializer
+from users.models import Habilidad
+
+Usuario = get_user_model()
+
+VARIANTES = ('completo', 'streaming', 'streaming-rapido')
+
+
+class Command(BaseCommand):
+    help = 'Compara throughput y RSS de JSONRenderer con el listado por partes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, nargs='+', default=[2000, 20000],
+                            help='Tamaños de listado a medir')
+        # Uso interno: medición dentro del proceso hijo
+        parser.add_argument('--medir', choices=VARIANTES, help=argparse.SUPPRESS)
+        parser.add_argument('--prefijo', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['medir']:
+            return self._medir(options['medir'], options['prefijo'], options['filas'][0])
+
+        prefijo = f'bench-stream-{uuid.uuid4().hex[:8]}'
+        total = max(options['filas'])
+        self.stdout.write(f'Preparando {total} proyectos...')
+        self._crear_datos(prefijo, total)
+        try:
+            self.stdout.write(f'  {"filas":>7} {"variante":<17} {"tiempo":>9} {"filas/s":>9} {"MB":>7} {"RSS pico":>10}')
+            for filas in options['filas']:
+                hashes = set()
+                for variante in VARIANTES:
+                    resultado = self._lanzar(variante, prefijo, filas)
+                    hashes.add(resultado['sha1'])
+                    self.stdout.write(
+                        f'  {filas:>7} {variante:<17} {resultado["segundos"] * 1000:7.0f} ms '
+                        f'{filas / resultado["segundos"]:9.0f} {resultado["bytes"] / 2**20:7.1f} '
+                        f'{resultado["rss_kb"] / 1024:+8.1f} MB'
+                    )
+                if len(hashes) != 1:
+                    raise CommandError(f'Las variantes entregaron cuerpos distintos con {filas} filas')
+        finally:
+            Proyecto.objects.filter(creador__email__startswith=prefijo).delete()
+            Usuario.objects.filter(email__startswith=prefijo).delete()
+            Habilidad.objects.filter(nombre__startswith=prefijo).delete()
+        self.stdout.write(self.style.SUCCESS('✅ Las tres variantes entregan el mismo JSON'))
+
+    def _lanzar(self, variante, prefijo, filas):
+        comando = [
+            sys.executable, str(settings.BASE_DIR / 'manage.py'), 'bench_streaming',
+            '--medir', variante, '--prefijo', prefijo, '--filas', str(filas),
+        ]
+        proceso = subprocess.run(comando, capture_output=True, text=True, env=os.environ)
+        if proceso.returncode != 0:
+            raise CommandError(f'Falló la medición {variante}: {proceso.stderr.strip()[-500:]}')
+        return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+    def _medir(self, variante, prefijo, filas):
+        context = {'request': Request(APIRequestFactory().get('/api/projects/proyectos/'))}
+        queryset = optimizar_queryset(
+            Proyecto.objects.con_estadisticas().filter(creador__email__startswith=prefijo),
+            ProyectoListSerializer(context=context)
+        ).order_by('-created_at', '-pk')[:filas]
+        # Base: el proceso con Django y los modelos ya cargados
+        base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        sha1, total = hashlib.sha1(), 0
+        inicio = time.perf_counter()
+        if variante == 'completo':
+            partes = [JSONRenderer().render(ProyectoListSerializer(queryset, many=True, context=context).data)]
+        else:
+            lectura = compilar(ProyectoListSerializer, context) if variante == 'streaming-rapido' else None
+            partes = JSONStreamingRenderer().render_lotes(
+                lotes_serializados(queryset, ProyectoListSerializer, context, lectura)
+            )
+        for parte in partes:
+            sha1.update(parte)
+            total += len(parte)
+        segundos = time.perf_counter() - inicio
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.stdout.write(json.dumps({
+            'segundos': segundos, 'bytes': total, 'sha1': sha1.hexdigest(), 'rss_kb': pico - base,
+        }))
+
+    def _crear_datos(self, prefijo, total):
+        habilidades = [Habilidad.objects.create(nombre=f'{prefijo} habilidad {i}') for i in range(4)]
+        creador = Usuario.objects.create(
+            email=f'{prefijo}-creador@bench.local', nombre='Bench', apellido='Streaming',
+            password=make_password(None)
+        )
+        for inicio in range(0, total, 1000):
+            Proyecto.objects.bulk_create([
+                Proyecto(
+                    titulo=f'Proyecto {prefijo} {i}', descripcion='Descripción ' * 20, objetivo='Objetivo',
+                    creador=creador, estado='ACTIVO', colaboradores_necesarios=3
+                )
+                for i in range(inicio, min(inicio + 1000, total))
+            ])
+        # En MySQL bulk_create no devuelve los IDs
+        requeridas = Proyecto.habilidades_requeridas.through
+        for inicio in range(0, total, 1000):
+            ids = creador.proyectos_creados.order_by('pk').values_list('pk', flat=True)[inicio:inicio + 1000]
+            requeridas.objects.bulk_create([
+                requeridas(proyecto_id=pk, habilidad=habilidades[pk % len(habilidades)]) for pk in ids
+            ])
@@ -0,0 +1,148 @@
+"""
+Comando para verificar que la lectura rápida produce el mismo JSON que DRF.
+
+Crea datos de borde (imágenes y avatares con espacios, textos con tildes,
+fechas vacías, proyectos sin requisitos y con varios, colaboraciones en
+cada estado) dentro de una transacción que se revierte. Compara byte a byte
+el JSON de cada serializer DRF con el de projects.lectura_rapida, con y sin
+request en el contexto, y luego el de cada endpoint con LECTURA_RAPIDA
+apagado y encendido.
+"""
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from inacap_projects.serializers import serializar
+from projects.lectura_rapida import compilar
+from projects.models import Proyecto, Colaboracion, Comentario
+from projects.serializers import ProyectoListSerializer, ColaboracionSerializer, ComentarioSerializer
+from users.models import Habilidad, Disciplina
+
+Usuario = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Verifica que la lectura rápida de los listados entrega el mismo JSON que los serializers DRF'
+
+    def handle(self, *args, **options):
+        fallos = []
+        with transaction.atomic():
+            creador, colaborador, proyecto = self._crear_datos()
+            request = Request(APIRequestFactory().get('/api/projects/proyectos/'))
+            casos = [
+                ('ProyectoListSerializer', ProyectoListSerializer, Proyecto.objects.con_estadisticas()),
+                ('ColaboracionSerializer', ColaboracionSerializer, Colaboracion.objects.all()),
+                ('ComentarioSerializer', ComentarioSerializer, Comentario.objects.all()),
+            ]
+            self.stdout.write('Serializers:')
+            for nombre, serializer_class, queryset in casos:
+                for etiqueta, context in (('con request', {'request': request}), ('sin request', {})):
+                    caso = f'{nombre} ({etiqueta})'
+                    if self._comparar_serializer(caso, serializer_class, queryset, context):
+                        self.stdout.write(f'  ✓ {caso}: {queryset.count()} filas')
+                    else:
+                        fallos.append(caso)
+
+            self.stdout.write('Endpoints:')
+            urls = [
+                (creador, '/api/projects/proyectos/'),
+                (creador, '/api/projects/proyectos/?cursor='),
+                (creador, '/api/projects/proyectos/?estado=ACTIVO&ordering=titulo'),
+                (creador, '/api/projects/proyectos/mis_proyectos/'),
+                (colaborador, f'/api/users/usuarios/{creador.pk}/proyectos/'),
+                (colaborador, '/api/projects/proyectos/colaborando/'),
+                (creador, '/api/projects/colaboraciones/'),
+                (colaborador, '/api/projects/colaboraciones/mis_solicitudes/'),
+                (creador, f'/api/projects/comentarios/?proyecto={proyecto.pk}'),
+                (creador, '/api/projects/comentarios/?cursor='),
+            ]
+            for usuario, url in urls:
+                if self._comparar_endpoint(usuario, url):
+                    self.stdout.write(f'  ✓ {url}')
+                else:
+                    fallos.append(url)
+            transaction.set_rollback(True)
+
+        if fallos:
+            raise CommandError(f'Respuestas distintas en: {", ".join(fallos)}')
+        self.stdout.write(self.style.SUCCESS('✅ La lectura rápida es idéntica a los serializers DRF'))
+
+    def _comparar_serializer(self, caso, serializer_class, queryset, context):
+        lectura = compilar(serializer_class, context)
+        if lectura is None:
+            self.stdout.write(self.style.ERROR(f'  ✗ {caso}: no se pudo compilar'))
+            return False
+        renderer = JSONRenderer()
+        esperado = serializar(serializer_class, queryset, context)
+        obtenido = lectura.serializar(lectura.filas(queryset))
+        if renderer.render(esperado) == renderer.render(obtenido):
+            return True
+        self.stdout.write(self.style.ERROR(f'  ✗ {caso}'))
+        for fila_drf, fila_rapida in zip(esperado, obtenido):
+            if renderer.render(fila_drf) != renderer.render(fila_rapida):
+                self.stdout.write(f'      DRF:    {renderer.render(fila_drf).decode()[:300]}')
+                self.stdout.write(f'      rápida: {renderer.render(fila_rapida).decode()[:300]}')
+                break
+        else:
+            self.stdout.write(f'      {len(esperado)} filas DRF, {len(obtenido)} filas rápidas')
+        return False
+
+    def _comparar_endpoint(self, usuario, url):
+        client = APIClient()
+        client.force_authenticate(usuario)
+        with override_settings(LECTURA_RAPIDA=False):
+            esperado = client.get(url)
+        with override_settings(LECTURA_RAPIDA=True):
+            obtenido = client.get(url)
+        if esperado.status_code == obtenido.status_code == 200 and esperado.content == obtenido.content:
+            return True
+        self.stdout.write(self.style.ERROR(
+            f'  ✗ {url}: {esperado.status_code}/{obtenido.status_code}'
+        ))
+        self.stdout.write(f'      DRF:    {esperado.content[:300]}')
+        self.stdout.write(f'      rápida: {obtenido.content[:300]}')
+        return False
+
+    def _crear_datos(self):
+        disciplina = Disciplina.objects.create(nombre='Paridad Diseño Ñandú', descripcion='Acentos: áéíóú')
+        habilidades = [
+            Habilidad.objects.create(nombre=f'Paridad {nombre}')
+            for nombre in ('Python', 'Ángular', 'Zeta')
+        ]
+        creador = Usuario.objects.create(
+            email='paridad-creador@check.local', nombre='José', apellido='Núñez "Q"',
+            avatar='avatars/foto con espacio.png', disciplina=disciplina, semestre=5, carrera='Ingeniería',
+            bio='Línea 1\nLínea 2 <b>html</b>'
+        )
+        creador.habilidades.set(habilidades[::-1])
+        colaborador = Usuario.objects.create(
+            email='paridad-colab@check.local', nombre='Ana', apellido='Sin Avatar'
+        )
+        proyecto = Proyecto.objects.create(
+            titulo='Proyecto con imagen ✓', descripcion='Descripción', objetivo='Objetivo',
+            creador=creador, estado='ACTIVO', colaboradores_necesarios=2,
+            imagen='proyectos/portada final.png', fecha_inicio=date(2024, 3, 1), fecha_fin=date(2024, 12, 31)
+        )
+        proyecto.habilidades_requeridas.set(habilidades)
+        proyecto.disciplinas_requeridas.set([disciplina])
+        otros = [
+            Proyecto.objects.create(
+                titulo=f'Proyecto {estado.lower()}', descripcion='-', objetivo='-',
+                creador=colaborador if i % 2 else creador, estado=estado, colaboradores_necesarios=i
+            )
+            for i, (estado, _) in enumerate(Proyecto.ESTADO_CHOICES)
+        ]
+        otros[0].habilidades_requeridas.set(habilidades[:1])
+        for proyecto_destino, (estado, _) in zip([proyecto, *otros], Colaboracion.ESTADO_CHOICES):
+            Colaboracion.objects.create(
+                proyecto=proyecto_destino, usuario=colaborador, estado=estado,
+                mensaje='' if estado == 'PENDIENTE' else 'Mensaje "citado"'
+            )
+        Comentario.objects.create(proyecto=proyecto, usuario=colaborador, contenido='Comentario 🚀')
+        Comentario.objects.create(proyecto=proyecto, usuario=creador, contenido='Respuesta\ncon salto')
+        return creador, colaborador, proyecto
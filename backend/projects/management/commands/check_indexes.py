@@ -0,0 +1,108 @@
+"""
+Comando para verificar que los endpoints usan los índices compuestos.
+
+Ejecuta cada endpoint con el cliente de pruebas de DRF dentro de una
+transacción que se revierte, captura su SQL y corre EXPLAIN (SQLite o
+MySQL) sobre cada consulta. Falla si el índice esperado no aparece en el
+plan de ninguna de ellas.
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from projects.models import Proyecto, Colaboracion, Comentario
+
+Usuario = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Verifica con EXPLAIN que cada endpoint usa su índice compuesto'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plan', action='store_true', help='Muestra el plan de cada consulta')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'mysql'):
+            raise CommandError(f'Motor no soportado: {connection.vendor}')
+
+        fallos = []
+        with transaction.atomic():
+            creador, colaborador, proyecto = self._crear_datos()
+            casos = [
+                ('proyectos ?estado=', creador, '/api/projects/proyectos/?estado=ACTIVO',
+                 'proyecto_estado_created_idx'),
+                ('mis_proyectos', creador, '/api/projects/proyectos/mis_proyectos/',
+                 'proyecto_creador_created_idx'),
+                # Sin estadísticas el planificador puede preferir el índice por fecha
+                ('usuarios/proyectos', colaborador, f'/api/users/usuarios/{creador.pk}/proyectos/',
+                 'proyecto_creador_created_idx'),
+                ('colaborando', colaborador, '/api/projects/proyectos/colaborando/',
+                 ('colaboracion_usuario_est_idx', 'colaboracion_usuario_cre_idx')),
+                ('solicitudes', creador, f'/api/projects/proyectos/{proyecto.pk}/solicitudes/',
+                 'colaboracion_proyecto_est_idx'),
+                ('colaboradores', creador, f'/api/projects/proyectos/{proyecto.pk}/colaboradores/',
+                 'colaboracion_proyecto_est_idx'),
+                ('mis_solicitudes', colaborador, '/api/projects/colaboraciones/mis_solicitudes/',
+                 'colaboracion_usuario_cre_idx'),
+                ('comentarios ?proyecto=', creador, f'/api/projects/comentarios/?proyecto={proyecto.pk}',
+                 'comentario_proyecto_cre_idx'),
+                ('proyectos ?cursor=', creador, '/api/projects/proyectos/?cursor=',
+                 'proyecto_created_id_idx'),
+            ]
+            for nombre, usuario, url, indices in casos:
+                if isinstance(indices, str):
+                    indices = (indices,)
+                planes = self._planes(usuario, url)
+                usado = next((i for i in indices if any(i in plan for _, plan in planes)), None)
+                if options['verbose_plan']:
+                    for sql, plan in planes:
+                        self.stdout.write(f'    {sql[:100]}\n      -> {plan}')
+                if usado:
+                    self.stdout.write(f'  ✓ {nombre}: {usado}')
+                else:
+                    self.stdout.write(self.style.ERROR(f'  ✗ {nombre}: no usa {" ni ".join(indices)}'))
+                    fallos.append(nombre)
+            transaction.set_rollback(True)
+
+        if fallos:
+            raise CommandError(f'Endpoints sin su índice: {", ".join(fallos)}')
+        self.stdout.write(self.style.SUCCESS('✅ Todos los endpoints usan sus índices'))
+
+    def _crear_datos(self):
+        creador = Usuario.objects.create(email='explain-creador@check.local', nombre='Explain', apellido='Creador')
+        colaborador = Usuario.objects.create(email='explain-colab@check.local', nombre='Explain', apellido='Colab')
+        proyecto = Proyecto.objects.create(
+            titulo='Proyecto explain', descripcion='-', objetivo='-',
+            creador=creador, estado='ACTIVO', colaboradores_necesarios=3
+        )
+        Colaboracion.objects.create(proyecto=proyecto, usuario=colaborador, estado='ACEPTADA')
+        Comentario.objects.create(proyecto=proyecto, usuario=colaborador, contenido='-')
+        return creador, colaborador, proyecto
+
+    def _planes(self, usuario, url):
+        """Retorna [(sql, plan)] de las consultas SELECT que hizo el endpoint"""
+        client = APIClient()
+        client.force_authenticate(usuario)
+        with CaptureQueriesContext(connection) as contexto:
+            respuesta = client.get(url)
+        if respuesta.status_code != 200:
+            raise CommandError(f'{url} respondió {respuesta.status_code}')
+
+        planes = []
+        with connection.cursor() as cursor:
+            for consulta in contexto.captured_queries:
+                sql = consulta['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                if connection.vendor == 'sqlite':
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                    plan = ' | '.join(str(fila[-1]) for fila in cursor.fetchall())
+                else:
+                    cursor.execute(f'EXPLAIN {sql}')
+                    columnas = [col[0] for col in cursor.description]
+                    plan = ' | '.join(
+                        str(dict(zip(columnas, fila)).get('key')) for fila in cursor.fetchall()
+                    )
+                planes.append((sql, plan))
+        return planes
@@ -0,0 +1,375 @@
+"""
+Generador de datos sintéticos a escala para pruebas de carga.
+
+A diferencia de create_sample_data escribe cientos de miles de filas con
+bulk_create en lotes, incluidas las tablas intermedias M2M, y reparte la
+actividad con una distribución de Zipf (--zipf): pocos proyectos concentran
+la mayoría de las solicitudes y comentarios, y pocos usuarios crean,
+postulan y comentan mucho más que el resto. La misma --semilla produce los
+mismos datos. La contraseña se hashea una sola vez y todos los usuarios la
+comparten.
+
+Los correos llevan el prefijo carga-<semilla>-; si ya existen datos de esa
+semilla el comando se detiene (usa otra semilla o una base nueva). Las
+fechas se reparten en los últimos --dias días respetando el orden
+registro < proyecto < colaboración/comentario y ningún proyecto acepta más
+colaboradores que los necesarios. Al terminar se recalculan los contadores
+desnormalizados de Proyecto y se invalidan los índices de emparejamiento;
+el índice de búsqueda en memoria (si se usa) se reconstruye al reiniciar
+el servidor.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from inacap_projects.cache import incrementar_version
+from inacap_projects.search import documento_busqueda
+from projects import matching
+from projects.models import Proyecto, Colaboracion, Comentario
+from users.models import Disciplina, Habilidad
+
+Usuario = get_user_model()
+
+DISCIPLINAS = [
+    'Desarrollo de Software', 'Diseño Gráfico', 'Redes y Telecomunicaciones', 'Base de Datos',
+    'Ciberseguridad', 'Marketing Digital', 'Administración', 'Electricidad', 'Mecánica', 'Construcción',
+]
+HABILIDADES = [
+    'Python', 'JavaScript', 'React', 'Django', 'Angular', 'Node.js', 'PostgreSQL', 'MySQL', 'MongoDB',
+    'Git', 'Docker', 'AWS', 'UI/UX Design', 'Photoshop', 'Illustrator', 'Figma', 'Java', 'C#', 'Kotlin',
+    'Flutter', 'Excel', 'Power BI', 'AutoCAD', 'Arduino', 'Linux', 'Scrum', 'SEO', 'Liderazgo',
+    'Comunicación', 'Trabajo en Equipo',
+]
+NOMBRES = [
+    'María', 'Juan', 'Sofía', 'Carlos', 'Ana', 'Diego', 'Valentina', 'Matías', 'Camila', 'Benjamín',
+    'Isidora', 'Vicente', 'Fernanda', 'Tomás', 'Javiera', 'Joaquín', 'Catalina', 'Agustín', 'Constanza',
+    'Martín', 'Antonia', 'Felipe', 'Florencia', 'Cristóbal',
+]
+APELLIDOS = [
+    'González', 'Muñoz', 'Rojas', 'Díaz', 'Pérez', 'Soto', 'Contreras', 'Silva', 'Martínez', 'Sepúlveda',
+    'Morales', 'Rodríguez', 'López', 'Fuentes', 'Hernández', 'Torres', 'Araya', 'Flores', 'Espinoza',
+    'Valenzuela', 'Castillo', 'Tapia', 'Reyes', 'Gutiérrez',
+]
+CARRERAS = [
+    'Ingeniería en Informática', 'Analista Programador', 'Diseño Gráfico Digital', 'Conectividad y Redes',
+    'Ingeniería en Ciberseguridad', 'Marketing Digital', 'Ingeniería en Administración',
+    'Ingeniería Eléctrica', 'Ingeniería Mecánica', 'Construcción Civil',
+]
+TIPOS_PROYECTO = [
+    'Plataforma', 'Aplicación móvil', 'Sistema', 'Portal', 'Prototipo', 'Estudio', 'Campaña', 'Red',
+    'Dashboard', 'Chatbot',
+]
+TEMAS = [
+    'gestión de inventario', 'reciclaje', 'tutorías entre pares', 'reservas de laboratorio',
+    'monitoreo de energía', 'seguridad del campus', 'emprendimiento local', 'salud mental',
+    'transporte compartido', 'huertos urbanos', 'domótica', 'turismo regional', 'ventas en línea',
+    'control de asistencia', 'voluntariado',
+]
+PUBLICOS = [
+    'estudiantes', 'pymes', 'la comunidad', 'adultos mayores', 'juntas de vecinos', 'docentes',
+    'emprendedores', 'municipalidades',
+]
+FRASES = [
+    'Me interesa mucho el proyecto.', 'Tengo experiencia en algo similar.', '¿Cuándo empiezan?',
+    '¿Qué tecnologías van a usar?', 'Puedo aportar con el diseño.', 'Excelente idea.',
+    'Me gustaría sumarme al equipo.', '¿Hay reuniones presenciales?', 'Les comparto un recurso útil.',
+    'Buen avance esta semana.',
+]
+
+ESTADOS_PROYECTO = (['ACTIVO', 'EN_PROGRESO', 'COMPLETADO', 'BORRADOR', 'CANCELADO'], [50, 25, 15, 5, 5])
+ESTADOS_COLABORACION = (['PENDIENTE', 'ACEPTADA', 'RECHAZADA', 'CANCELADA'], [40, 35, 20, 5])
+
+
+class Zipf:
+    """Elige índices 0..n-1 con probabilidad ~ 1/rango^s sobre un orden aleatorio"""
+
+    def __init__(self, rng, n, s):
+        self.rng = rng
+        self.orden = list(range(n))
+        rng.shuffle(self.orden)
+        self.acumulados = list(accumulate(1 / rango ** s for rango in range(1, n + 1)))
+
+    def elegir(self, k):
+        rangos = self.rng.choices(range(len(self.orden)), cum_weights=self.acumulados, k=k)
+        return [self.orden[rango] for rango in rangos]
+
+
+@contextmanager
+def fechas_manuales(*modelos):
+    """Desactiva auto_now/auto_now_add para que bulk_create respete las fechas dadas"""
+    campos = [
+        (campo, campo.auto_now, campo.auto_now_add)
+        for modelo in modelos for campo in modelo._meta.concrete_fields
+        if getattr(campo, 'auto_now', False) or getattr(campo, 'auto_now_add', False)
+    ]
+    for campo, _, _ in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in campos:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Genera datos sintéticos a escala (usuarios, proyectos, colaboraciones, comentarios)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=2000, help='Usuarios a crear')
+        parser.add_argument('--proyectos', type=int, default=500, help='Proyectos a crear')
+        parser.add_argument('--colaboraciones', type=int, default=5000, help='Colaboraciones a crear')
+        parser.add_argument('--comentarios', type=int, default=5000, help='Comentarios a crear')
+        parser.add_argument('--semilla', type=int, default=42, help='Semilla del generador aleatorio')
+        parser.add_argument('--zipf', type=float, default=1.0,
+                            help='Exponente de la distribución de popularidad (0 = uniforme)')
+        parser.add_argument('--dias', type=int, default=365, help='Antigüedad máxima de los datos')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Filas por INSERT')
+        parser.add_argument('--password', default='password123', help='Contraseña de todos los usuarios')
+
+    def handle(self, *args, **options):
+        if options['usuarios'] < 2 or options['proyectos'] < 1:
+            raise CommandError('Se necesitan al menos 2 usuarios y 1 proyecto')
+        self.rng = random.Random(options['semilla'])
+        self.batch_size = options['batch_size']
+        self.zipf = options['zipf']
+        self.prefijo = f"carga-{options['semilla']}-"
+        if Usuario.objects.filter(email__startswith=self.prefijo).exists():
+            raise CommandError(
+                f"Ya hay datos generados con la semilla {options['semilla']}; usa otra semilla o una base nueva"
+            )
+        self.ahora = timezone.now().timestamp()
+        self.desde = self.ahora - options['dias'] * 86400
+
+        inicio = time.perf_counter()
+        with fechas_manuales(Usuario, Proyecto, Colaboracion, Comentario):
+            disciplinas, habilidades = self._catalogos()
+            usuarios = self._paso('usuarios', self._usuarios, options['usuarios'], options['password'],
+                                  disciplinas, habilidades)
+            proyectos = self._paso('proyectos', self._proyectos, options['proyectos'], usuarios,
+                                   disciplinas, habilidades)
+            self._paso('colaboraciones', self._colaboraciones, options['colaboraciones'], usuarios, proyectos)
+            self._paso('comentarios', self._comentarios, options['comentarios'], usuarios, proyectos)
+        self._paso('contadores', self._contadores, proyectos)
+
+        matching.indice_proyectos.invalidar()
+        matching.indice_usuarios.invalidar()
+        for modelo in (Usuario, Proyecto):
+            incrementar_version(modelo._meta.model_name)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Datos de carga generados en {time.perf_counter() - inicio:.1f} s (prefijo {self.prefijo})'
+        ))
+
+    def _paso(self, nombre, funcion, *args):
+        """Ejecuta un paso e informa las filas escritas (incluidas las M2M) y el tiempo"""
+        self.filas = 0
+        inicio = time.perf_counter()
+        resultado = funcion(*args)
+        self.stdout.write(f'  ✓ {nombre}: {self.filas} filas ({time.perf_counter() - inicio:.1f} s)')
+        return resultado
+
+    def _insertar(self, modelo, filas):
+        """bulk_create por lotes desde un iterable"""
+        lote = []
+        for fila in filas:
+            lote.append(fila)
+            if len(lote) >= self.batch_size:
+                modelo.objects.bulk_create(lote)
+                self.filas += len(lote)
+                lote = []
+        if lote:
+            modelo.objects.bulk_create(lote)
+            self.filas += len(lote)
+
+    def _fecha(self, desde):
+        """Timestamp uniforme entre `desde` y ahora"""
+        return desde + self.rng.random() * (self.ahora - desde)
+
+    @staticmethod
+    def _datetime(timestamp):
+        return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+
+    def _catalogos(self):
+        """Completa disciplinas y habilidades; se usan todas las existentes"""
+        Disciplina.objects.bulk_create([Disciplina(nombre=nombre) for nombre in DISCIPLINAS], ignore_conflicts=True)
+        Habilidad.objects.bulk_create([Habilidad(nombre=nombre) for nombre in HABILIDADES], ignore_conflicts=True)
+        incrementar_version(Disciplina._meta.model_name)
+        incrementar_version(Habilidad._meta.model_name)
+        return (
+            list(Disciplina.objects.order_by('pk').values_list('pk', flat=True)),
+            list(Habilidad.objects.order_by('pk').values_list('pk', flat=True)),
+        )
+
+    def _usuarios(self, cantidad, password, disciplinas, habilidades):
+        rng = self.rng
+        # Un solo hash: PBKDF2 por usuario tomaría horas
+        hash_password = make_password(password)
+        fechas = [self._fecha(self.desde) for _ in range(cantidad)]
+
+        def filas():
+            for i in range(cantidad):
+                fecha = self._datetime(fechas[i])
+                usuario = Usuario(
+                    email=f'{self.prefijo}{i}@carga.local',
+                    nombre=rng.choice(NOMBRES),
+                    apellido=f'{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}',
+                    carrera=rng.choice(CARRERAS),
+                    semestre=rng.randint(1, 8),
+                    disciplina_id=rng.choice(disciplinas) if rng.random() < 0.9 else None,
+                    bio=f'Estudiante interesado en {rng.choice(TEMAS)}.' if rng.random() < 0.6 else '',
+                    password=hash_password,
+                    is_active=rng.random() < 0.97,
+                    date_joined=fecha,
+                    updated_at=fecha,
+                )
+                usuario.texto_busqueda = documento_busqueda(
+                    *(getattr(usuario, campo) for campo in Usuario.CAMPOS_BUSQUEDA)
+                )
+                yield usuario
+
+        self._insertar(Usuario, filas())
+        # En MySQL bulk_create no devuelve los IDs; el orden de pk es el de inserción
+        pks = list(
+            Usuario.objects.filter(email__startswith=self.prefijo).order_by('pk').values_list('pk', flat=True)
+        )
+        elegir_habilidad = Zipf(rng, len(habilidades), self.zipf)
+        through = Usuario.habilidades.through
+        self._insertar(through, (
+            through(usuario_id=pk, habilidad_id=habilidades[indice])
+            for pk in pks
+            for indice in set(elegir_habilidad.elegir(rng.randint(0, 6)))
+        ))
+        return pks, fechas
+
+    def _proyectos(self, cantidad, usuarios, disciplinas, habilidades):
+        rng = self.rng
+        usuario_pks, fechas_usuarios = usuarios
+        # Pocos usuarios crean muchos proyectos
+        creadores = Zipf(rng, len(usuario_pks), self.zipf).elegir(cantidad)
+        fechas = [self._fecha(fechas_usuarios[creador]) for creador in creadores]
+        estados = rng.choices(*ESTADOS_PROYECTO, k=cantidad)
+        necesarios = [rng.randint(1, 8) for _ in range(cantidad)]
+
+        def filas():
+            for i, creador in enumerate(creadores):
+                fecha = self._datetime(fechas[i])
+                tema = rng.choice(TEMAS)
+                proyecto = Proyecto(
+                    titulo=f'{rng.choice(TIPOS_PROYECTO)} de {tema} para {rng.choice(PUBLICOS)}',
+                    descripcion=' '.join(rng.choice(FRASES) for _ in range(rng.randint(2, 8))) + f' Tema: {tema}.',
+                    objetivo=f'Mejorar {tema} con un equipo multidisciplinario.',
+                    creador_id=usuario_pks[creador],
+                    estado=estados[i],
+                    colaboradores_necesarios=necesarios[i],
+                    fecha_inicio=fecha.date() if estados[i] != 'BORRADOR' else None,
+                    created_at=fecha,
+                    updated_at=fecha,
+                )
+                proyecto.texto_busqueda = documento_busqueda(
+                    *(getattr(proyecto, campo) for campo in Proyecto.CAMPOS_BUSQUEDA)
+                )
+                yield proyecto
+
+        self._insertar(Proyecto, filas())
+        pks = list(
+            Proyecto.objects.filter(creador__email__startswith=self.prefijo)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        elegir_habilidad = Zipf(rng, len(habilidades), self.zipf)
+        elegir_disciplina = Zipf(rng, len(disciplinas), self.zipf)
+        habilidades_through = Proyecto.habilidades_requeridas.through
+        disciplinas_through = Proyecto.disciplinas_requeridas.through
+        self._insertar(habilidades_through, (
+            habilidades_through(proyecto_id=pk, habilidad_id=habilidades[indice])
+            for pk in pks
+            for indice in set(elegir_habilidad.elegir(rng.randint(1, 5)))
+        ))
+        self._insertar(disciplinas_through, (
+            disciplinas_through(proyecto_id=pk, disciplina_id=disciplinas[indice])
+            for pk in pks
+            for indice in set(elegir_disciplina.elegir(rng.randint(1, 2)))
+        ))
+        return pks, fechas, creadores, necesarios
+
+    def _actividad(self, cantidad, usuarios, proyectos):
+        """Pares (proyecto, usuario) con proyectos populares y usuarios muy activos"""
+        rng = self.rng
+        elegir_proyecto = Zipf(rng, len(proyectos[0]), self.zipf)
+        elegir_usuario = Zipf(rng, len(usuarios[0]), self.zipf)
+        while True:
+            lote = min(self.batch_size, cantidad)
+            # Mitad usuarios activos, mitad al azar: evita que todos postulen a lo mismo
+            usuarios_lote = [
+                elegido if rng.random() < 0.5 else rng.randrange(len(usuarios[0]))
+                for elegido in elegir_usuario.elegir(lote)
+            ]
+            yield from zip(elegir_proyecto.elegir(lote), usuarios_lote)
+
+    def _colaboraciones(self, cantidad, usuarios, proyectos):
+        rng = self.rng
+        usuario_pks = usuarios[0]
+        proyecto_pks, fechas, creadores, necesarios = proyectos
+        aceptadas = [0] * len(proyecto_pks)
+        posibles = len(proyecto_pks) * (len(usuario_pks) - 1)
+        if cantidad > posibles // 2:
+            raise CommandError(f'Demasiadas colaboraciones para {len(proyecto_pks)} proyectos y '
+                               f'{len(usuario_pks)} usuarios (máximo {posibles // 2})')
+        vistos = set()
+
+        def filas():
+            pares = self._actividad(cantidad, usuarios, proyectos)
+            while len(vistos) < cantidad:
+                proyecto, usuario = next(pares)
+                clave = proyecto * len(usuario_pks) + usuario
+                if usuario == creadores[proyecto] or clave in vistos:
+                    continue
+                vistos.add(clave)
+                estado = rng.choices(*ESTADOS_COLABORACION)[0]
+                if estado == 'ACEPTADA':
+                    # Sin sobrepasar las vacantes: el resto queda pendiente o rechazado
+                    if aceptadas[proyecto] >= necesarios[proyecto]:
+                        estado = rng.choice(['PENDIENTE', 'RECHAZADA'])
+                    else:
+                        aceptadas[proyecto] += 1
+                fecha = self._datetime(self._fecha(fechas[proyecto]))
+                yield Colaboracion(
+                    proyecto_id=proyecto_pks[proyecto],
+                    usuario_id=usuario_pks[usuario],
+                    estado=estado,
+                    rol='LÍDER' if estado == 'ACEPTADA' and rng.random() < 0.05 else 'COLABORADOR',
+                    mensaje=rng.choice(FRASES),
+                    created_at=fecha,
+                    updated_at=fecha,
+                )
+
+        self._insertar(Colaboracion, filas())
+
+    def _comentarios(self, cantidad, usuarios, proyectos):
+        rng = self.rng
+        usuario_pks = usuarios[0]
+        proyecto_pks, fechas = proyectos[:2]
+        pares = self._actividad(cantidad, usuarios, proyectos)
+
+        def filas():
+            for _ in range(cantidad):
+                proyecto, usuario = next(pares)
+                fecha = self._datetime(self._fecha(fechas[proyecto]))
+                yield Comentario(
+                    proyecto_id=proyecto_pks[proyecto],
+                    usuario_id=usuario_pks[usuario],
+                    contenido=' '.join(rng.choice(FRASES) for _ in range(rng.randint(1, 3))),
+                    created_at=fecha,
+                    updated_at=fecha,
+                )
+
+        self._insertar(Comentario, filas())
+
+    def _contadores(self, proyectos):
+        pks = proyectos[0]
+        for inicio in range(0, len(pks), 1000):
+            self.filas += Proyecto.objects.filter(pk__in=pks[inicio:inicio + 1000]).recalcular_contadores()
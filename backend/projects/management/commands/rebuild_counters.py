@@ -0,0 +1,54 @@
+"""
+Comando para reconstruir y verificar los contadores desnormalizados de Proyecto.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Q
+from projects.models import Proyecto
+
+CONTADORES = ['num_colaboradores', 'num_solicitudes_pendientes', 'num_comentarios']
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye y verifica los contadores de colaboradores, solicitudes y comentarios'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Solo verifica; termina con error si hay contadores desalineados',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Cantidad de proyectos corregidos por sentencia UPDATE',
+        )
+
+    def handle(self, *args, **options):
+        coincide = Q()
+        for campo in CONTADORES:
+            coincide &= Q(**{campo: F(f'{campo}_esperado')})
+
+        desalineados = list(
+            Proyecto.objects.con_contadores_esperados()
+            .exclude(coincide)
+            .order_by()
+            .values_list('pk', flat=True)
+        )
+        self.stdout.write(f'Proyectos con contadores desalineados: {len(desalineados)}')
+
+        if options['check']:
+            if desalineados:
+                ejemplo = ', '.join(str(pk) for pk in desalineados[:20])
+                raise CommandError(f'Contadores desalineados en proyectos: {ejemplo}')
+            self.stdout.write(self.style.SUCCESS('✅ Contadores verificados'))
+            return
+
+        batch_size = options['batch_size']
+        for inicio in range(0, len(desalineados), batch_size):
+            lote = desalineados[inicio:inicio + batch_size]
+            with transaction.atomic():
+                Proyecto.objects.filter(pk__in=lote).recalcular_contadores()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Contadores reconstruidos ({len(desalineados)} proyectos)'))
@@ -0,0 +1,259 @@
+"""
+Emparejamiento por habilidades y disciplinas.
+
+Mantiene en memoria índices invertidos de (tipo, id) -> arreglo compacto
+de IDs, uno para los requisitos de los proyectos y otro para el perfil de
+los usuarios activos, construidos desde las tablas M2M y actualizados con
+señales. Ambos puntúan con un Jaccard ponderado entre los requisitos del
+proyecto y el perfil del usuario.
+
+El índice es local a cada proceso. Cada cambio incrementa una versión en
+la caché de Django; si otro proceso la incrementó, el índice se reconstruye
+en la siguiente consulta. Con 'locmem', el valor por defecto, esa versión
+no se comparte entre workers, así que además cada INTERVALO_FIRMA segundos
+el índice compara una firma barata de la base de datos (conteo e ID máximo
+de las filas M2M que lo alimentan y, en el de usuarios, el conteo y el
+updated_at máximo de los activos, que cubre disciplina e is_active) con la
+que tenía al construirse y se reconstruye si cambió. Con una caché compartida (CACHE_BACKEND=file o db)
+los cambios de otros procesos se ven en la consulta siguiente; sin ella,
+a más tardar INTERVALO_FIRMA segundos después.
+"""
+import bisect
+import threading
+import time
+from array import array
+from collections import Counter
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+# Peso de cada tipo de requisito en el Jaccard ponderado
+PESO_HABILIDAD = 1.0
+PESO_DISCIPLINA = 0.5
+
+# Estados en que un proyecto puede recibir colaboradores
+ESTADOS_ABIERTOS = ['ACTIVO', 'EN_PROGRESO']
+
+HABILIDAD = 'h'
+DISCIPLINA = 'd'
+PESOS = {HABILIDAD: PESO_HABILIDAD, DISCIPLINA: PESO_DISCIPLINA}
+
+# Segundos entre comparaciones de la firma en la base de datos
+INTERVALO_FIRMA = 5
+
+
+class IndiceInvertido:
+    """
+    Índice de clave -> array('q') ordenado de IDs, con los pesos por ID.
+
+    Las claves son pares (tipo, id), p. ej. (HABILIDAD, 3). Los conteos de
+    coincidencias usan Counter.update sobre los arreglos, que corre en C.
+    """
+
+    def __init__(self, clave_cache, cargar, firmar=None):
+        self.clave_cache = clave_cache
+        self._cargar = cargar
+        self._firmar = firmar
+        self._lock = threading.Lock()
+        self._postings = {}
+        self._claves = {}
+        self._pesos = {}
+        self._version = None
+        self._firma = None
+        self._comprobado = 0.0
+
+    def construir(self):
+        """Reconstruye el índice completo desde la base de datos"""
+        version = self._version_actual()
+        # Se firma antes de cargar: un cambio durante la carga fuerza otra
+        firma = self._firmar() if self._firmar else None
+        claves = {}
+        for objeto_id, clave in self._cargar():
+            claves.setdefault(objeto_id, set()).add(clave)
+        postings = {}
+        for objeto_id in sorted(claves):
+            for clave in claves[objeto_id]:
+                postings.setdefault(clave, array('q')).append(objeto_id)
+        with self._lock:
+            self._claves = {objeto_id: frozenset(c) for objeto_id, c in claves.items()}
+            self._pesos = {objeto_id: peso_total(c) for objeto_id, c in self._claves.items()}
+            self._postings = postings
+            self._version = version
+            self._firma = firma
+            self._comprobado = time.monotonic()
+
+    def _version_actual(self):
+        cache.add(self.clave_cache, 0, timeout=None)
+        return cache.get(self.clave_cache, 0)
+
+    def _asegurar_vigente(self):
+        if self._version is None or self._version != self._version_actual():
+            self.construir()
+        elif self._firmar and time.monotonic() - self._comprobado >= INTERVALO_FIRMA:
+            # Cambios de otros procesos que la versión no trajo (caché no compartida)
+            if self._firmar() != self._firma:
+                self.construir()
+            else:
+                self._comprobado = time.monotonic()
+
+    def actualizar(self, objeto_id, claves):
+        """Reemplaza las claves de un objeto e informa el cambio a otros procesos"""
+        claves = frozenset(claves)
+        try:
+            version = cache.incr(self.clave_cache)
+        except ValueError:
+            cache.add(self.clave_cache, 1, timeout=None)
+            version = None
+        with self._lock:
+            if self._version is None:
+                return
+            anteriores = self._claves.pop(objeto_id, frozenset())
+            self._pesos.pop(objeto_id, None)
+            for clave in anteriores - claves:
+                postings = self._postings.get(clave)
+                if postings is not None and objeto_id in postings:
+                    postings.remove(objeto_id)
+            for clave in claves - anteriores:
+                bisect.insort(self._postings.setdefault(clave, array('q')), objeto_id)
+            if claves:
+                self._claves[objeto_id] = claves
+                self._pesos[objeto_id] = peso_total(claves)
+            # Solo se sigue vigente si nadie más cambió la versión entretanto
+            self._version = version if version == (self._version or 0) + 1 else None
+
+    def eliminar(self, objeto_id):
+        self.actualizar(objeto_id, ())
+
+    def invalidar(self):
+        """Fuerza una reconstrucción en todos los procesos"""
+        try:
+            cache.incr(self.clave_cache)
+        except ValueError:
+            cache.add(self.clave_cache, 1, timeout=None)
+        with self._lock:
+            self._version = None
+
+    def puntuar(self, claves, excluir=()):
+        """Retorna [(id, puntaje)] ordenado por Jaccard ponderado descendente"""
+        self._asegurar_vigente()
+        claves = frozenset(claves)
+        peso_consulta = peso_total(claves)
+        if not peso_consulta:
+            return []
+
+        with self._lock:
+            comunes = {}
+            for tipo, peso in PESOS.items():
+                contador = Counter()
+                for clave in claves:
+                    if clave[0] == tipo and clave in self._postings:
+                        contador.update(self._postings[clave])
+                for objeto_id, cantidad in contador.items():
+                    comunes[objeto_id] = comunes.get(objeto_id, 0.0) + cantidad * peso
+            pesos = self._pesos
+
+            excluir = set(excluir)
+            puntajes = [
+                (objeto_id, interseccion / (peso_consulta + pesos[objeto_id] - interseccion))
+                for objeto_id, interseccion in comunes.items()
+                if objeto_id not in excluir
+            ]
+        puntajes.sort(key=lambda item: (-item[1], -item[0]))
+        return puntajes
+
+
+def peso_total(claves):
+    return sum(PESOS[tipo] for tipo, _ in claves)
+
+
+def _firma_filas(queryset):
+    """(conteo, ID máximo): cambia con cada alta y cada baja de filas"""
+    agregados = queryset.order_by().aggregate(total=Count('pk'), ultimo=Max('pk'))
+    return agregados['total'], agregados['ultimo']
+
+
+def _requisitos_de_proyectos(proyecto_ids=None):
+    """Genera pares (proyecto_id, clave) desde las tablas M2M de Proyecto"""
+    from .models import Proyecto
+    tablas = (
+        (Proyecto.habilidades_requeridas.through, 'habilidad_id', HABILIDAD),
+        (Proyecto.disciplinas_requeridas.through, 'disciplina_id', DISCIPLINA),
+    )
+    for through, campo, tipo in tablas:
+        filas = through.objects.order_by()
+        if proyecto_ids is not None:
+            filas = filas.filter(proyecto_id__in=proyecto_ids)
+        for proyecto_id, valor in filas.values_list('proyecto_id', campo).iterator(chunk_size=5000):
+            yield proyecto_id, (tipo, valor)
+
+
+def _firma_de_proyectos():
+    from .models import Proyecto
+    return (
+        _firma_filas(Proyecto.habilidades_requeridas.through.objects.all()),
+        _firma_filas(Proyecto.disciplinas_requeridas.through.objects.all()),
+    )
+
+
+indice_proyectos = IndiceInvertido(
+    'matching:proyectos:version', _requisitos_de_proyectos, _firma_de_proyectos
+)
+
+
+def actualizar_proyecto(proyecto_id):
+    """Relee los requisitos de un proyecto y parcha el índice"""
+    indice_proyectos.actualizar(
+        proyecto_id, [clave for _, clave in _requisitos_de_proyectos([proyecto_id])]
+    )
+
+
+def _perfiles_de_usuarios(usuario_ids=None):
+    """Genera pares (usuario_id, clave) de los usuarios activos"""
+    from django.contrib.auth import get_user_model
+    Usuario = get_user_model()
+    habilidades = Usuario.habilidades.through.objects.filter(usuario__is_active=True).order_by()
+    disciplinas = Usuario.objects.filter(is_active=True, disciplina__isnull=False).order_by()
+    if usuario_ids is not None:
+        habilidades = habilidades.filter(usuario_id__in=usuario_ids)
+        disciplinas = disciplinas.filter(pk__in=usuario_ids)
+    for usuario_id, habilidad_id in habilidades.values_list('usuario_id', 'habilidad_id').iterator(chunk_size=5000):
+        yield usuario_id, (HABILIDAD, habilidad_id)
+    for usuario_id, disciplina_id in disciplinas.values_list('pk', 'disciplina_id').iterator(chunk_size=5000):
+        yield usuario_id, (DISCIPLINA, disciplina_id)
+
+
+def _firma_de_usuarios():
+    from django.contrib.auth import get_user_model
+    Usuario = get_user_model()
+    activos = Usuario.objects.filter(is_active=True).order_by().aggregate(
+        total=Count('pk'), ultimo=Max('updated_at')
+    )
+    return (
+        _firma_filas(Usuario.habilidades.through.objects.all()),
+        (activos['total'], activos['ultimo']),
+    )
+
+
+indice_usuarios = IndiceInvertido(
+    'matching:usuarios:version', _perfiles_de_usuarios, _firma_de_usuarios
+)
+
+
+def actualizar_usuario(usuario_id):
+    """Relee el perfil de un usuario y parcha el índice"""
+    indice_usuarios.actualizar(
+        usuario_id, [clave for _, clave in _perfiles_de_usuarios([usuario_id])]
+    )
+
+
+def claves_de_proyecto(proyecto):
+    """Claves de índice para los requisitos de un proyecto"""
+    return {clave for _, clave in _requisitos_de_proyectos([proyecto.pk])}
+
+
+def claves_de_usuario(usuario):
+    """Claves de índice para las habilidades y la disciplina de un usuario"""
+    claves = {(HABILIDAD, pk) for pk in usuario.habilidades.values_list('pk', flat=True)}
+    if usuario.disciplina_id:
+        claves.add((DISCIPLINA, usuario.disciplina_id))
+    return claves
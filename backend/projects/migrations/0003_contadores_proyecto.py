@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:22
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def poblar_contadores(apps, schema_editor):
+    Proyecto = apps.get_model('projects', 'Proyecto')
+    Colaboracion = apps.get_model('projects', 'Colaboracion')
+    Comentario = apps.get_model('projects', 'Comentario')
+
+    def contar(modelo, **filtros):
+        subconsulta = modelo.objects.filter(
+            proyecto=OuterRef('pk'), **filtros
+        ).order_by().values('proyecto').annotate(total=Count('pk')).values('total')
+        return Coalesce(Subquery(subconsulta), 0)
+
+    Proyecto.objects.update(
+        num_colaboradores=contar(Colaboracion, estado='ACEPTADA'),
+        num_solicitudes_pendientes=contar(Colaboracion, estado='PENDIENTE'),
+        num_comentarios=contar(Comentario),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proyecto',
+            name='num_colaboradores',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Colaboradores Aceptados'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='num_comentarios',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Comentarios'),
+        ),
+        migrations.AddField(
+            model_name='proyecto',
+            name='num_solicitudes_pendientes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Solicitudes Pendientes'),
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
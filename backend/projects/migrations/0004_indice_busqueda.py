@@ -0,0 +1,68 @@
+from django.db import migrations
+
+TABLA_FTS = 'projects_proyecto_fts'
+INDICE_FULLTEXT = 'projects_proyecto_fulltext'
+COLUMNAS = 'titulo, objetivo, descripcion'
+
+
+def crear_indice(apps, schema_editor):
+    """Crea el índice de texto completo propio del motor de base de datos"""
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        schema_editor.execute(
+            f'CREATE FULLTEXT INDEX {INDICE_FULLTEXT} ON projects_proyecto ({COLUMNAS})'
+        )
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            (fts5_compilado,) = cursor.fetchone()
+        try:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {TABLA_FTS} USING fts5({COLUMNAS}, "
+                f"content='projects_proyecto', content_rowid='id')"
+            )
+        except Exception:
+            if fts5_compilado:
+                raise
+            # Sin FTS5 se usará el índice en memoria (projects.search)
+            return
+        # Triggers que mantienen la tabla FTS sincronizada con los proyectos
+        valores_nuevos = ', '.join(f'new.{c.strip()}' for c in COLUMNAS.split(','))
+        valores_viejos = ', '.join(f'old.{c.strip()}' for c in COLUMNAS.split(','))
+        schema_editor.execute(
+            f"CREATE TRIGGER {TABLA_FTS}_ai AFTER INSERT ON projects_proyecto BEGIN "
+            f"INSERT INTO {TABLA_FTS}(rowid, {COLUMNAS}) VALUES (new.id, {valores_nuevos}); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {TABLA_FTS}_ad AFTER DELETE ON projects_proyecto BEGIN "
+            f"INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, {COLUMNAS}) "
+            f"VALUES ('delete', old.id, {valores_viejos}); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {TABLA_FTS}_au AFTER UPDATE OF {COLUMNAS} ON projects_proyecto BEGIN "
+            f"INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, {COLUMNAS}) "
+            f"VALUES ('delete', old.id, {valores_viejos}); "
+            f"INSERT INTO {TABLA_FTS}(rowid, {COLUMNAS}) VALUES (new.id, {valores_nuevos}); END"
+        )
+        schema_editor.execute(f"INSERT INTO {TABLA_FTS}({TABLA_FTS}) VALUES ('rebuild')")
+
+
+def eliminar_indice(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'mysql':
+        schema_editor.execute(f'DROP INDEX {INDICE_FULLTEXT} ON projects_proyecto')
+    elif connection.vendor == 'sqlite':
+        for sufijo in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {TABLA_FTS}_{sufijo}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABLA_FTS}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_contadores_proyecto'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:28
+
+from importlib import import_module
+
+from django.db import migrations, models
+from inacap_projects.search import crear_indice_texto, documento_busqueda, eliminar_indice_texto
+
+TABLA = 'projects_proyecto'
+CAMPOS_BUSQUEDA = ('titulo', 'objetivo', 'descripcion')
+
+
+def poblar_texto_busqueda(apps, schema_editor):
+    Proyecto = apps.get_model('projects', 'Proyecto')
+    lote = []
+    for proyecto in Proyecto.objects.only('pk', *CAMPOS_BUSQUEDA).iterator(chunk_size=1000):
+        proyecto.texto_busqueda = documento_busqueda(*(getattr(proyecto, campo) for campo in CAMPOS_BUSQUEDA))
+        lote.append(proyecto)
+        if len(lote) == 1000:
+            Proyecto.objects.bulk_update(lote, ['texto_busqueda'])
+            lote = []
+    Proyecto.objects.bulk_update(lote, ['texto_busqueda'])
+
+
+def indexar_texto_busqueda(apps, schema_editor):
+    """Reemplaza el índice sobre las columnas originales por uno sobre texto_busqueda"""
+    eliminar_indice_texto(schema_editor, TABLA)
+    crear_indice_texto(schema_editor, TABLA)
+
+
+def restaurar_indice_original(apps, schema_editor):
+    eliminar_indice_texto(schema_editor, TABLA)
+    import_module('projects.migrations.0004_indice_busqueda').crear_indice(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_indice_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proyecto',
+            name='texto_busqueda',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(poblar_texto_busqueda, migrations.RunPython.noop),
+        migrations.RunPython(indexar_texto_busqueda, restaurar_indice_original),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_texto_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='colaboracion',
+            index=models.Index(fields=['-created_at', '-id'], name='colaboracion_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comentario',
+            index=models.Index(fields=['-created_at', '-id'], name='comentario_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(fields=['-created_at', '-id'], name='proyecto_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0006_indices_keyset'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='colaboracion',
+            index=models.Index(fields=['usuario', 'estado', '-created_at'], name='colaboracion_usuario_est_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='colaboracion',
+            index=models.Index(fields=['usuario', '-created_at'], name='colaboracion_usuario_cre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='colaboracion',
+            index=models.Index(fields=['proyecto', 'estado', '-created_at'], name='colaboracion_proyecto_est_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comentario',
+            index=models.Index(fields=['proyecto', '-created_at'], name='comentario_proyecto_cre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(fields=['estado', '-created_at'], name='proyecto_estado_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='proyecto',
+            index=models.Index(fields=['creador', '-created_at'], name='proyecto_creador_created_idx'),
+        ),
+    ]
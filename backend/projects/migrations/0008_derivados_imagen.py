@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:56
+
+from django.db import migrations, models
+from inacap_projects.search import crear_indice_texto, eliminar_indice_texto
+
+TABLA = 'projects_proyecto'
+
+
+def recrear_indice_sqlite(apps, schema_editor):
+    """En SQLite AddField reconstruye la tabla y con ello borra los triggers FTS5"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    eliminar_indice_texto(schema_editor, TABLA)
+    crear_indice_texto(schema_editor, TABLA)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_indices_compuestos'),
+    ]
+
+    operations = [
+        # Al revertir, RemoveField también reconstruye la tabla
+        migrations.RunPython(migrations.RunPython.noop, recrear_indice_sqlite),
+        migrations.AddField(
+            model_name='proyecto',
+            name='imagen_derivados',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(recrear_indice_sqlite, migrations.RunPython.noop),
+    ]
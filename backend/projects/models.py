@@ -1,7 +1,131 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.utils import timezone
+from inacap_projects.imagenes import sincronizar_derivados
+from inacap_projects.search import documento_busqueda
+from users.estadisticas import invalidar_estadisticas
 from users.models import Disciplina, Habilidad
 
+# Contador de Proyecto afectado por cada estado de colaboración
+CONTADOR_POR_ESTADO = {
+    'ACEPTADA': 'num_colaboradores',
+    'PENDIENTE': 'num_solicitudes_pendientes',
+}
+
+
+def deltas_colaboracion(estado_anterior, estado_nuevo):
+    """Retorna los deltas de contadores para una transición de estado"""
+    deltas = {}
+    campo_anterior = CONTADOR_POR_ESTADO.get(estado_anterior)
+    campo_nuevo = CONTADOR_POR_ESTADO.get(estado_nuevo)
+    if campo_anterior != campo_nuevo:
+        if campo_anterior:
+            deltas[campo_anterior] = -1
+        if campo_nuevo:
+            deltas[campo_nuevo] = 1
+    return deltas
+
+
+class ProyectoQuerySet(models.QuerySet):
+    """QuerySet con utilidades para listar proyectos sin consultas N+1"""
+    
+    def con_estadisticas(self):
+        """Anota si el proyecto aún tiene vacantes según sus contadores"""
+        return self.annotate(
+            con_vacantes=models.ExpressionWrapper(
+                models.Q(num_colaboradores__lt=models.F('colaboradores_necesarios')),
+                output_field=models.BooleanField()
+            )
+        )
+    
+    def ajustar_contadores(self, proyecto_id, **deltas):
+        """Suma los deltas indicados a los contadores del proyecto con F()"""
+        cambios = {
+            campo: models.F(campo) + delta
+            for campo, delta in deltas.items() if delta
+        }
+        if not cambios:
+            return 1
+        # updated_at cambia con los contadores para invalidar los GET condicionales
+        return self.filter(pk=proyecto_id).update(**cambios, updated_at=timezone.now())
+    
+    def reservar_vacantes(self, proyecto_id, cantidad=1, **deltas):
+        """
+        Suma `cantidad` colaboradores solo si caben en las vacantes.
+        
+        El UPDATE condicional bloquea la fila del proyecto hasta el fin de la
+        transacción, por lo que dos aceptaciones concurrentes no pueden
+        sobrepasar colaboradores_necesarios. Retorna True si se reservaron.
+        """
+        deltas['num_colaboradores'] = deltas.get('num_colaboradores', 0) + cantidad
+        cambios = {
+            campo: models.F(campo) + delta
+            for campo, delta in deltas.items() if delta
+        }
+        return self.filter(
+            pk=proyecto_id,
+            num_colaboradores__lte=models.F('colaboradores_necesarios') - cantidad
+        ).update(**cambios, updated_at=timezone.now()) == 1
+    
+    def bloquear(self, proyecto_id):
+        """
+        Bloquea la fila del proyecto hasta el fin de la transacción.
+        
+        Un UPDATE sin cambios toma el bloqueo de escritura tanto en MySQL como
+        en SQLite, donde select_for_update() no tiene efecto.
+        """
+        return self.filter(pk=proyecto_id).update(
+            num_colaboradores=models.F('num_colaboradores')
+        ) == 1
+    
+    def validadores(self):
+        """
+        Retorna los datos que cambian la respuesta de detalle de un proyecto.
+        
+        Una sola consulta con las fechas del proyecto, su creador, sus
+        colaboraciones y comentarios, más los contadores. None si no existe.
+        """
+        def ultima(modelo):
+            return models.Subquery(
+                modelo.objects.filter(proyecto=models.OuterRef('pk')).order_by()
+                .values('proyecto').annotate(ultima=models.Max('updated_at')).values('ultima')
+            )
+        
+        return self.annotate(
+            ultima_colaboracion=ultima(Colaboracion),
+            ultimo_comentario=ultima(Comentario)
+        ).values_list(
+            'updated_at', 'creador__updated_at', 'ultima_colaboracion', 'ultimo_comentario',
+            'num_colaboradores', 'num_solicitudes_pendientes', 'num_comentarios'
+        ).first()
+    
+    def con_contadores_esperados(self):
+        """Anota los contadores calculados desde las tablas relacionadas"""
+        return self.annotate(**{
+            f'{campo}_esperado': expresion
+            for campo, expresion in _expresiones_contadores().items()
+        })
+    
+    def recalcular_contadores(self):
+        """Reescribe los contadores a partir de las tablas relacionadas"""
+        return self.update(**_expresiones_contadores())
+
+
+def _expresiones_contadores():
+    """Subconsultas que calculan cada contador de Proyecto"""
+    def contar(modelo, **filtros):
+        subconsulta = modelo.objects.filter(
+            proyecto=models.OuterRef('pk'), **filtros
+        ).order_by().values('proyecto').annotate(total=models.Count('pk')).values('total')
+        return Coalesce(models.Subquery(subconsulta), 0)
+    
+    return {
+        'num_colaboradores': contar(Colaboracion, estado='ACEPTADA'),
+        'num_solicitudes_pendientes': contar(Colaboracion, estado='PENDIENTE'),
+        'num_comentarios': contar(Comentario),
+    }
+
 
 class Proyecto(models.Model):
     """Modelo para proyectos estudiantiles"""
@@ -19,6 +143,8 @@ class Proyecto(models.Model):
     descripcion = models.TextField(verbose_name='Descripción')
     objetivo = models.TextField(verbose_name='Objetivo')
     imagen = models.ImageField(upload_to='proyectos/', blank=True, null=True, verbose_name='Imagen')
+    # Miniaturas WebP/JPEG generadas en segundo plano (ver inacap_projects.imagenes)
+    imagen_derivados = models.JSONField(default=dict, blank=True, editable=False)
     
     # Relaciones
     creador = models.ForeignKey(
@@ -52,29 +178,130 @@ class Proyecto(models.Model):
         verbose_name='Colaboradores Necesarios'
     )
     
+    # Contadores desnormalizados (ver projects.signals)
+    num_colaboradores = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Colaboradores Aceptados'
+    )
+    num_solicitudes_pendientes = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Solicitudes Pendientes'
+    )
+    num_comentarios = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Comentarios'
+    )
+    
     # Fechas
     fecha_inicio = models.DateField(blank=True, null=True, verbose_name='Fecha de Inicio')
     fecha_fin = models.DateField(blank=True, null=True, verbose_name='Fecha de Fin')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Última Actualización')
     
+    # Términos normalizados para el índice de búsqueda (ver inacap_projects.search)
+    texto_busqueda = models.TextField(blank=True, default='', editable=False)
+    
+    objects = ProyectoQuerySet.as_manager()
+    
+    CAMPOS_BUSQUEDA = ('titulo', 'objetivo', 'descripcion')
+    
     class Meta:
         verbose_name = 'Proyecto'
         verbose_name_plural = 'Proyectos'
         ordering = ['-created_at']
+        indexes = [
+            # Paginación keyset por (created_at, id)
+            models.Index(fields=['-created_at', '-id'], name='proyecto_created_id_idx'),
+            # Filtro ?estado= y mis_proyectos, ambos ordenados por -created_at
+            models.Index(fields=['estado', '-created_at'], name='proyecto_estado_created_idx'),
+            models.Index(fields=['creador', '-created_at'], name='proyecto_creador_created_idx'),
+        ]
     
     def __str__(self):
         return self.titulo
     
+    def save(self, *args, **kwargs):
+        """Recalcula el texto de búsqueda y descarta derivados obsoletos antes de guardar"""
+        self.texto_busqueda = documento_busqueda(*(getattr(self, campo) for campo in self.CAMPOS_BUSQUEDA))
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.CAMPOS_BUSQUEDA):
+            update_fields = {*update_fields, 'texto_busqueda'}
+        update_fields = sincronizar_derivados(self, 'imagen', update_fields)
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+    
     @property
     def colaboradores_actuales(self):
         """Retorna el número de colaboradores aceptados"""
-        return self.colaboraciones.filter(estado='ACEPTADA').count()
+        return self.num_colaboradores
     
     @property
     def tiene_vacantes(self):
         """Verifica si el proyecto aún tiene vacantes"""
+        if hasattr(self, 'con_vacantes'):
+            return self.con_vacantes
         return self.colaboradores_actuales < self.colaboradores_necesarios
+    
+    def resolver_solicitudes(self, aceptar=(), rechazar=(), respuestas=None, respuesta=''):
+        """
+        Acepta y rechaza varias solicitudes en una sola transacción.
+        
+        Las aceptaciones se aplican en el orden recibido hasta agotar las
+        vacantes. Retorna una lista con el resultado de cada ID solicitado.
+        """
+        respuestas = respuestas or {}
+        ahora = timezone.now()
+        resultados = []
+        modificadas = []
+        deltas = {}
+        
+        with transaction.atomic():
+            Proyecto.objects.bloquear(self.pk)
+            self.refresh_from_db(fields=['num_colaboradores', 'num_solicitudes_pendientes'])
+            vacantes = max(self.colaboradores_necesarios - self.num_colaboradores, 0)
+            
+            colaboraciones = Colaboracion.objects.filter(
+                proyecto=self, pk__in=[*aceptar, *rechazar]
+            ).only('pk', 'proyecto_id', 'estado', 'respuesta', 'updated_at').in_bulk()
+            
+            decisiones = [(pk, 'ACEPTADA') for pk in aceptar] + [(pk, 'RECHAZADA') for pk in rechazar]
+            for pk, estado in decisiones:
+                colaboracion = colaboraciones.get(pk)
+                if colaboracion is None:
+                    resultados.append({'id': pk, 'resultado': 'no_encontrada', 'estado': None})
+                    continue
+                if colaboracion.estado == estado:
+                    resultados.append({'id': pk, 'resultado': 'sin_cambios', 'estado': estado})
+                    continue
+                if estado == 'ACEPTADA':
+                    if not vacantes:
+                        resultados.append({'id': pk, 'resultado': 'sin_vacantes', 'estado': colaboracion.estado})
+                        continue
+                    vacantes -= 1
+                
+                for campo, delta in deltas_colaboracion(colaboracion.estado, estado).items():
+                    deltas[campo] = deltas.get(campo, 0) + delta
+                colaboracion.estado = estado
+                colaboracion.respuesta = respuestas.get(pk, respuesta)
+                colaboracion.updated_at = ahora
+                modificadas.append(colaboracion)
+                resultados.append({'id': pk, 'resultado': estado.lower(), 'estado': estado})
+            
+            if modificadas:
+                # Un único UPDATE ... CASE por lote en lugar de un save() por solicitud
+                Colaboracion.objects.bulk_update(
+                    modificadas, ['estado', 'respuesta', 'updated_at'], batch_size=500
+                )
+                invalidar_estadisticas(*(colaboracion.usuario_id for colaboracion in modificadas))
+                Proyecto.objects.ajustar_contadores(self.pk, **deltas)
+                for campo, delta in deltas.items():
+                    setattr(self, campo, getattr(self, campo) + delta)
+        
+        return resultados
 
 
 class Colaboracion(models.Model):
@@ -131,9 +358,67 @@ class Colaboracion(models.Model):
         verbose_name_plural = 'Colaboraciones'
         ordering = ['-created_at']
         unique_together = ['proyecto', 'usuario']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='colaboracion_created_id_idx'),
+            # colaborando y recomendados: colaboraciones de un usuario por estado
+            models.Index(fields=['usuario', 'estado', '-created_at'], name='colaboracion_usuario_est_idx'),
+            # mis_solicitudes
+            models.Index(fields=['usuario', '-created_at'], name='colaboracion_usuario_cre_idx'),
+            # solicitudes y colaboradores de un proyecto
+            models.Index(fields=['proyecto', 'estado', '-created_at'], name='colaboracion_proyecto_est_idx'),
+        ]
     
     def __str__(self):
         return f"{self.usuario.get_full_name()} - {self.proyecto.titulo}"
+    
+    def save(self, *args, **kwargs):
+        """Guarda en una transacción junto con los contadores del proyecto"""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def cambiar_estado(self, estado, respuesta=''):
+        """
+        Cambia el estado con UPDATE condicionales en una sola transacción.
+        
+        La fila solo se modifica si sigue en el estado con que se cargó, y al
+        pasar a ACEPTADA la vacante se reserva en el mismo paso. Retorna
+        False si el proyecto no tiene vacantes o si otra petición cambió la
+        solicitud entretanto; en ese caso la instancia queda recargada.
+        """
+        estado_anterior = self.estado
+        ahora = timezone.now()
+        deltas = deltas_colaboracion(estado_anterior, estado)
+        
+        with transaction.atomic():
+            # El primer UPDATE toma el bloqueo de escritura (también en SQLite)
+            actualizadas = Colaboracion.objects.filter(
+                pk=self.pk, estado=estado_anterior
+            ).update(estado=estado, respuesta=respuesta, updated_at=ahora)
+            
+            if actualizadas:
+                if deltas.get('num_colaboradores', 0) > 0:
+                    deltas.pop('num_colaboradores')
+                    actualizadas = Proyecto.objects.reservar_vacantes(self.proyecto_id, **deltas)
+                else:
+                    Proyecto.objects.ajustar_contadores(self.proyecto_id, **deltas)
+            
+            if not actualizadas:
+                transaction.set_rollback(True)
+        
+        if not actualizadas:
+            self.refresh_from_db(fields=['estado', 'respuesta', 'updated_at'])
+            return False
+        
+        invalidar_estadisticas(self.usuario_id)
+        self.estado = estado
+        self.respuesta = respuesta
+        self.updated_at = ahora
+        self._contador_original = (self.proyecto_id, estado)
+        if Colaboracion.proyecto.is_cached(self):
+            # Refleja los contadores nuevos sin volver a consultar el proyecto
+            for campo, delta in deltas_colaboracion(estado_anterior, estado).items():
+                setattr(self.proyecto, campo, getattr(self.proyecto, campo) + delta)
+        return True
 
 
 class Comentario(models.Model):
@@ -164,6 +449,16 @@ class Comentario(models.Model):
         verbose_name = 'Comentario'
         verbose_name_plural = 'Comentarios'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='comentario_created_id_idx'),
+            # Comentarios de un proyecto (?proyecto=)
+            models.Index(fields=['proyecto', '-created_at'], name='comentario_proyecto_cre_idx'),
+        ]
     
     def __str__(self):
         return f"Comentario de {self.usuario.get_full_name()} en {self.proyecto.titulo}"
+    
+    def save(self, *args, **kwargs):
+        """Guarda en una transacción junto con los contadores del proyecto"""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
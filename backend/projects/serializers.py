@@ -1,11 +1,35 @@
 from rest_framework import serializers
+from inacap_projects.imagenes import DerivadosField
+from inacap_projects.serializers import CamposDinamicosMixin
 from .models import Proyecto, Colaboracion, Comentario
-from users.serializers import UsuarioSerializer, HabilidadSerializer, DisciplinaSerializer
+from users.serializers import (
+    UsuarioResumenSerializer,
+    UsuarioEmbebidoSerializer,
+    HabilidadSerializer,
+    DisciplinaSerializer
+)
 
 
-class ProyectoListSerializer(serializers.ModelSerializer):
+class ProyectoResumenSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    """Resumen de proyecto para anidar en colaboraciones"""
+    imagen_derivados = DerivadosField()
+    colaboradores_actuales = serializers.IntegerField(read_only=True)
+    tiene_vacantes = serializers.BooleanField(read_only=True)
+    
+    class Meta:
+        model = Proyecto
+        fields = [
+            'id', 'titulo', 'imagen', 'imagen_derivados', 'estado', 'colaboradores_necesarios',
+            'colaboradores_actuales', 'tiene_vacantes'
+        ]
+        read_only_fields = fields
+
+
+class ProyectoListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer simplificado para listar proyectos"""
-    creador = UsuarioSerializer(read_only=True)
+    expandibles = {'creador': UsuarioEmbebidoSerializer}
+    imagen_derivados = DerivadosField()
+    creador = UsuarioResumenSerializer(read_only=True)
     disciplinas_requeridas = DisciplinaSerializer(many=True, read_only=True)
     colaboradores_actuales = serializers.IntegerField(read_only=True)
     tiene_vacantes = serializers.BooleanField(read_only=True)
@@ -13,15 +37,17 @@ class ProyectoListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Proyecto
         fields = [
-            'id', 'titulo', 'descripcion', 'imagen', 'creador',
+            'id', 'titulo', 'descripcion', 'imagen', 'imagen_derivados', 'creador',
             'disciplinas_requeridas', 'estado', 'colaboradores_necesarios',
             'colaboradores_actuales', 'tiene_vacantes', 'created_at'
         ]
 
 
-class ProyectoSerializer(serializers.ModelSerializer):
+class ProyectoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer completo para proyectos"""
-    creador = UsuarioSerializer(read_only=True)
+    expandibles = {'creador': UsuarioEmbebidoSerializer}
+    imagen_derivados = DerivadosField()
+    creador = UsuarioResumenSerializer(read_only=True)
     disciplinas_requeridas = DisciplinaSerializer(many=True, read_only=True)
     habilidades_requeridas = HabilidadSerializer(many=True, read_only=True)
     # Usar querysets válidos para evitar AssertionError en carga de clase
@@ -47,7 +73,7 @@ class ProyectoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Proyecto
         fields = [
-            'id', 'titulo', 'descripcion', 'objetivo', 'imagen',
+            'id', 'titulo', 'descripcion', 'objetivo', 'imagen', 'imagen_derivados',
             'creador', 'disciplinas_requeridas', 'disciplinas_ids',
             'habilidades_requeridas', 'habilidades_ids', 'estado',
             'colaboradores_necesarios', 'colaboradores_actuales',
@@ -57,13 +83,14 @@ class ProyectoSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'creador', 'created_at', 'updated_at']
     
     def get_total_comentarios(self, obj):
-        return obj.comentarios.count()
+        return obj.num_comentarios
 
 
-class ColaboracionSerializer(serializers.ModelSerializer):
+class ColaboracionSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer para colaboraciones"""
-    usuario = UsuarioSerializer(read_only=True)
-    proyecto = ProyectoListSerializer(read_only=True)
+    expandibles = {'usuario': UsuarioEmbebidoSerializer, 'proyecto': ProyectoListSerializer}
+    usuario = UsuarioResumenSerializer(read_only=True)
+    proyecto = ProyectoResumenSerializer(read_only=True)
     
     class Meta:
         model = Colaboracion
@@ -98,9 +125,36 @@ class ColaboracionCreateSerializer(serializers.ModelSerializer):
         return value
 
 
-class ComentarioSerializer(serializers.ModelSerializer):
+class ResolverSolicitudesSerializer(serializers.Serializer):
+    """Serializer para aceptar y rechazar solicitudes en bloque"""
+    aceptar = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    rechazar = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    respuesta = serializers.CharField(required=False, allow_blank=True, default='')
+    respuestas = serializers.DictField(child=serializers.CharField(allow_blank=True), required=False, default=dict)
+    
+    def validate_respuestas(self, value):
+        """Convierte las claves (IDs de colaboración) a enteros"""
+        try:
+            return {int(pk): texto for pk, texto in value.items()}
+        except ValueError:
+            raise serializers.ValidationError("Las claves deben ser IDs de colaboración.")
+    
+    def validate(self, attrs):
+        """Valida que ninguna solicitud se acepte y rechace a la vez"""
+        repetidas = set(attrs['aceptar']) & set(attrs['rechazar'])
+        if repetidas:
+            raise serializers.ValidationError(
+                f"Las solicitudes {sorted(repetidas)} no pueden aceptarse y rechazarse a la vez."
+            )
+        if not attrs['aceptar'] and not attrs['rechazar']:
+            raise serializers.ValidationError("Debes indicar solicitudes para aceptar o rechazar.")
+        return attrs
+
+
+class ComentarioSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer para comentarios"""
-    usuario = UsuarioSerializer(read_only=True)
+    expandibles = {'usuario': UsuarioEmbebidoSerializer}
+    usuario = UsuarioResumenSerializer(read_only=True)
     
     class Meta:
         model = Comentario
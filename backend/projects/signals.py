@@ -0,0 +1,182 @@
+"""
+Mantenimiento de los contadores desnormalizados de Proyecto.
+
+Cada cambio de estado de una Colaboracion y cada alta o baja de un
+Comentario se traduce en un UPDATE con expresiones F() sobre el proyecto,
+dentro de la misma transacción que el guardado o el borrado. También
+mantiene el índice de búsqueda en memoria de inacap_projects.search, el
+índice de emparejamiento, el updated_at que usan los GET condicionales,
+las estadísticas cacheadas del perfil (users.estadisticas) y encola los
+derivados de las imágenes nuevas (inacap_projects.imagenes).
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Proyecto, Colaboracion, Comentario, deltas_colaboracion
+from inacap_projects.cache import incrementar_version
+from inacap_projects.imagenes import encolar
+from inacap_projects.search import indice_memoria
+from users.authentication import invalidar_usuario
+from users.estadisticas import invalidar_estadisticas
+from . import matching
+
+Usuario = get_user_model()
+
+# Marca un estado original que no se cargó (campo diferido)
+DESCONOCIDO = object()
+
+
+def borrado_por_proyecto(instance, origin):
+    """Indica si el borrado viene en cascada desde el propio proyecto"""
+    if isinstance(origin, Proyecto):
+        return origin.pk == instance.proyecto_id
+    return isinstance(origin, QuerySet) and origin.model is Proyecto
+
+
+@receiver(post_init, sender=Colaboracion)
+@receiver(post_init, sender=Comentario)
+def guardar_estado_original(sender, instance, **kwargs):
+    """Recuerda el proyecto y estado con que se cargó la instancia"""
+    # Se lee __dict__ para no disparar consultas sobre campos diferidos
+    instance._contador_original = (
+        instance.__dict__.get('proyecto_id', DESCONOCIDO),
+        instance.__dict__.get('estado', DESCONOCIDO),
+    )
+
+
+@receiver(post_save, sender=Colaboracion)
+def actualizar_contadores_colaboracion(sender, instance, created, **kwargs):
+    proyecto_anterior, estado_anterior = instance._contador_original
+    if created:
+        proyecto_anterior, estado_anterior = instance.proyecto_id, None
+    
+    if DESCONOCIDO in (proyecto_anterior, estado_anterior):
+        Proyecto.objects.filter(pk=instance.proyecto_id).recalcular_contadores()
+    else:
+        if proyecto_anterior != instance.proyecto_id:
+            # La colaboración cambió de proyecto: se descuenta del anterior
+            Proyecto.objects.ajustar_contadores(
+                proyecto_anterior, **deltas_colaboracion(estado_anterior, None)
+            )
+            estado_anterior = None
+        Proyecto.objects.ajustar_contadores(
+            instance.proyecto_id, **deltas_colaboracion(estado_anterior, instance.estado)
+        )
+    instance._contador_original = (instance.proyecto_id, instance.estado)
+
+
+@receiver(post_delete, sender=Colaboracion)
+def descontar_colaboracion(sender, instance, origin=None, **kwargs):
+    if borrado_por_proyecto(instance, origin):
+        return
+    proyecto_id, estado = instance._contador_original
+    if DESCONOCIDO in (proyecto_id, estado):
+        Proyecto.objects.filter(pk=instance.proyecto_id).recalcular_contadores()
+    else:
+        Proyecto.objects.ajustar_contadores(proyecto_id, **deltas_colaboracion(estado, None))
+
+
+@receiver(post_save, sender=Comentario)
+def actualizar_contadores_comentario(sender, instance, created, **kwargs):
+    proyecto_anterior = instance._contador_original[0]
+    if created:
+        Proyecto.objects.ajustar_contadores(instance.proyecto_id, num_comentarios=1)
+    elif proyecto_anterior is DESCONOCIDO:
+        Proyecto.objects.filter(pk=instance.proyecto_id).recalcular_contadores()
+    elif proyecto_anterior != instance.proyecto_id:
+        Proyecto.objects.ajustar_contadores(proyecto_anterior, num_comentarios=-1)
+        Proyecto.objects.ajustar_contadores(instance.proyecto_id, num_comentarios=1)
+    instance._contador_original = (instance.proyecto_id, None)
+
+
+@receiver(post_delete, sender=Comentario)
+def descontar_comentario(sender, instance, origin=None, **kwargs):
+    if borrado_por_proyecto(instance, origin):
+        return
+    Proyecto.objects.ajustar_contadores(instance.proyecto_id, num_comentarios=-1)
+
+
+@receiver(post_save, sender=Proyecto)
+@receiver(post_delete, sender=Proyecto)
+def invalidar_estadisticas_creador(sender, instance, **kwargs):
+    invalidar_estadisticas(instance.creador_id)
+
+
+@receiver(post_save, sender=Colaboracion)
+@receiver(post_delete, sender=Colaboracion)
+@receiver(post_save, sender=Comentario)
+@receiver(post_delete, sender=Comentario)
+def invalidar_estadisticas_autor(sender, instance, **kwargs):
+    invalidar_estadisticas(instance.usuario_id)
+
+
+@receiver(post_save, sender=Proyecto)
+def indexar_proyecto(sender, instance, **kwargs):
+    """Mantiene al día el índice de búsqueda en memoria (si está en uso)"""
+    indice_memoria(sender).actualizar(instance)
+
+
+@receiver(post_save, sender=Proyecto)
+def encolar_derivados_imagen(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'imagen' not in update_fields:
+        return
+    encolar(instance, 'imagen')
+
+
+@receiver(post_delete, sender=Proyecto)
+def desindexar_proyecto(sender, instance, **kwargs):
+    indice_memoria(sender).eliminar(instance.pk)
+    matching.indice_proyectos.eliminar(instance.pk)
+
+
+@receiver(m2m_changed, sender=Proyecto.habilidades_requeridas.through)
+@receiver(m2m_changed, sender=Proyecto.disciplinas_requeridas.through)
+def actualizar_requisitos(sender, instance, action, reverse, pk_set, **kwargs):
+    """Parcha el índice de emparejamiento y marca los proyectos como modificados"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        matching.actualizar_proyecto(instance.pk)
+        Proyecto.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+    elif pk_set:
+        for proyecto_id in pk_set:
+            matching.actualizar_proyecto(proyecto_id)
+        Proyecto.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
+    else:
+        matching.indice_proyectos.invalidar()
+        # Sin IDs a mano: el cambio de versión del catálogo invalida los ETag
+        incrementar_version(instance._meta.model_name)
+
+
+@receiver(m2m_changed, sender=Usuario.habilidades.through)
+def actualizar_habilidades_usuario(sender, instance, action, reverse, pk_set, **kwargs):
+    """Parcha el índice de candidatos y marca al usuario como modificado"""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        matching.actualizar_usuario(instance.pk)
+        Usuario.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+        invalidar_usuario(instance.pk)
+    elif pk_set:
+        for usuario_id in pk_set:
+            matching.actualizar_usuario(usuario_id)
+        Usuario.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
+        invalidar_usuario(*pk_set)
+    else:
+        matching.indice_usuarios.invalidar()
+        incrementar_version(instance._meta.model_name)
+
+
+@receiver(post_save, sender=Usuario)
+def actualizar_perfil_usuario(sender, instance, created, update_fields=None, **kwargs):
+    """Parcha el índice de candidatos si cambió la disciplina o el estado"""
+    if update_fields is not None and not {'disciplina', 'is_active'} & set(update_fields):
+        return
+    matching.actualizar_usuario(instance.pk)
+
+
+@receiver(post_delete, sender=Usuario)
+def quitar_candidato(sender, instance, **kwargs):
+    matching.indice_usuarios.eliminar(instance.pk)
@@ -1,30 +1,60 @@
+from functools import partial
+from django.contrib.auth import get_user_model
+from django.db.models import F
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from .models import Proyecto, Colaboracion, Comentario
+from .filters import ProyectoFilter
+from .lectura_rapida import LecturaRapidaMixin
+from . import matching
+from inacap_projects.cache import GetCondicionalMixin
+from inacap_projects.metricas import datos_medidos
+from inacap_projects.streaming import ListaStreamingMixin
+from inacap_projects.search import TextoCompletoSearchFilter
+from inacap_projects.serializers import optimizar_queryset, serializar
 from .serializers import (
     ProyectoSerializer,
     ProyectoListSerializer,
     ColaboracionSerializer,
     ColaboracionCreateSerializer,
-    ComentarioSerializer
+    ComentarioSerializer,
+    ResolverSolicitudesSerializer
 )
+from users.serializers import UsuarioSerializer
 
+Usuario = get_user_model()
 
-class ProyectoViewSet(viewsets.ModelViewSet):
+
+class ProyectoViewSet(ListaStreamingMixin, LecturaRapidaMixin, GetCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar proyectos"""
     queryset = Proyecto.objects.all()
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['estado', 'disciplinas_requeridas', 'creador']
-    search_fields = ['titulo', 'descripcion', 'objetivo']
-    ordering_fields = ['created_at', 'titulo', 'colaboradores_necesarios']
+    # La búsqueda va después del orden para poder ordenar por relevancia
+    filter_backends = [DjangoFilterBackend, OrderingFilter, TextoCompletoSearchFilter]
+    filterset_class = ProyectoFilter
+    ordering_fields = [
+        'created_at', 'titulo', 'colaboradores_necesarios',
+        'num_colaboradores', 'num_comentarios'
+    ]
     ordering = ['-created_at']
+    campos_modificacion = ('updated_at', 'creador__updated_at')
+    catalogos_anidados = ('habilidad', 'disciplina')
+    # Exportaciones completas con ?format=json-stream
+    acciones_streaming = ('list', 'mis_proyectos', 'colaborando')
+    
+    def get_queryset(self):
+        """Anota las vacantes y precarga solo las relaciones que se van a serializar"""
+        if self.action in [
+            'resolver_solicitudes', 'candidatos', 'colaboradores', 'solicitudes', 'solicitar_colaboracion'
+        ]:
+            return Proyecto.objects.all()
+        return optimizar_queryset(Proyecto.objects.con_estadisticas(), self.get_serializer())
     
     def get_serializer_class(self):
         """Retorna el serializer apropiado según la acción"""
-        if self.action == 'list':
+        if self.action in ['list', 'mis_proyectos', 'colaborando', 'recomendados']:
             return ProyectoListSerializer
         return ProyectoSerializer
     
@@ -34,6 +64,24 @@ class ProyectoViewSet(viewsets.ModelViewSet):
             return [permissions.IsAuthenticatedOrReadOnly()]
         return [permissions.IsAuthenticated()]
     
+    def list(self, request, *args, **kwargs):
+        """Lista proyectos; responde 304 si el listado no cambió"""
+        return self.lista_condicional(request, self.filter_queryset(self.get_queryset()))
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Detalle del proyecto; responde 304 si no cambió desde la última consulta"""
+        try:
+            validadores = Proyecto.objects.filter(pk=kwargs['pk']).validadores()
+        except (ValueError, TypeError):
+            validadores = None
+        if validadores is None:
+            return super().retrieve(request, *args, **kwargs)
+        
+        ultima = max(fecha for fecha in validadores[:4] if fecha)
+        return self.respuesta_condicional(
+            request, validadores, ultima, partial(super().retrieve, request, *args, **kwargs)
+        )
+    
     def perform_create(self, serializer):
         """Asigna el creador al proyecto"""
         serializer.save(creador=self.request.user)
@@ -52,23 +100,86 @@ class ProyectoViewSet(viewsets.ModelViewSet):
         """Obtiene los colaboradores de un proyecto"""
         proyecto = self.get_object()
         colaboraciones = proyecto.colaboraciones.filter(estado='ACEPTADA')
-        serializer = ColaboracionSerializer(colaboraciones, many=True)
-        return Response(serializer.data)
+        return Response(serializar(
+            ColaboracionSerializer, colaboraciones, self.get_serializer_context()
+        ))
     
     @action(detail=True, methods=['get'])
     def solicitudes(self, request, pk=None):
         """Obtiene las solicitudes pendientes de un proyecto (solo creador)"""
         proyecto = self.get_object()
         
-        if proyecto.creador != request.user:
+        if proyecto.creador_id != request.user.id:
             return Response(
                 {'error': 'No tienes permiso para ver las solicitudes.'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
         solicitudes = proyecto.colaboraciones.filter(estado='PENDIENTE')
-        serializer = ColaboracionSerializer(solicitudes, many=True)
-        return Response(serializer.data)
+        return Response(serializar(
+            ColaboracionSerializer, solicitudes, self.get_serializer_context()
+        ))
+    
+    @action(detail=True, methods=['get'])
+    def candidatos(self, request, pk=None):
+        """Sugiere usuarios activos cuyo perfil encaja con el proyecto (solo creador)"""
+        proyecto = self.get_object()
+        
+        if proyecto.creador_id != request.user.id:
+            return Response(
+                {'error': 'No tienes permiso para ver candidatos de este proyecto.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        try:
+            limite = max(1, min(int(request.query_params.get('limite', 20)), 100))
+        except ValueError:
+            limite = 20
+        
+        excluir = set(proyecto.colaboraciones.values_list('usuario_id', flat=True))
+        excluir.add(proyecto.creador_id)
+        ranking = matching.indice_usuarios.puntuar(
+            matching.claves_de_proyecto(proyecto), excluir=excluir
+        )[:limite]
+        
+        usuarios = Usuario.objects.filter(
+            pk__in=[usuario_id for usuario_id, _ in ranking]
+        ).select_related('disciplina').prefetch_related('habilidades').in_bulk()
+        candidatos = [
+            (puntaje, usuarios[usuario_id]) for usuario_id, puntaje in ranking
+            if usuario_id in usuarios
+        ]
+        serializer = UsuarioSerializer(
+            [usuario for _, usuario in candidatos],
+            many=True,
+            context=self.get_serializer_context()
+        )
+        data = datos_medidos(serializer)
+        for item, (puntaje, _) in zip(data, candidatos):
+            item['puntaje'] = round(puntaje, 4)
+        return Response(data)
+    
+    @action(detail=True, methods=['post'])
+    def resolver_solicitudes(self, request, pk=None):
+        """Acepta y rechaza varias solicitudes del proyecto en bloque (solo creador)"""
+        proyecto = self.get_object()
+        
+        if proyecto.creador_id != request.user.id:
+            return Response(
+                {'error': 'No tienes permiso para resolver estas solicitudes.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        serializer = ResolverSolicitudesSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        resultados = proyecto.resolver_solicitudes(**serializer.validated_data)
+        return Response({
+            'resultados': resultados,
+            'colaboradores_actuales': proyecto.colaboradores_actuales,
+            'tiene_vacantes': proyecto.tiene_vacantes,
+        })
     
     @action(detail=True, methods=['post'])
     def solicitar_colaboracion(self, request, pk=None):
@@ -83,7 +194,7 @@ class ProyectoViewSet(viewsets.ModelViewSet):
         if serializer.is_valid():
             serializer.save(usuario=request.user)
             return Response(
-                ColaboracionSerializer(serializer.instance).data,
+                ColaboracionSerializer(serializer.instance, context=self.get_serializer_context()).data,
                 status=status.HTTP_201_CREATED
             )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -91,29 +202,56 @@ class ProyectoViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def mis_proyectos(self, request):
         """Obtiene los proyectos creados por el usuario autenticado"""
-        proyectos = self.queryset.filter(creador=request.user)
-        page = self.paginate_queryset(proyectos)
+        proyectos = self.get_queryset().filter(creador=request.user)
+        return self.lista_condicional(request, proyectos)
+    
+    @action(detail=False, methods=['get'])
+    def recomendados(self, request):
+        """Recomienda proyectos abiertos según las habilidades y disciplina del usuario"""
+        try:
+            limite = max(1, min(int(request.query_params.get('limite', 20)), 100))
+        except ValueError:
+            limite = 20
         
-        if page is not None:
-            serializer = ProyectoListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        excluir = set(Colaboracion.objects.filter(usuario=request.user).values_list('proyecto_id', flat=True))
+        ranking = matching.indice_proyectos.puntuar(
+            matching.claves_de_usuario(request.user), excluir=excluir
+        )
         
-        serializer = ProyectoListSerializer(proyectos, many=True)
-        return Response(serializer.data)
+        # El índice solo conoce requisitos: estado y vacantes se filtran en SQL
+        # sobre ventanas del ranking hasta completar el límite
+        recomendados = []
+        for inicio in range(0, len(ranking), limite * 5):
+            ventana = dict(ranking[inicio:inicio + limite * 5])
+            abiertos = self.get_queryset().filter(
+                pk__in=ventana,
+                estado__in=matching.ESTADOS_ABIERTOS,
+                num_colaboradores__lt=F('colaboradores_necesarios')
+            ).exclude(creador=request.user).order_by()
+            recomendados.extend((ventana[proyecto.pk], proyecto) for proyecto in abiertos)
+            if len(recomendados) >= limite:
+                break
+        
+        recomendados.sort(key=lambda item: (-item[0], -item[1].pk))
+        recomendados = recomendados[:limite]
+        serializer = self.get_serializer([proyecto for _, proyecto in recomendados], many=True)
+        data = datos_medidos(serializer)
+        for item, (puntaje, _) in zip(data, recomendados):
+            item['puntaje'] = round(puntaje, 4)
+        return Response(data)
     
     @action(detail=False, methods=['get'])
     def colaborando(self, request):
         """Obtiene los proyectos en los que el usuario está colaborando"""
-        colaboraciones = Colaboracion.objects.filter(
-            usuario=request.user,
-            estado='ACEPTADA'
+        # unique_together (proyecto, usuario) garantiza una fila por proyecto en el JOIN
+        proyectos = self.get_queryset().filter(
+            colaboraciones__usuario=request.user,
+            colaboraciones__estado='ACEPTADA'
         )
-        proyectos = [col.proyecto for col in colaboraciones]
-        serializer = ProyectoListSerializer(proyectos, many=True)
-        return Response(serializer.data)
+        return self.lista_condicional(request, proyectos)
 
 
-class ColaboracionViewSet(viewsets.ModelViewSet):
+class ColaboracionViewSet(ListaStreamingMixin, LecturaRapidaMixin, GetCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar colaboraciones"""
     queryset = Colaboracion.objects.all()
     serializer_class = ColaboracionSerializer
@@ -122,6 +260,14 @@ class ColaboracionViewSet(viewsets.ModelViewSet):
     filterset_fields = ['estado', 'proyecto', 'usuario']
     ordering_fields = ['created_at']
     ordering = ['-created_at']
+    campos_modificacion = ('updated_at', 'proyecto__updated_at', 'usuario__updated_at')
+    catalogos_anidados = ('habilidad', 'disciplina')
+    # Exportación de las solicitudes propias con ?format=json-stream
+    acciones_streaming = ('mis_solicitudes',)
+    
+    def get_queryset(self):
+        """Precarga solo el proyecto y los usuarios que se van a serializar"""
+        return optimizar_queryset(Colaboracion.objects.all(), self.get_serializer())
     
     def get_serializer_class(self):
         """Retorna el serializer apropiado según la acción"""
@@ -129,6 +275,10 @@ class ColaboracionViewSet(viewsets.ModelViewSet):
             return ColaboracionCreateSerializer
         return ColaboracionSerializer
     
+    def list(self, request, *args, **kwargs):
+        """Lista colaboraciones; responde 304 si el listado no cambió"""
+        return self.lista_condicional(request, self.filter_queryset(self.get_queryset()))
+    
     def perform_create(self, serializer):
         """Asigna el usuario a la colaboración"""
         serializer.save(usuario=self.request.user)
@@ -138,23 +288,26 @@ class ColaboracionViewSet(viewsets.ModelViewSet):
         """Permite al creador del proyecto aceptar una solicitud"""
         colaboracion = self.get_object()
         
-        if colaboracion.proyecto.creador != request.user:
+        if colaboracion.proyecto.creador_id != request.user.id:
             return Response(
                 {'error': 'No tienes permiso para aceptar esta solicitud.'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        if not colaboracion.proyecto.tiene_vacantes:
-            return Response(
-                {'error': 'El proyecto ya no tiene vacantes disponibles.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        colaboracion.estado = 'ACEPTADA'
-        colaboracion.respuesta = request.data.get('respuesta', '')
-        colaboracion.save()
+        estado_previo = colaboracion.estado
+        if not colaboracion.cambiar_estado('ACEPTADA', request.data.get('respuesta', '')):
+            if colaboracion.estado == estado_previo:
+                return Response(
+                    {'error': 'El proyecto ya no tiene vacantes disponibles.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if colaboracion.estado != 'ACEPTADA':
+                return Response(
+                    {'error': 'La solicitud fue modificada por otra petición.'},
+                    status=status.HTTP_409_CONFLICT
+                )
         
-        serializer = ColaboracionSerializer(colaboracion)
+        serializer = self.get_serializer(colaboracion)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
@@ -162,34 +315,30 @@ class ColaboracionViewSet(viewsets.ModelViewSet):
         """Permite al creador del proyecto rechazar una solicitud"""
         colaboracion = self.get_object()
         
-        if colaboracion.proyecto.creador != request.user:
+        if colaboracion.proyecto.creador_id != request.user.id:
             return Response(
                 {'error': 'No tienes permiso para rechazar esta solicitud.'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        colaboracion.estado = 'RECHAZADA'
-        colaboracion.respuesta = request.data.get('respuesta', '')
-        colaboracion.save()
+        if not colaboracion.cambiar_estado('RECHAZADA', request.data.get('respuesta', '')):
+            if colaboracion.estado != 'RECHAZADA':
+                return Response(
+                    {'error': 'La solicitud fue modificada por otra petición.'},
+                    status=status.HTTP_409_CONFLICT
+                )
         
-        serializer = ColaboracionSerializer(colaboracion)
+        serializer = self.get_serializer(colaboracion)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def mis_solicitudes(self, request):
         """Obtiene las solicitudes enviadas por el usuario"""
-        solicitudes = self.queryset.filter(usuario=request.user)
-        page = self.paginate_queryset(solicitudes)
-        
-        if page is not None:
-            serializer = ColaboracionSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = ColaboracionSerializer(solicitudes, many=True)
-        return Response(serializer.data)
+        solicitudes = self.get_queryset().filter(usuario=request.user)
+        return self.lista_condicional(request, solicitudes)
 
 
-class ComentarioViewSet(viewsets.ModelViewSet):
+class ComentarioViewSet(LecturaRapidaMixin, GetCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar comentarios"""
     queryset = Comentario.objects.all()
     serializer_class = ComentarioSerializer
@@ -198,6 +347,16 @@ class ComentarioViewSet(viewsets.ModelViewSet):
     filterset_fields = ['proyecto', 'usuario']
     ordering_fields = ['created_at']
     ordering = ['-created_at']
+    campos_modificacion = ('updated_at', 'usuario__updated_at')
+    catalogos_anidados = ('habilidad', 'disciplina')
+    
+    def get_queryset(self):
+        """Precarga solo el autor si se va a serializar"""
+        return optimizar_queryset(Comentario.objects.all(), self.get_serializer())
+    
+    def list(self, request, *args, **kwargs):
+        """Lista comentarios; responde 304 si el listado no cambió"""
+        return self.lista_condicional(request, self.filter_queryset(self.get_queryset()))
     
     def perform_create(self, serializer):
         """Asigna el usuario al comentario"""
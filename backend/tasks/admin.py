@@ -0,0 +1,20 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Tarea
+
+
+@admin.register(Tarea)
+class TareaAdmin(admin.ModelAdmin):
+    list_display = ('nombre', 'estado', 'intentos', 'max_intentos', 'ejecutar_desde', 'worker', 'created_at')
+    list_filter = ('estado', 'nombre')
+    search_fields = ('nombre', 'error')
+    date_hierarchy = 'created_at'
+    readonly_fields = ('intentos', 'worker', 'reclamada_en', 'terminada_en', 'error', 'created_at', 'updated_at')
+    actions = ['reintentar']
+
+    @admin.action(description='Reintentar las tareas seleccionadas')
+    def reintentar(self, request, queryset):
+        actualizadas = queryset.exclude(estado='EN_CURSO').update(
+            estado='PENDIENTE', intentos=0, error='', ejecutar_desde=timezone.now()
+        )
+        self.message_user(request, f'{actualizadas} tareas vuelven a la cola')
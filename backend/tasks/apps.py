@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TasksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tasks'
+    verbose_name = 'Tareas'
+    
+    def ready(self):
+        # Registra las funciones @tarea de cada app (módulo <app>.tareas)
+        autodiscover_modules('tareas')
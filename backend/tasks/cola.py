@@ -0,0 +1,180 @@
+"""
+Cola de tareas persistida en la base de datos.
+
+Las funciones registradas con @tarea se encolan con
+`funcion.encolar(*args, **kwargs)`: la fila se inserta en la transacción en
+curso, así que el worker solo la ve cuando ésta se confirma y desaparece si
+se revierte. Los argumentos deben ser serializables a JSON (IDs, no
+instancias).
+
+`manage.py run_worker` reclama las tareas vencidas. En MySQL lo hace con
+SELECT ... FOR UPDATE SKIP LOCKED, así que varios workers no se pisan ni se
+bloquean; en SQLite, que no tiene SELECT FOR UPDATE, los reclamos de los
+distintos procesos se serializan con un lock de archivo junto a la base de
+datos. Una tarea que lanza una excepción vuelve a PENDIENTE con espera
+exponencial (TAREAS_BACKOFF segundos, duplicándose hasta TAREAS_BACKOFF_MAX)
+hasta agotar max_intentos y quedar FALLIDA. Las que siguen EN_CURSO tras
+TAREAS_TIMEOUT segundos (worker caído) se recuperan.
+
+Con TAREAS_EN_LINEA=True no se usa la tabla: la función se ejecuta en el
+mismo proceso al confirmarse la transacción (desarrollo sin worker).
+"""
+import logging
+import os
+import socket
+import traceback
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Tarea
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+_registro = {}
+
+
+def tarea(funcion=None, *, nombre=None, max_intentos=None):
+    """
+    Registra una función como tarea y le agrega `.encolar(*args, **kwargs)`.
+
+    El nombre por defecto es '<módulo>.<función>'; el worker debe importar
+    el módulo, por eso las tareas van en <app>/tareas.py (autodescubierto)
+    o en módulos que se importan al cargar los modelos.
+    """
+    def registrar(funcion):
+        clave = nombre or f'{funcion.__module__}.{funcion.__qualname__}'
+        _registro[clave] = funcion
+        funcion.nombre_tarea = clave
+        funcion.encolar = lambda *args, **kwargs: encolar(clave, args, kwargs, max_intentos=max_intentos)
+        return funcion
+    return registrar(funcion) if funcion is not None else registrar
+
+
+def encolar(nombre, args=(), kwargs=None, *, retraso=0, max_intentos=None, using=DEFAULT_DB_ALIAS):
+    """Encola la tarea `nombre`; se ejecuta después de confirmar la transacción actual"""
+    if nombre not in _registro:
+        raise LookupError(f'Tarea no registrada: {nombre}')
+    kwargs = kwargs or {}
+    if getattr(settings, 'TAREAS_EN_LINEA', False):
+        # robust: sin worker no hay reintentos; un error se registra en el log
+        # en vez de romper la petición que encoló la tarea
+        transaction.on_commit(lambda: _registro[nombre](*args, **kwargs), using=using, robust=True)
+        return None
+    return Tarea.objects.using(using).create(
+        nombre=nombre,
+        argumentos={'args': list(args), 'kwargs': kwargs},
+        max_intentos=max_intentos or getattr(settings, 'TAREAS_MAX_INTENTOS', 5),
+        ejecutar_desde=timezone.now() + timedelta(seconds=retraso),
+    )
+
+
+@contextmanager
+def _lock_reclamo(conexion):
+    """Serializa los reclamos entre procesos si la base no tiene SELECT FOR UPDATE"""
+    if conexion.features.has_select_for_update or conexion.is_in_memory_db():
+        yield
+        return
+    with open(f"{conexion.settings_dict['NAME']}.tareas.lock", 'a+b') as archivo:
+        if fcntl is not None:
+            fcntl.flock(archivo, fcntl.LOCK_EX)
+        else:
+            archivo.seek(0)
+            msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(archivo, fcntl.LOCK_UN)
+            else:
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def reclamar(worker, cantidad, using=DEFAULT_DB_ALIAS):
+    """Marca EN_CURSO hasta `cantidad` tareas vencidas para `worker` y las retorna"""
+    if cantidad <= 0:
+        return []
+    conexion = connections[using]
+    tareas = Tarea.objects.using(using)
+    # En SQLite una transacción que lee y después escribe falla con "database is
+    # locked" si otro hilo escribe entremedio; ahí basta el lock de archivo y
+    # el UPDATE condicionado a que la tarea siga PENDIENTE
+    atomica = transaction.atomic(using=using) if conexion.features.has_select_for_update else nullcontext()
+    with _lock_reclamo(conexion), atomica:
+        pendientes = tareas.filter(estado='PENDIENTE', ejecutar_desde__lte=timezone.now()).order_by('ejecutar_desde', 'pk')
+        if conexion.features.has_select_for_update_skip_locked:
+            pendientes = pendientes.select_for_update(skip_locked=True)
+        elif conexion.features.has_select_for_update:
+            pendientes = pendientes.select_for_update()
+        ids = list(pendientes.values_list('pk', flat=True)[:cantidad])
+        if not ids:
+            return []
+        tareas.filter(pk__in=ids, estado='PENDIENTE').update(
+            estado='EN_CURSO', worker=worker, reclamada_en=timezone.now(), intentos=F('intentos') + 1
+        )
+    return list(tareas.filter(pk__in=ids, estado='EN_CURSO', worker=worker).order_by('ejecutar_desde', 'pk'))
+
+
+def espera_reintento(intentos):
+    """Segundos hasta el siguiente intento tras `intentos` fallidos"""
+    base = getattr(settings, 'TAREAS_BACKOFF', 10)
+    return min(base * 2 ** (intentos - 1), getattr(settings, 'TAREAS_BACKOFF_MAX', 3600))
+
+
+def ejecutar(tarea):
+    """Ejecuta una tarea reclamada y registra el resultado; True si terminó bien"""
+    # Si la tarea se recuperó y otro worker la reclamó, este resultado ya no aplica;
+    # el resultado se guarda en la misma base de la que reclamar() la leyó
+    propia = Tarea.objects.using(tarea._state.db or DEFAULT_DB_ALIAS).filter(
+        pk=tarea.pk, estado='EN_CURSO', worker=tarea.worker
+    )
+    funcion = _registro.get(tarea.nombre)
+    try:
+        if funcion is None:
+            raise LookupError(f'Tarea no registrada: {tarea.nombre}')
+        funcion(*tarea.argumentos.get('args', []), **tarea.argumentos.get('kwargs', {}))
+    except Exception:  # noqa: BLE001 - cualquier error de la tarea se registra y reintenta
+        tarea.error = traceback.format_exc(limit=20)[-4000:]
+        if tarea.intentos < tarea.max_intentos:
+            logger.warning('Tarea %s #%s falló (intento %s)', tarea.nombre, tarea.pk, tarea.intentos)
+            propia.update(
+                estado='PENDIENTE', worker='', error=tarea.error,
+                ejecutar_desde=timezone.now() + timedelta(seconds=espera_reintento(tarea.intentos)),
+            )
+        else:
+            logger.error('Tarea %s #%s agotó sus intentos', tarea.nombre, tarea.pk)
+            propia.update(estado='FALLIDA', error=tarea.error, terminada_en=timezone.now())
+        return False
+    propia.update(estado='COMPLETADA', error='', terminada_en=timezone.now())
+    return True
+
+
+def recuperar_colgadas(using=DEFAULT_DB_ALIAS):
+    """Devuelve a la cola las tareas EN_CURSO de workers que no terminaron a tiempo"""
+    limite = timezone.now() - timedelta(seconds=getattr(settings, 'TAREAS_TIMEOUT', 600))
+    colgadas = Tarea.objects.using(using).filter(estado='EN_CURSO', reclamada_en__lt=limite)
+    agotadas = colgadas.filter(intentos__gte=F('max_intentos')).update(
+        estado='FALLIDA', error='El worker no terminó la tarea a tiempo', terminada_en=timezone.now()
+    )
+    return agotadas + colgadas.update(estado='PENDIENTE', worker='', ejecutar_desde=timezone.now())
+
+
+def purgar_completadas(using=DEFAULT_DB_ALIAS):
+    """Borra las tareas completadas hace más de TAREAS_RETENCION_DIAS días"""
+    limite = timezone.now() - timedelta(days=getattr(settings, 'TAREAS_RETENCION_DIAS', 7))
+    return Tarea.objects.using(using).filter(estado='COMPLETADA', terminada_en__lt=limite).delete()[0]
+
+
+def nombre_worker():
+    return f'{socket.gethostname()}:{os.getpid()}'
@@ -0,0 +1,94 @@
+"""
+Worker de la cola de tareas (tasks.cola).
+
+Reclama tareas vencidas en lotes del tamaño de los hilos libres y las
+ejecuta en un pool de --concurrencia hilos. Sin trabajo espera --intervalo
+segundos antes de volver a consultar. Cada minuto recupera las tareas
+colgadas de workers caídos y purga las completadas antiguas. SIGINT o
+SIGTERM dejan de reclamar y esperan a que terminen las que están en curso.
+"""
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from tasks.cola import ejecutar, nombre_worker, purgar_completadas, reclamar, recuperar_colgadas
+
+MANTENCION_CADA = 60
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta las tareas en segundo plano encoladas en la base de datos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrencia',
+            type=int,
+            default=getattr(settings, 'TAREAS_CONCURRENCIA', 2),
+            help='Tareas ejecutadas en paralelo (hilos)',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=1.0,
+            help='Segundos de espera cuando no hay tareas pendientes',
+        )
+        parser.add_argument(
+            '--una-vez',
+            action='store_true',
+            help='Termina cuando no quedan tareas vencidas (cron, pruebas)',
+        )
+
+    def handle(self, *args, **options):
+        concurrencia = max(options['concurrencia'], 1)
+        worker = nombre_worker()
+        self.detener = False
+        for senal in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(senal, self._detener)
+
+        self.stdout.write(f'Worker {worker} con {concurrencia} hilos')
+        ultima_mantencion = 0
+        en_curso = set()
+        with ThreadPoolExecutor(max_workers=concurrencia, thread_name_prefix='tarea') as pool:
+            while not self.detener:
+                if time.monotonic() - ultima_mantencion > MANTENCION_CADA:
+                    recuperadas, purgadas = recuperar_colgadas(), purgar_completadas()
+                    if recuperadas or purgadas:
+                        self.stdout.write(f'  Recuperadas {recuperadas} tareas colgadas, purgadas {purgadas}')
+                    ultima_mantencion = time.monotonic()
+
+                en_curso = {futuro for futuro in en_curso if not futuro.done()}
+                tareas = reclamar(worker, concurrencia - len(en_curso))
+                for tarea in tareas:
+                    en_curso.add(pool.submit(self._ejecutar, tarea))
+                if tareas:
+                    continue
+                if options['una_vez'] and not en_curso:
+                    break
+                if en_curso:
+                    wait(en_curso, timeout=options['intervalo'], return_when=FIRST_COMPLETED)
+                else:
+                    time.sleep(options['intervalo'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Worker {worker} detenido'))
+
+    def _detener(self, *args):
+        self.stdout.write('Deteniendo: se esperan las tareas en curso...')
+        self.detener = True
+
+    def _ejecutar(self, tarea):
+        close_old_connections()
+        inicio = time.perf_counter()
+        try:
+            ok = ejecutar(tarea)
+        finally:
+            close_old_connections()
+        duracion = (time.perf_counter() - inicio) * 1000
+        if ok:
+            self.stdout.write(f'  ✓ {tarea.nombre} #{tarea.pk} ({duracion:.0f} ms)')
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'  ✗ {tarea.nombre} #{tarea.pk} intento {tarea.intentos}/{tarea.max_intentos}: '
+                f'{tarea.error.strip().splitlines()[-1]}'
+            ))
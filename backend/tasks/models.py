@@ -0,0 +1,49 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tarea(models.Model):
+    """Trabajo diferido que ejecuta `manage.py run_worker` (ver tasks.cola)"""
+
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('EN_CURSO', 'En Curso'),
+        ('COMPLETADA', 'Completada'),
+        ('FALLIDA', 'Fallida'),
+    ]
+
+    nombre = models.CharField(max_length=200, verbose_name='Nombre')
+    argumentos = models.JSONField(default=dict, blank=True, verbose_name='Argumentos')
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default='PENDIENTE',
+        verbose_name='Estado'
+    )
+
+    # Reintentos
+    intentos = models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')
+    max_intentos = models.PositiveSmallIntegerField(default=5, verbose_name='Máximo de Intentos')
+    ejecutar_desde = models.DateTimeField(default=timezone.now, verbose_name='Ejecutar Desde')
+    error = models.TextField(blank=True, verbose_name='Último Error')
+
+    # Worker que la tiene reclamada
+    worker = models.CharField(max_length=100, blank=True, verbose_name='Worker')
+    reclamada_en = models.DateTimeField(null=True, blank=True, verbose_name='Reclamada En')
+    terminada_en = models.DateTimeField(null=True, blank=True, verbose_name='Terminada En')
+
+    # Fechas
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Última Actualización')
+
+    class Meta:
+        verbose_name = 'Tarea'
+        verbose_name_plural = 'Tareas'
+        ordering = ['-created_at']
+        indexes = [
+            # Reclamo de pendientes vencidas y recuperación de EN_CURSO colgadas
+            models.Index(fields=['estado', 'ejecutar_desde'], name='tarea_estado_ejecutar_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.nombre} #{self.pk} ({self.get_estado_display()})"
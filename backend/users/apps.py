@@ -1,7 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
     verbose_name = 'Usuarios'
+    
+    def ready(self):
+        from inacap_projects.search import reparar_indices_texto
+        from . import signals  # noqa: F401
+        post_migrate.connect(reparar_indices_texto, sender=self)
@@ -0,0 +1,64 @@
+"""
+Autenticación JWT con caché del usuario.
+
+JWTAuthentication de simplejwt consulta Usuario en cada petición solo para
+armar request.user. CachedJWTAuthentication guarda en la caché de Django el
+estado mínimo (id, is_active, is_staff, updated_at) por claim user_id
+durante JWT_CACHE_USUARIO_TTL segundos y arma request.user con esos campos;
+el resto queda diferido y se carga completo en una consulta la primera vez
+que la vista lo lee. Si falta la entrada se consulta la base de datos como
+siempre. Las señales de users la descartan al guardar o borrar el usuario,
+lo que cubre la desactivación y change_password.
+
+Con JWT_CACHE_USUARIO_TTL=0 o CHECK_REVOKE_TOKEN activo se comporta igual
+que JWTAuthentication.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+CAMPOS_CACHEADOS = ('id', 'is_active', 'is_staff', 'updated_at')
+
+
+def clave_usuario(usuario_id):
+    return f'auth:usuario:{usuario_id}'
+
+
+def invalidar_usuario(*usuario_ids):
+    """Descarta el estado cacheado de los usuarios al confirmar la transacción"""
+    claves = [clave_usuario(usuario_id) for usuario_id in set(usuario_ids)]
+    if claves:
+        transaction.on_commit(lambda: cache.delete_many(claves))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication que arma request.user desde la caché"""
+
+    def get_user(self, validated_token):
+        ttl = getattr(settings, 'JWT_CACHE_USUARIO_TTL', 60)
+        if not ttl or api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != 'id':
+            return super().get_user(validated_token)
+
+        try:
+            usuario_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        clave = clave_usuario(usuario_id)
+        estado = cache.get(clave)
+        if estado is None:
+            usuario = super().get_user(validated_token)
+            cache.set(clave, tuple(getattr(usuario, campo) for campo in CAMPOS_CACHEADOS), ttl)
+            return usuario
+
+        if not estado[CAMPOS_CACHEADOS.index('is_active')]:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        Usuario = get_user_model()
+        usuario = Usuario.from_db(router.db_for_read(Usuario), CAMPOS_CACHEADOS, estado)
+        usuario.cargar_diferidos_juntos = True
+        return usuario
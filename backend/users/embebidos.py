@@ -0,0 +1,72 @@
+"""
+Caché de la representación de Usuario embebida en otros serializers.
+
+Proyectos, colaboraciones y comentarios anidan UsuarioResumenSerializer
+y, con ?expand=, UsuarioEmbebidoSerializer con habilidades y disciplina.
+Ambos guardan su representación en un LRU por proceso con clave
+(serializer, id, updated_at, URL base, versiones de catálogo, campos), de
+modo que cualquier cambio del usuario o de los catálogos produce otra clave
+y la entrada vieja termina descartada. Dentro de una misma serialización
+cada usuario se resuelve una sola vez.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class CacheLRU:
+    """Diccionario con tope de entradas que descarta la usada hace más tiempo"""
+
+    def __init__(self, capacidad):
+        self.capacidad = capacidad
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.reiniciar_estadisticas()
+
+    def obtener(self, clave):
+        """Retorna el valor guardado o None, y lo marca como recién usado"""
+        with self._lock:
+            try:
+                valor = self._datos[clave]
+            except KeyError:
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.capacidad:
+                self._datos.popitem(last=False)
+                self.descartes += 1
+
+    def registrar_deduplicado(self):
+        with self._lock:
+            self.deduplicados += 1
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def reiniciar_estadisticas(self):
+        self.aciertos = self.fallos = self.descartes = self.deduplicados = 0
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'capacidad': self.capacidad,
+                'entradas': len(self._datos),
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'descartes': self.descartes,
+                'deduplicados': self.deduplicados,
+                'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else None,
+            }
+
+
+usuarios_embebidos = CacheLRU(getattr(settings, 'CACHE_USUARIOS_EMBEBIDOS', 2048))
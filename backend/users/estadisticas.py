@@ -0,0 +1,67 @@
+"""
+Estadísticas del perfil: proyectos y colaboraciones por estado y comentarios.
+
+Se calculan con una sola consulta (UNION ALL de tres GROUP BY) y se guardan
+en la caché de Django por usuario. Las señales de projects y los cambios de
+estado que no pasan por save() llaman a invalidar_estadisticas() cuando la
+transacción se confirma; el TTL solo cubre escrituras hechas fuera del ORM.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import CharField, Count, F, Value
+
+
+def clave_estadisticas(usuario_id):
+    return f'estadisticas:usuario:{usuario_id}'
+
+
+def calcular_estadisticas(usuario_id):
+    """Conteos del usuario en una sola consulta"""
+    Proyecto = apps.get_model('projects', 'Proyecto')
+    Colaboracion = apps.get_model('projects', 'Colaboracion')
+    Comentario = apps.get_model('projects', 'Comentario')
+
+    def por_estado(queryset, tipo, estado=F('estado')):
+        return queryset.order_by().annotate(
+            tipo=Value(tipo, output_field=CharField()), grupo=estado
+        ).values_list('tipo', 'grupo').annotate(total=Count('pk'))
+
+    consulta = por_estado(Proyecto.objects.filter(creador_id=usuario_id), 'proyectos').union(
+        por_estado(Colaboracion.objects.filter(usuario_id=usuario_id), 'colaboraciones'),
+        por_estado(Comentario.objects.filter(usuario_id=usuario_id), 'comentarios',
+                   Value('', output_field=CharField())),
+        all=True
+    )
+
+    estadisticas = {
+        'proyectos': dict.fromkeys([estado for estado, _ in Proyecto.ESTADO_CHOICES], 0),
+        'colaboraciones': dict.fromkeys([estado for estado, _ in Colaboracion.ESTADO_CHOICES], 0),
+        'comentarios': 0,
+    }
+    for tipo, grupo, total in consulta:
+        if tipo == 'comentarios':
+            estadisticas['comentarios'] = total
+        else:
+            estadisticas[tipo][grupo] = total
+    for tipo in ('proyectos', 'colaboraciones'):
+        estadisticas[tipo]['total'] = sum(estadisticas[tipo].values())
+    return estadisticas
+
+
+def obtener_estadisticas(usuario_id):
+    """Estadísticas desde la caché, calculándolas si no están"""
+    clave = clave_estadisticas(usuario_id)
+    estadisticas = cache.get(clave)
+    if estadisticas is None:
+        estadisticas = calcular_estadisticas(usuario_id)
+        cache.set(clave, estadisticas, getattr(settings, 'ESTADISTICAS_PERFIL_TTL', 600))
+    return estadisticas
+
+
+def invalidar_estadisticas(*usuario_ids):
+    """Descarta las estadísticas de los usuarios al confirmar la transacción actual"""
+    claves = [clave_estadisticas(usuario_id) for usuario_id in set(usuario_ids) if usuario_id]
+    if claves:
+        transaction.on_commit(lambda: cache.delete_many(claves))
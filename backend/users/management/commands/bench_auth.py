@@ -0,0 +1,87 @@
+"""
+Benchmark de la autenticación JWT con y sin la caché de usuario.
+
+Dentro de una transacción que se revierte crea un usuario con proyectos,
+emite un access token y repite peticiones autenticadas con el header
+Authorization contra endpoints baratos (un 304 de revalidación y una
+página del listado). Compara JWT_CACHE_USUARIO_TTL=0 (JWTAuthentication
+de simplejwt) con la caché activa: latencia p50/p95 y consultas por
+petición.
+"""
+import logging
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from inacap_projects.metricas import percentil
+from projects.models import Proyecto
+from users.authentication import clave_usuario
+
+Usuario = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia de peticiones autenticadas con JWT con y sin caché de usuario'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=500, help='Peticiones por endpoint y variante')
+
+    def handle(self, *args, **options):
+        # Una línea de log por petición ensuciaría la salida; quedan las lentas y las N+1
+        logging.getLogger('inacap_projects.metricas').setLevel(logging.WARNING)
+        peticiones = options['peticiones']
+        ttl = getattr(settings, 'JWT_CACHE_USUARIO_TTL', 60) or 60
+
+        with transaction.atomic():
+            usuario = Usuario.objects.create(
+                email='bench-auth@bench.local', nombre='Bench', apellido='Auth', carrera='Ingeniería'
+            )
+            for i in range(10):
+                Proyecto.objects.create(
+                    titulo=f'Proyecto bench auth {i}', descripcion='-', objetivo='-',
+                    creador=usuario, estado='ACTIVO'
+                )
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(usuario)}')
+            etag = client.get('/api/projects/proyectos/mis_proyectos/')['ETag']
+
+            endpoints = [
+                ('304 mis_proyectos', '/api/projects/proyectos/mis_proyectos/', {'HTTP_IF_NONE_MATCH': etag}),
+                ('200 mis_proyectos', '/api/projects/proyectos/mis_proyectos/', {}),
+            ]
+            self.stdout.write(f'  {"endpoint":<20} {"variante":<10} {"p50":>9} {"p95":>9} {"consultas":>10}')
+            for nombre, url, headers in endpoints:
+                p50 = {}
+                for variante, valor in (('sin caché', 0), ('con caché', ttl)):
+                    cache.delete(clave_usuario(usuario.pk))
+                    with override_settings(JWT_CACHE_USUARIO_TTL=valor):
+                        client.get(url, **headers)
+                        latencias, consultas = self._medir(client, url, headers, peticiones)
+                    p50[variante] = statistics.median(latencias)
+                    p95 = percentil(latencias, 0.95)
+                    self.stdout.write(
+                        f'  {nombre:<20} {variante:<10} {p50[variante] * 1000:7.2f} ms '
+                        f'{p95 * 1000:7.2f} ms {consultas / peticiones:10.1f}'
+                    )
+                ahorro = 1 - p50['con caché'] / p50['sin caché']
+                self.stdout.write(self.style.SUCCESS(f'  ✓ {nombre}: p50 {ahorro:.0%} menor con caché'))
+            cache.delete(clave_usuario(usuario.pk))
+            transaction.set_rollback(True)
+
+    def _medir(self, client, url, headers, peticiones):
+        latencias = []
+        with CaptureQueriesContext(connection) as contexto:
+            for _ in range(peticiones):
+                inicio = time.perf_counter()
+                client.get(url, **headers)
+                latencias.append(time.perf_counter() - inicio)
+        latencias.sort()
+        return latencias, len(contexto.captured_queries)
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:28
+
+from django.db import migrations, models
+from inacap_projects.search import crear_indice_texto, documento_busqueda, eliminar_indice_texto
+
+TABLA = 'users_usuario'
+CAMPOS_BUSQUEDA = ('nombre', 'apellido', 'carrera', 'bio', 'email')
+
+
+def poblar_texto_busqueda(apps, schema_editor):
+    Usuario = apps.get_model('users', 'Usuario')
+    lote = []
+    for usuario in Usuario.objects.only('pk', *CAMPOS_BUSQUEDA).iterator(chunk_size=1000):
+        usuario.texto_busqueda = documento_busqueda(*(getattr(usuario, campo) for campo in CAMPOS_BUSQUEDA))
+        lote.append(usuario)
+        if len(lote) == 1000:
+            Usuario.objects.bulk_update(lote, ['texto_busqueda'])
+            lote = []
+    Usuario.objects.bulk_update(lote, ['texto_busqueda'])
+
+
+def crear_indice(apps, schema_editor):
+    crear_indice_texto(schema_editor, TABLA)
+
+
+def eliminar_indice(apps, schema_editor):
+    eliminar_indice_texto(schema_editor, TABLA)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usuario',
+            name='texto_busqueda',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(poblar_texto_busqueda, migrations.RunPython.noop),
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.utils import timezone
+from inacap_projects.imagenes import sincronizar_derivados
+from inacap_projects.search import documento_busqueda
 
 
 class Disciplina(models.Model):
@@ -70,6 +72,8 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
     apellido = models.CharField(max_length=100, verbose_name='Apellido')
     telefono = models.CharField(max_length=15, blank=True, verbose_name='Teléfono')
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True, verbose_name='Avatar')
+    # Miniaturas WebP/JPEG generadas en segundo plano (ver inacap_projects.imagenes)
+    avatar_derivados = models.JSONField(default=dict, blank=True, editable=False)
     bio = models.TextField(blank=True, verbose_name='Biografía')
     
     # Información académica
@@ -98,10 +102,14 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
     date_joined = models.DateTimeField(default=timezone.now, verbose_name='Fecha de Registro')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Última Actualización')
     
+    # Términos normalizados para el índice de búsqueda (ver inacap_projects.search)
+    texto_busqueda = models.TextField(blank=True, default='', editable=False)
+    
     objects = UsuarioManager()
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['nombre', 'apellido']
+    CAMPOS_BUSQUEDA = ('nombre', 'apellido', 'carrera', 'bio', 'email')
     
     class Meta:
         verbose_name = 'Usuario'
@@ -111,6 +119,24 @@ class Usuario(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.nombre} {self.apellido} ({self.email})"
     
+    def save(self, *args, **kwargs):
+        """Recalcula el texto de búsqueda y descarta derivados obsoletos antes de guardar"""
+        self.texto_busqueda = documento_busqueda(*(getattr(self, campo) for campo in self.CAMPOS_BUSQUEDA))
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(self.CAMPOS_BUSQUEDA):
+            update_fields = {*update_fields, 'texto_busqueda'}
+        update_fields = sincronizar_derivados(self, 'avatar', update_fields)
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+    
+    def refresh_from_db(self, using=None, fields=None):
+        """Con cargar_diferidos_juntos, leer un campo diferido carga todos los demás"""
+        diferidos = self.get_deferred_fields()
+        if getattr(self, 'cargar_diferidos_juntos', False) and fields is not None and set(fields) <= diferidos:
+            fields = diferidos
+        super().refresh_from_db(using=using, fields=fields)
+    
     def get_full_name(self):
         """Retorna el nombre completo del usuario"""
         return f"{self.nombre} {self.apellido}"
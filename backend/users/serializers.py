@@ -1,11 +1,16 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from inacap_projects.cache import obtener_version
+from inacap_projects.imagenes import DerivadosField
+from inacap_projects.serializers import CamposDinamicosMixin
+from .embebidos import usuarios_embebidos
+from .estadisticas import obtener_estadisticas
 from .models import Habilidad, Disciplina
 
 Usuario = get_user_model()
 
 
-class HabilidadSerializer(serializers.ModelSerializer):
+class HabilidadSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer para el modelo Habilidad"""
     
     class Meta:
@@ -13,7 +18,7 @@ class HabilidadSerializer(serializers.ModelSerializer):
         fields = ['id', 'nombre', 'descripcion']
 
 
-class DisciplinaSerializer(serializers.ModelSerializer):
+class DisciplinaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer para el modelo Disciplina"""
     
     class Meta:
@@ -21,8 +26,9 @@ class DisciplinaSerializer(serializers.ModelSerializer):
         fields = ['id', 'nombre', 'descripcion']
 
 
-class UsuarioSerializer(serializers.ModelSerializer):
+class UsuarioSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer para el modelo Usuario"""
+    avatar_derivados = DerivadosField()
     habilidades = HabilidadSerializer(many=True, read_only=True)
     disciplina = DisciplinaSerializer(read_only=True)
     habilidades_ids = serializers.PrimaryKeyRelatedField(
@@ -42,13 +48,59 @@ class UsuarioSerializer(serializers.ModelSerializer):
     class Meta:
         model = Usuario
         fields = [
-            'id', 'email', 'nombre', 'apellido', 'telefono', 'avatar', 'bio',
+            'id', 'email', 'nombre', 'apellido', 'telefono', 'avatar', 'avatar_derivados', 'bio',
             'carrera', 'disciplina', 'disciplina_id', 'semestre', 
             'habilidades', 'habilidades_ids', 'date_joined', 'is_active'
         ]
         read_only_fields = ['id', 'date_joined']
 
 
+class UsuarioCacheadoMixin:
+    """to_representation con el LRU de users.embebidos, deduplicado por serialización"""
+    
+    def to_representation(self, instance):
+        # El contexto es el del serializer raíz: dura una serialización completa
+        contexto = self.context
+        if '_usuarios_embebidos' not in contexto:
+            request = contexto.get('request')
+            contexto['_usuarios_embebidos'] = {}
+            contexto['_clave_embebidos'] = (
+                request.build_absolute_uri('/') if request else '',
+                obtener_version('habilidad'),
+                obtener_version('disciplina'),
+            )
+        vistos = contexto['_usuarios_embebidos']
+        # La forma depende del serializer y de ?fields=, así que son parte de la clave
+        clave = (
+            type(self).__name__, instance.pk, instance.updated_at,
+            *contexto['_clave_embebidos'], tuple(self.fields),
+        )
+        
+        if clave in vistos:
+            usuarios_embebidos.registrar_deduplicado()
+            return vistos[clave]
+        datos = usuarios_embebidos.obtener(clave)
+        if datos is None:
+            datos = super().to_representation(instance)
+            usuarios_embebidos.guardar(clave, datos)
+        vistos[clave] = datos
+        return datos
+
+
+class UsuarioResumenSerializer(UsuarioCacheadoMixin, CamposDinamicosMixin, serializers.ModelSerializer):
+    """Resumen de usuario para anidar en proyectos, colaboraciones y comentarios"""
+    avatar_derivados = DerivadosField()
+    
+    class Meta:
+        model = Usuario
+        fields = ['id', 'nombre', 'apellido', 'avatar', 'avatar_derivados', 'carrera']
+        read_only_fields = fields
+
+
+class UsuarioEmbebidoSerializer(UsuarioCacheadoMixin, UsuarioSerializer):
+    """Usuario completo para anidar con ?expand=, cacheado como el resumen"""
+
+
 class UsuarioCreateSerializer(serializers.ModelSerializer):
     """Serializer para crear un nuevo usuario"""
     password = serializers.CharField(write_only=True, min_length=8)
@@ -75,29 +127,38 @@ class UsuarioCreateSerializer(serializers.ModelSerializer):
         return user
 
 
-class UsuarioProfileSerializer(serializers.ModelSerializer):
+class UsuarioProfileSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer completo para el perfil del usuario"""
+    avatar_derivados = DerivadosField()
     habilidades = HabilidadSerializer(many=True, read_only=True)
     disciplina = DisciplinaSerializer(read_only=True)
     total_proyectos = serializers.SerializerMethodField()
     proyectos_activos = serializers.SerializerMethodField()
+    estadisticas = serializers.SerializerMethodField()
     
     class Meta:
         model = Usuario
         fields = [
-            'id', 'email', 'nombre', 'apellido', 'telefono', 'avatar', 'bio',
+            'id', 'email', 'nombre', 'apellido', 'telefono', 'avatar', 'avatar_derivados', 'bio',
             'carrera', 'disciplina', 'semestre', 'habilidades', 
-            'total_proyectos', 'proyectos_activos', 'date_joined'
+            'total_proyectos', 'proyectos_activos', 'estadisticas', 'date_joined'
         ]
         read_only_fields = ['id', 'email', 'date_joined']
     
+    def get_estadisticas(self, obj):
+        """Proyectos y colaboraciones por estado y comentarios escritos (cacheados)"""
+        # Los tres campos se leen de una sola búsqueda por serialización
+        if getattr(self, '_estadisticas', (None,))[0] != obj.pk:
+            self._estadisticas = (obj.pk, obtener_estadisticas(obj.pk))
+        return self._estadisticas[1]
+    
     def get_total_proyectos(self, obj):
         """Retorna el total de proyectos del usuario"""
-        return obj.proyectos_creados.count()
+        return self.get_estadisticas(obj)['proyectos']['total']
     
     def get_proyectos_activos(self, obj):
         """Retorna el total de proyectos activos del usuario"""
-        return obj.proyectos_creados.filter(estado='ACTIVO').count()
+        return self.get_estadisticas(obj)['proyectos']['ACTIVO']
 
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -0,0 +1,49 @@
+"""
+Señales de la app de usuarios.
+
+Mantiene el índice de búsqueda en memoria de inacap_projects.search, la
+versión de los catálogos cacheados por inacap_projects.cache, el estado
+de usuario cacheado por users.authentication y los derivados del avatar.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from inacap_projects.cache import incrementar_version
+from inacap_projects.imagenes import encolar
+from inacap_projects.search import indice_memoria
+from .authentication import invalidar_usuario
+from .models import Habilidad, Disciplina
+
+Usuario = get_user_model()
+
+
+@receiver(post_save, sender=Usuario)
+def indexar_usuario(sender, instance, **kwargs):
+    indice_memoria(sender).actualizar(instance)
+
+
+@receiver(post_delete, sender=Usuario)
+def desindexar_usuario(sender, instance, **kwargs):
+    indice_memoria(sender).eliminar(instance.pk)
+
+
+@receiver(post_save, sender=Usuario)
+def encolar_derivados_avatar(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'avatar' not in update_fields:
+        return
+    encolar(instance, 'avatar')
+
+
+@receiver(post_save, sender=Usuario)
+@receiver(post_delete, sender=Usuario)
+def invalidar_autenticacion(sender, instance, **kwargs):
+    """Desactivación, cambio de contraseña o de permisos: se vuelve a leer la BD"""
+    invalidar_usuario(instance.pk)
+
+
+@receiver(post_save, sender=Habilidad)
+@receiver(post_delete, sender=Habilidad)
+@receiver(post_save, sender=Disciplina)
+@receiver(post_delete, sender=Disciplina)
+def invalidar_catalogo(sender, **kwargs):
+    incrementar_version(sender._meta.model_name)
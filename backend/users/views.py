@@ -1,9 +1,19 @@
 from rest_framework import viewsets, status, permissions
+from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
+from inacap_projects.cache import CatalogoCacheMixin, GetCondicionalMixin
+from inacap_projects.search import TextoCompletoSearchFilter
+from inacap_projects.serializers import optimizar_queryset
+from inacap_projects.streaming import ListaStreamingMixin
+from projects.filters import ProyectoFilter
+from projects.lectura_rapida import LecturaRapidaMixin
+from projects.models import Proyecto
+from projects.serializers import ProyectoListSerializer
+from .embebidos import usuarios_embebidos
 from .models import Habilidad, Disciplina
 from .serializers import (
     UsuarioSerializer, 
@@ -17,15 +27,24 @@ from .serializers import (
 Usuario = get_user_model()
 
 
-class UsuarioViewSet(viewsets.ModelViewSet):
+class UsuarioViewSet(ListaStreamingMixin, LecturaRapidaMixin, GetCondicionalMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar usuarios"""
     queryset = Usuario.objects.all()
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    catalogos_anidados = ('habilidad', 'disciplina')
+    # Exportación de los proyectos del usuario con ?format=json-stream
+    acciones_streaming = ('proyectos',)
+    # La búsqueda va después del orden para poder ordenar por relevancia
+    filter_backends = [DjangoFilterBackend, OrderingFilter, TextoCompletoSearchFilter]
     filterset_fields = ['disciplina', 'semestre', 'is_active']
-    search_fields = ['nombre', 'apellido', 'email', 'carrera', 'bio']
     ordering_fields = ['date_joined', 'nombre', 'apellido']
     ordering = ['-date_joined']
     
+    def get_queryset(self):
+        """Precarga solo las relaciones que se van a serializar"""
+        if self.action == 'proyectos':
+            return Usuario.objects.all()
+        return optimizar_queryset(Usuario.objects.all(), self.get_serializer())
+    
     def get_serializer_class(self):
         """Retorna el serializer apropiado según la acción"""
         if self.action == 'create':
@@ -38,6 +57,8 @@ class UsuarioViewSet(viewsets.ModelViewSet):
         """Define permisos según la acción"""
         if self.action in ['create']:
             return [permissions.AllowAny()]
+        if self.action == 'cache_embebidos':
+            return [permissions.IsAdminUser()]
         return [permissions.IsAuthenticated()]
     
     @action(detail=False, methods=['get', 'put', 'patch'])
@@ -46,14 +67,14 @@ class UsuarioViewSet(viewsets.ModelViewSet):
         user = request.user
         
         if request.method == 'GET':
-            serializer = UsuarioProfileSerializer(user)
+            serializer = UsuarioProfileSerializer(user, context=self.get_serializer_context())
             return Response(serializer.data)
         
         elif request.method in ['PUT', 'PATCH']:
             serializer = UsuarioSerializer(user, data=request.data, partial=True)
             if serializer.is_valid():
                 serializer.save()
-                return Response(UsuarioProfileSerializer(user).data)
+                return Response(UsuarioProfileSerializer(user, context=self.get_serializer_context()).data)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['post'])
@@ -64,15 +85,15 @@ class UsuarioViewSet(viewsets.ModelViewSet):
         
         if serializer.is_valid():
             # Verifica la contraseña antigua
-            if not user.check_password(serializer.data.get('old_password')):
+            if not user.check_password(serializer.validated_data.get('old_password')):
                 return Response(
                     {'old_password': ['Contraseña incorrecta.']}, 
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
             # Establece la nueva contraseña
-            user.set_password(serializer.data.get('new_password'))
-            user.save()
+            user.set_password(serializer.validated_data.get('new_password'))
+            user.save()  # La señal post_save descarta el usuario de la caché de JWT
             
             return Response(
                 {'message': 'Contraseña actualizada exitosamente.'}, 
@@ -81,19 +102,31 @@ class UsuarioViewSet(viewsets.ModelViewSet):
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    @action(detail=False, methods=['get'])
+    def cache_embebidos(self, request):
+        """Estadísticas de la caché de usuarios embebidos de este proceso (solo staff)"""
+        return Response(usuarios_embebidos.estadisticas())
+    
     @action(detail=True, methods=['get'])
     def proyectos(self, request, pk=None):
-        """Obtiene los proyectos de un usuario específico"""
+        """Obtiene los proyectos de un usuario, paginados y filtrables por ?estado="""
         user = self.get_object()
-        proyectos = user.proyectos_creados.all()
-        
-        from projects.serializers import ProyectoSerializer
-        serializer = ProyectoSerializer(proyectos, many=True)
-        return Response(serializer.data)
+        filtro = ProyectoFilter(
+            request.query_params, queryset=Proyecto.objects.con_estadisticas().filter(creador=user)
+        )
+        if not filtro.is_valid():
+            raise ValidationError(filtro.errors)
+        proyectos = optimizar_queryset(
+            filtro.qs, ProyectoListSerializer(context=self.get_serializer_context())
+        )
+        return self.lista_condicional(
+            request, proyectos, ProyectoListSerializer, ('updated_at', 'creador__updated_at')
+        )
 
 
-class HabilidadViewSet(viewsets.ModelViewSet):
+class HabilidadViewSet(CatalogoCacheMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar habilidades"""
+    catalogo = 'habilidad'
     queryset = Habilidad.objects.all()
     serializer_class = HabilidadSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -103,8 +136,9 @@ class HabilidadViewSet(viewsets.ModelViewSet):
     ordering = ['nombre']
 
 
-class DisciplinaViewSet(viewsets.ModelViewSet):
+class DisciplinaViewSet(CatalogoCacheMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar disciplinas"""
+    catalogo = 'disciplina'
     queryset = Disciplina.objects.all()
     serializer_class = DisciplinaSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -1,4 +1,9 @@
 // Modelos de datos
+
+// Versiones reducidas WebP/JPEG de una imagen subida, por tamaño
+// (null mientras el backend no las genera)
+export type Derivados = Record<string, { webp: string; jpg: string }> | null;
+
 export interface Usuario {
   id: number;
   email: string;
@@ -6,6 +11,7 @@ export interface Usuario {
   apellido: string;
   telefono?: string;
   avatar?: string;
+  avatar_derivados?: Derivados;
   bio?: string;
   carrera: string;
   disciplina?: Disciplina;
@@ -15,6 +21,17 @@ export interface Usuario {
   is_active: boolean;
 }
 
+// Resumen de usuario anidado en proyectos, colaboraciones y comentarios
+// (la versión completa se pide con ?expand=creador / ?expand=usuario)
+export interface UsuarioResumen {
+  id: number;
+  nombre: string;
+  apellido: string;
+  avatar?: string;
+  avatar_derivados?: Derivados;
+  carrera: string;
+}
+
 export interface Disciplina {
   id: number;
   nombre: string;
@@ -33,7 +50,8 @@ export interface Proyecto {
   descripcion: string;
   objetivo: string;
   imagen?: string;
-  creador: Usuario;
+  imagen_derivados?: Derivados;
+  creador: UsuarioResumen;
   disciplinas_requeridas: Disciplina[];
   habilidades_requeridas: Habilidad[];
   estado: 'BORRADOR' | 'ACTIVO' | 'EN_PROGRESO' | 'COMPLETADO' | 'CANCELADO';
@@ -49,8 +67,8 @@ export interface Proyecto {
 
 export interface Colaboracion {
   id: number;
-  proyecto: Proyecto;
-  usuario: Usuario;
+  proyecto: Pick<Proyecto, 'id' | 'titulo' | 'imagen' | 'imagen_derivados' | 'estado' | 'colaboradores_necesarios' | 'colaboradores_actuales' | 'tiene_vacantes'>;
+  usuario: UsuarioResumen;
   estado: 'PENDIENTE' | 'ACEPTADA' | 'RECHAZADA' | 'CANCELADA';
   rol: 'COLABORADOR' | 'LÍDER';
   mensaje: string;
@@ -62,7 +80,7 @@ export interface Colaboracion {
 export interface Comentario {
   id: number;
   proyecto: number;
-  usuario: Usuario;
+  usuario: UsuarioResumen;
   contenido: string;
   created_at: string;
   updated_at: string;
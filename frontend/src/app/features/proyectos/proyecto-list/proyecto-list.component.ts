@@ -85,8 +85,13 @@ import { Proyecto } from '../../../core/models/models';
                 <div class="proyecto-card">
                   <!-- Imagen -->
                   <div class="proyecto-image">
-                    @if (proyecto.imagen) {
-                      <img [src]="proyecto.imagen" [alt]="proyecto.titulo" />
+                    @if (proyecto.imagen_derivados?.['miniatura']; as miniatura) {
+                      <picture>
+                        <source [srcset]="miniatura.webp" type="image/webp" />
+                        <img [src]="miniatura.jpg" [alt]="proyecto.titulo" loading="lazy" width="480" height="300" />
+                      </picture>
+                    } @else if (proyecto.imagen) {
+                      <img [src]="proyecto.imagen" [alt]="proyecto.titulo" loading="lazy" />
                     } @else {
                       <div class="placeholder-image">
                         <span class="icon-placeholder">📁</span>
@@ -105,8 +110,13 @@ import { Proyecto } from '../../../core/models/models';
                     <!-- Información del creador -->
                     <div class="proyecto-autor">
                       <div class="autor-avatar">
-                        @if (proyecto.creador.avatar) {
-                          <img [src]="proyecto.creador.avatar" [alt]="proyecto.creador.nombre" />
+                        @if (proyecto.creador.avatar_derivados?.['miniatura']; as miniatura) {
+                          <picture>
+                            <source [srcset]="miniatura.webp" type="image/webp" />
+                            <img [src]="miniatura.jpg" [alt]="proyecto.creador.nombre" loading="lazy" width="96" height="96" />
+                          </picture>
+                        } @else if (proyecto.creador.avatar) {
+                          <img [src]="proyecto.creador.avatar" [alt]="proyecto.creador.nombre" loading="lazy" />
                         } @else {
                           <div class="avatar-placeholder">{{ proyecto.creador.nombre.charAt(0) }}</div>
                         }
@@ -290,6 +300,11 @@ import { Proyecto } from '../../../core/models/models';
       background: var(--light-color);
     }
 
+    .proyecto-image picture,
+    .autor-avatar picture {
+      display: contents;
+    }
+
     .proyecto-image img {
       width: 100%;
       height: 100%;